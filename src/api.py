@@ -0,0 +1,453 @@
+"""
+ProxyManX Windows - Library API
+Apply, unset and inspect proxy settings from Python without console output.
+Every call returns a structured result with per-target outcomes and timings.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Mapping, Optional, Tuple, Union
+from config import ConfigManager
+from history import OperationHistory
+from journal import TransactionJournal
+from locking import LockDeadline, state_lock, writes_state
+from status import StatusSnapshot
+from targets import get_available_targets
+from utils import *
+
+# Share of a --deadline budget kept back for rolling back a failed transaction
+ROLLBACK_SHARE = 0.2
+
+
+class TargetOutcome:
+    """What one operation did to one target."""
+    
+    def __init__(self, target: str, status: str, duration_ms: float, spawned: int = 0,
+                 old: Optional[Dict[str, Any]] = None, new: Optional[Dict[str, Any]] = None,
+                 messages: Optional[List[str]] = None, error: Optional[str] = None):
+        self.target = target
+        self.status = status  # 'ok', 'failed' or 'timeout'
+        self.duration_ms = duration_ms
+        self.spawned = spawned
+        self.old = old
+        self.new = new
+        self.messages = messages or []
+        self.error = error
+    
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+    
+    def to_dict(self) -> Dict[str, Any]:
+        record = {'target': self.target, 'status': self.status, 'duration_ms': self.duration_ms,
+                  'spawned': self.spawned, 'old': self.old, 'new': self.new, 'messages': self.messages}
+        if self.error:
+            record['error'] = self.error
+        return record
+    
+    def __repr__(self) -> str:
+        return f"TargetOutcome({self.target!r}, {self.status!r}, {self.duration_ms} ms)"
+
+
+class OperationResult:
+    """Outcome of an apply, unset or undo across all of its targets."""
+    
+    def __init__(self, command: str, status: str, duration_ms: float = 0.0, profile: Optional[str] = None,
+                 targets: Optional[List[TargetOutcome]] = None, failed_target: Optional[str] = None,
+                 rollback: Optional[Dict[str, bool]] = None, messages: Optional[List[str]] = None):
+        self.command = command
+        self.status = status  # 'ok', 'rolled_back', 'failed', 'noop' or 'error'
+        self.duration_ms = duration_ms
+        self.profile = profile
+        self.targets = targets or []
+        self.failed_target = failed_target
+        self.rollback = rollback or {}
+        self.messages = messages or []
+    
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+    
+    @property
+    def timed_out(self) -> List[str]:
+        """Targets that missed the deadline."""
+        return [outcome.target for outcome in self.targets if outcome.status == 'timeout']
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'command': self.command, 'status': self.status, 'duration_ms': self.duration_ms,
+                'profile': self.profile, 'failed_target': self.failed_target, 'timed_out': self.timed_out,
+                'targets': [outcome.to_dict() for outcome in self.targets],
+                'rollback': self.rollback, 'messages': self.messages}
+    
+    def __repr__(self) -> str:
+        return f"OperationResult({self.command!r}, {self.status!r}, {len(self.targets)} target(s))"
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """A per-call time budget as a time.monotonic() deadline (None: no budget of its own)."""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+def _map_threads(func: Callable, items: Iterable) -> List[Any]:
+    """func over items, one thread each, every thread keeping the caller's deadline."""
+    items = list(items)
+    deadline = current_deadline()
+    
+    def call(item):
+        with deadline_scope(deadline):
+            return func(item)
+    
+    with ThreadPoolExecutor(max_workers=max(len(items), 1)) as executor:
+        return list(executor.map(call, items))
+
+
+class ProxySession:
+    """Transactional proxy operations over a set of targets.
+    
+    With quiet=True (the default for library use) nothing is printed: target
+    messages are collected into the results instead. The CLI uses quiet=False
+    and the callbacks to render progress as it happens.
+    """
+    
+    def __init__(self, targets: Optional[Mapping] = None, config_manager: Optional[ConfigManager] = None,
+                 quiet: bool = True):
+        self.config_manager = config_manager or ConfigManager()
+        self.targets = get_available_targets() if targets is None else targets
+        self.journal = TransactionJournal(self.config_manager.config_dir)
+        self.history = OperationHistory(self.config_manager.config_dir)
+        self.quiet = quiet
+    
+    # Queries
+    
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Saved profiles as [{'name', 'active'}]."""
+        with capture_messages(always=self.quiet), state_lock().shared():
+            active = self.config_manager.get_active_profile()
+            return [{'name': name, 'active': name == active} for name in self.config_manager.list_configs()]
+    
+    def status(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """One record per target from the cached status snapshot (see 'proxymanx status')."""
+        with capture_messages(always=self.quiet), state_lock().shared():
+            return StatusSnapshot(self.config_manager.config_dir).collect(refresh=refresh)
+    
+    # Operations
+    
+    def _resolve(self, profile: Union[str, Dict[str, Any]], targets: Optional[List[str]]
+                 ) -> Tuple[Optional[Dict[str, Any]], Optional[str], List[str], List[str]]:
+        """(config, profile name, selected targets, messages) for apply()."""
+        with capture_messages(always=True) as messages:
+            if isinstance(profile, dict):
+                config, name = profile, None
+            else:
+                config, name = self.config_manager.load_config(profile), profile
+        names = list(self.targets.keys()) if targets is None else [n for n in targets if n in self.targets]
+        return config, name, names, messages
+    
+    def apply(self, profile: Union[str, Dict[str, Any]], targets: Optional[List[str]] = None,
+              deadline: Optional[float] = None, include_states: bool = False) -> OperationResult:
+        """Apply a saved profile (by name) or a config dict to targets (default: all available)."""
+        started = time.perf_counter()
+        config, name, names, messages = self._resolve(profile, targets)
+        command = 'load' if name else 'apply'
+        if not config or not names:
+            return OperationResult(command, 'error', _elapsed_ms(started), profile=name,
+                                   messages=messages or ["No available targets selected"])
+        result = self.run_transaction(command, names, lambda target: target.set_proxy(config), profile=name,
+                                      include_states=include_states, deadline=_deadline_after(deadline))
+        if result.ok and name:
+            self.config_manager.set_active_profile(name)
+        return result
+    
+    def unset(self, targets: Optional[List[str]] = None, deadline: Optional[float] = None,
+              include_states: bool = False) -> OperationResult:
+        """Remove proxy settings from targets (default: all available)."""
+        names = list(self.targets.keys()) if targets is None else [n for n in targets if n in self.targets]
+        result = self.run_transaction('unset', names, lambda target: target.unset_proxy(),
+                                      include_states=include_states, failed='clear',
+                                      deadline=_deadline_after(deadline))
+        if result.ok:
+            self.config_manager.clear_active_profile()
+        return result
+    
+    @writes_state
+    def undo(self, on_rollback: Optional[Callable[[str, bool], None]] = None) -> OperationResult:
+        """Revert the last journaled transaction."""
+        started = time.perf_counter()
+        entry = self.journal.load()
+        if not entry:
+            return OperationResult('undo', 'noop', _elapsed_ms(started))
+        
+        restored = self.rollback(entry['targets'], on_rollback)
+        if not all(restored.values()):
+            # Journal kept for another attempt
+            return OperationResult('undo', 'failed', _elapsed_ms(started), profile=entry.get('profile'),
+                                   rollback=restored)
+        if entry.get('previous_profile'):
+            self.config_manager.set_active_profile(entry['previous_profile'])
+        else:
+            self.config_manager.clear_active_profile()
+        self.journal.clear()
+        return OperationResult('undo', 'ok', _elapsed_ms(started), profile=entry.get('profile'), rollback=restored)
+    
+    # Transaction engine
+    
+    def _safe_snapshot(self, name: str) -> Optional[Dict[str, Any]]:
+        """Snapshot a target, returning None instead of raising."""
+        with capture_messages(always=self.quiet):
+            try:
+                return self.targets[name].snapshot_state()
+            except Exception:
+                return None
+    
+    def snapshot_targets(self, names: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Capture the current state of the given targets concurrently.
+        
+        Also returns the targets whose reads timed out: their snapshot would
+        mistake unread values for unset ones. Targets whose snapshot failed
+        are left out of the snapshots, and _run_target() refuses to change them.
+        """
+        def snapshot(name):
+            timeouts_before = timed_out_commands()
+            state = self._safe_snapshot(name)
+            return name, state, timed_out_commands() != timeouts_before
+        
+        results = _map_threads(snapshot, names)
+        return ({name: state for name, state, timed_out in results if state is not None and not timed_out},
+                [name for name, _, timed_out in results if timed_out])
+    
+    def rollback(self, snapshots: Dict[str, Dict[str, Any]],
+                 on_rollback: Optional[Callable[[str, bool], None]] = None) -> Dict[str, bool]:
+        """Restore journaled target states concurrently; maps each target to whether it was restored."""
+        def restore(item):
+            name, state = item
+            target = self.targets.get(name)
+            if target is None:
+                return name, False
+            with capture_messages(always=self.quiet):
+                try:
+                    return name, bool(target.restore_state(state))
+                except Exception:
+                    return name, False
+        
+        results = _map_threads(restore, snapshots.items())
+        for name, restored in results:
+            if on_rollback:
+                on_rollback(name, restored)
+        return dict(results)
+    
+    def _run_target(self, name: str, operation: Callable, snapshots: Dict[str, Dict[str, Any]],
+                    unreadable: List[str], failed: str, include_states: bool) -> TargetOutcome:
+        """Run the operation on one target, timing it and collecting its messages."""
+        target = self.targets[name]
+        started = time.perf_counter()
+        spawned_before = spawned_processes()
+        timeouts_before = timed_out_commands()
+        error = None
+        with capture_messages(always=self.quiet) as messages:
+            # Changing a target whose old values could not be read would make it unrestorable
+            timed_out = name in unreadable or time_remaining() == 0
+            if timed_out:
+                print_error(f"{name} missed the deadline")
+                error = "deadline exceeded"
+                success = False
+            elif name not in snapshots:
+                print_error(f"Could not read the current {name} settings, so it was left unchanged")
+                error = "snapshot failed"
+                success = False
+            else:
+                try:
+                    success = operation(target)
+                except Exception as e:
+                    print_error(f"Error trying to {failed} {name}: {e}")
+                    error = str(e)
+                    success = False
+                timed_out = not success and timed_out_commands() != timeouts_before
+        status = 'ok' if success else 'timeout' if timed_out else 'failed'
+        return TargetOutcome(name, status, _elapsed_ms(started), spawned_processes() - spawned_before,
+                             old=snapshots.get(name),
+                             new=self._safe_snapshot(name) if success and include_states else None,
+                             messages=messages, error=error)
+    
+    def _record_history(self, action: str, status: str, started: float,
+                        outcomes: List[TargetOutcome], profile: Optional[str]) -> None:
+        """Append the transaction to the history log (best effort)."""
+        results = {outcome.target: {'status': outcome.status, 'duration_ms': outcome.duration_ms,
+                                    'spawned': outcome.spawned} for outcome in outcomes}
+        try:
+            self.history.append(action, status, _elapsed_ms(started), results, profile=profile)
+        except OSError:
+            pass  # History must never fail a proxy change
+    
+    def _begin(self, action: str, snapshots: Dict[str, Dict[str, Any]], profile: Optional[str]
+               ) -> Optional[Dict[str, Any]]:
+        """Journal the transaction; returns the entry it replaces."""
+        previous_entry = self.journal.load()
+        self.journal.record(action, snapshots, profile=profile,
+                            previous_profile=self.config_manager.get_active_profile())
+        return previous_entry
+    
+    def _finish(self, action: str, started: float, outcomes: List[TargetOutcome], profile: Optional[str],
+                snapshots: Dict[str, Dict[str, Any]], previous_entry: Optional[Dict[str, Any]],
+                on_rollback: Optional[Callable[[str, bool], None]]) -> OperationResult:
+        """Record the transaction, rolling every attempted target back if one failed."""
+        failures = [outcome for outcome in outcomes if not outcome.ok]
+        if not failures:
+            self._record_history(action, 'ok', started, outcomes, profile)
+            return OperationResult(action, 'ok', _elapsed_ms(started), profile=profile, targets=outcomes)
+        
+        restored = self.rollback({outcome.target: snapshots[outcome.target] for outcome in outcomes
+                                  if outcome.target in snapshots}, on_rollback)
+        if all(restored.values()):
+            # Nothing changed, so 'undo' should still refer to the prior transaction
+            self.journal.replace(previous_entry)
+        self._record_history(action, 'rolled_back', started, outcomes, profile)
+        return OperationResult(action, 'rolled_back', _elapsed_ms(started), profile=profile, targets=outcomes,
+                               failed_target=failures[0].target, rollback=restored)
+    
+    def _locked(self, action: str, names: List[str], deadline: Optional[float],
+                body: Callable[[float], OperationResult], profile: Optional[str]) -> OperationResult:
+        """Run body(started) under the deadline and the exclusive state lock.
+        
+        The lock wait counts against the deadline; running out while waiting
+        fails every target as a deadline miss without touching any of them.
+        """
+        with deadline_scope(deadline):
+            started = time.perf_counter()
+            try:
+                with state_lock().exclusive():
+                    return body(started)
+            except LockDeadline as e:
+                outcomes = [TargetOutcome(name, 'timeout', _elapsed_ms(started), error="deadline exceeded",
+                                          messages=[str(e)]) for name in names]
+                return OperationResult(action, 'failed', _elapsed_ms(started), profile=profile, targets=outcomes,
+                                       failed_target=names[0] if names else None, messages=[str(e)])
+    
+    def run_transaction(self, action: str, names: List[str], operation: Callable, profile: Optional[str] = None,
+                        include_states: bool = False, failed: str = 'configure',
+                        on_start: Optional[Callable[[str], None]] = None,
+                        on_target: Optional[Callable[[TargetOutcome], None]] = None,
+                        on_rollback: Optional[Callable[[str, bool], None]] = None,
+                        deadline: Optional[float] = None) -> OperationResult:
+        """Run an operation on targets one by one, rolling all of them back if any fails.
+        
+        The previous value of every key the targets touch is captured up front
+        and written to the journal once, so undo() can revert the transaction
+        later. Targets after the first failure are not attempted. deadline (a
+        time.monotonic() value) narrows the command's deadline for this call,
+        the wait for the state lock included.
+        """
+        def body(started: float) -> OperationResult:
+            reserve = (time_remaining() or 0) * ROLLBACK_SHARE
+            with reserve_time(reserve):
+                snapshots, unreadable = self.snapshot_targets(names)
+            previous_entry = self._begin(action, snapshots, profile)
+            
+            outcomes = []
+            for name in names:
+                if on_start:
+                    on_start(name)
+                with reserve_time(reserve):
+                    outcome = self._run_target(name, operation, snapshots, unreadable, failed, include_states)
+                outcomes.append(outcome)
+                if on_target:
+                    on_target(outcome)
+                if not outcome.ok:
+                    break
+            return self._finish(action, started, outcomes, profile, snapshots, previous_entry, on_rollback)
+        
+        return self._locked(action, names, deadline, body, profile)
+    
+    # Async variants
+    
+    def _run_concurrent_transaction(self, action: str, names: List[str], operation: Callable,
+                                    profile: Optional[str], include_states: bool, failed: str,
+                                    deadline: Optional[float]) -> OperationResult:
+        """Body of run_transaction_async(): like run_transaction(), but every target at once."""
+        def body(started: float) -> OperationResult:
+            reserve = (time_remaining() or 0) * ROLLBACK_SHARE
+            with reserve_time(reserve):
+                snapshots, unreadable = self.snapshot_targets(names)
+                previous_entry = self._begin(action, snapshots, profile)
+                outcomes = _map_threads(lambda name: self._run_target(name, operation, snapshots, unreadable,
+                                                                      failed, include_states), names)
+            return self._finish(action, started, outcomes, profile, snapshots, previous_entry, None)
+        
+        return self._locked(action, names, deadline, body, profile)
+    
+    async def run_transaction_async(self, action: str, names: List[str], operation: Callable,
+                                    profile: Optional[str] = None, include_states: bool = False,
+                                    failed: str = 'configure', deadline: Optional[float] = None
+                                    ) -> OperationResult:
+        """run_transaction() with every target running concurrently, off the event loop.
+        
+        The whole transaction runs on one executor thread, which holds the
+        state lock: concurrent calls queue behind each other instead of
+        interleaving, and waiting for the lock never blocks the loop.
+        """
+        import asyncio  # Only async callers pay for importing it
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._run_concurrent_transaction, action, names, operation,
+                                          profile, include_states, failed, deadline)
+    
+    async def apply_async(self, profile: Union[str, Dict[str, Any]], targets: Optional[List[str]] = None,
+                          deadline: Optional[float] = None, include_states: bool = False) -> OperationResult:
+        """apply() with the targets configured concurrently."""
+        started = time.perf_counter()
+        config, name, names, messages = self._resolve(profile, targets)
+        command = 'load' if name else 'apply'
+        if not config or not names:
+            return OperationResult(command, 'error', _elapsed_ms(started), profile=name,
+                                   messages=messages or ["No available targets selected"])
+        result = await self.run_transaction_async(command, names, lambda target: target.set_proxy(config),
+                                                  profile=name, include_states=include_states,
+                                                  deadline=_deadline_after(deadline))
+        if result.ok and name:
+            self.config_manager.set_active_profile(name)
+        return result
+    
+    async def unset_async(self, targets: Optional[List[str]] = None, deadline: Optional[float] = None,
+                          include_states: bool = False) -> OperationResult:
+        """unset() with the targets cleared concurrently."""
+        names = list(self.targets.keys()) if targets is None else [n for n in targets if n in self.targets]
+        result = await self.run_transaction_async('unset', names, lambda target: target.unset_proxy(),
+                                                  include_states=include_states, failed='clear',
+                                                  deadline=_deadline_after(deadline))
+        if result.ok:
+            self.config_manager.clear_active_profile()
+        return result
+
+
+def apply(profile: Union[str, Dict[str, Any]], targets: Optional[List[str]] = None,
+          deadline: Optional[float] = None) -> OperationResult:
+    """Apply a saved profile or config dict to targets (default: all available)."""
+    return ProxySession().apply(profile, targets, deadline=deadline)
+
+
+def unset(targets: Optional[List[str]] = None, deadline: Optional[float] = None) -> OperationResult:
+    """Remove proxy settings from targets (default: all available)."""
+    return ProxySession().unset(targets, deadline=deadline)
+
+
+def status(refresh: bool = False) -> List[Dict[str, Any]]:
+    """One status record per target, from the cached snapshot."""
+    return ProxySession().status(refresh=refresh)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Saved profiles with their active flag."""
+    return ProxySession().list_profiles()
+
+
+async def apply_async(profile: Union[str, Dict[str, Any]], targets: Optional[List[str]] = None,
+                      deadline: Optional[float] = None) -> OperationResult:
+    """apply() running the targets concurrently in the caller's event loop."""
+    return await ProxySession().apply_async(profile, targets, deadline=deadline)
+
+
+async def unset_async(targets: Optional[List[str]] = None, deadline: Optional[float] = None) -> OperationResult:
+    """unset() running the targets concurrently in the caller's event loop."""
+    return await ProxySession().unset_async(targets, deadline=deadline)
@@ -0,0 +1,157 @@
+"""
+ProxyManX Windows - Shell Completion
+Completion scripts for PowerShell, cmd (clink) and bash, backed by a small
+cache file so pressing Tab never starts ProxyManX itself.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils import atomic_write_text
+
+COMMANDS = ['set', 'unset', 'list', 'configs', 'show-configs', 'status', 'load', 'pick', 'save',
+            'delete', 'undo', 'history', 'sync', 'watch', 'env', 'rules', 'hook', 'resolve', 'route',
+            'bench-proxy', 'completion', 'help']
+
+# Words offered after a command that takes neither profiles nor targets
+COMMAND_OPTIONS = {
+    'status': ['--refresh'],
+    'history': ['--stats', '--since', '--limit'],
+    'sync': ['--force'],
+    'completion': ['powershell', 'clink', 'bash'],
+    'watch': ['--reapply', '--interval'],
+    'env': ['--shell', 'powershell', 'cmd', 'bash'],
+    'rules': ['list', 'add', 'remove', 'which', 'compile'],
+    'hook': ['powershell', 'clink', 'bash'],
+    'resolve': ['--pac', '--save', 'wpad'],
+    'route': ['--input', '--profile', '--no-proxy', '--output', '--workers'],
+    'bench-proxy': ['--target', '--concurrency', '--duration', '--insecure'],
+}
+
+CACHE_NAME = '.completion'
+
+
+def render_completion_cache(profiles: List[str], targets: List[str]) -> str:
+    """One '<kind> <word>' line per completion candidate."""
+    lines = [f"command {command}" for command in COMMANDS]
+    for command, options in COMMAND_OPTIONS.items():
+        lines += [f"option:{command} {option}" for option in options]
+    lines += [f"profile {name}" for name in profiles]
+    lines += [f"target {name}" for name in targets]
+    return '\n'.join(lines) + '\n'
+
+
+def read_cached_words(config_dir: Path, kind: str) -> List[str]:
+    """Words of one kind from the cache file (empty if there is no cache)."""
+    try:
+        with open(Path(config_dir) / CACHE_NAME, 'r', encoding='utf-8') as f:
+            return [line.rstrip('\n').split(' ', 1)[1] for line in f if line.startswith(kind + ' ')]
+    except FileNotFoundError:
+        return []
+
+
+def write_completion_cache(config_dir: Path, profiles: List[str], targets: Optional[List[str]] = None) -> bool:
+    """Rewrite the cache if its content changed; targets=None keeps the cached target names."""
+    path = Path(config_dir) / CACHE_NAME
+    if targets is None:
+        targets = read_cached_words(config_dir, 'target')
+    content = render_completion_cache(profiles, targets)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    atomic_write_text(path, content)
+    return True
+
+
+BASH_SCRIPT = r'''# ProxyManX completion for bash. Enable with:
+#   eval "$(proxymanx completion bash)"
+_proxymanx_complete() {
+    local cache="$HOME/.proxymanx/.completion"
+    local cur="${COMP_WORDS[COMP_CWORD]}" kind words="" k name
+    [ -r "$cache" ] || return 0
+    if [ "$COMP_CWORD" -eq 1 ]; then
+        kind=command
+    else
+        case "${COMP_WORDS[1]}" in
+            load) if [ "$COMP_CWORD" -eq 2 ]; then kind=profile; else kind=target; fi ;;
+            delete) kind=profile ;;
+            unset) kind=target; words="all" ;;
+            *) kind="option:${COMP_WORDS[1]}" ;;
+        esac
+    fi
+    while read -r k name; do
+        [ "$k" = "$kind" ] && words="$words $name"
+    done < "$cache"
+    COMPREPLY=($(compgen -W "$words --json" -- "$cur"))
+}
+complete -F _proxymanx_complete proxymanx proxymanx.bat
+'''
+
+POWERSHELL_SCRIPT = r'''# ProxyManX completion for PowerShell. Enable by adding to $PROFILE:
+#   proxymanx completion powershell | Out-String | Invoke-Expression
+Register-ArgumentCompleter -Native -CommandName proxymanx, proxymanx.bat -ScriptBlock {
+    param($wordToComplete, $commandAst, $cursorPosition)
+    $cache = Join-Path $HOME '.proxymanx\.completion'
+    if (-not (Test-Path $cache)) { return }
+    $words = @($commandAst.CommandElements | Select-Object -Skip 1 | ForEach-Object { $_.ToString() })
+    $position = if ($wordToComplete) { $words.Count - 1 } else { $words.Count }
+    $extra = @('--json')
+    if ($position -eq 0) {
+        $kind = 'command'
+    } else {
+        switch ($words[0]) {
+            'load' { $kind = if ($position -eq 1) { 'profile' } else { 'target' } }
+            'delete' { $kind = 'profile' }
+            'unset' { $kind = 'target'; $extra += 'all' }
+            default { $kind = "option:$($words[0])" }
+        }
+    }
+    $candidates = @(Get-Content -LiteralPath $cache | ForEach-Object {
+        $k, $name = $_ -split ' ', 2
+        if ($k -eq $kind) { $name }
+    }) + $extra
+    $candidates | Where-Object { $_ -like "$wordToComplete*" } | ForEach-Object {
+        [System.Management.Automation.CompletionResult]::new($_, $_, 'ParameterValue', $_)
+    }
+}
+'''
+
+CLINK_SCRIPT = r'''-- ProxyManX completion for cmd.exe with clink. Enable with:
+--   proxymanx completion clink > "%LOCALAPPDATA%\clink\proxymanx.lua"
+local function cached_words(kind, extra)
+    return function()
+        local words = {}
+        for _, word in ipairs(extra or {}) do table.insert(words, word) end
+        local file = io.open(os.getenv("USERPROFILE") .. "\\.proxymanx\\.completion", "r")
+        if not file then return words end
+        for line in file:lines() do
+            local k, name = line:match("^(%S+) (.+)$")
+            if k == kind then table.insert(words, name) end
+        end
+        file:close()
+        return words
+    end
+end
+
+local parsers = {
+    load = clink.argmatcher():addarg(cached_words("profile")):addarg(cached_words("target")):loop(),
+    delete = clink.argmatcher():addarg(cached_words("profile")),
+    unset = clink.argmatcher():addarg(cached_words("target", {"all"})):loop(),
+}
+
+local commands = {}
+for _, command in ipairs(cached_words("command")()) do
+    local parser = parsers[command] or clink.argmatcher():addarg(cached_words("option:" .. command)):loop()
+    table.insert(commands, command .. parser)
+end
+
+clink.argmatcher("proxymanx", "proxymanx.bat"):addarg(commands):addflags("--json")
+'''
+
+COMPLETION_SCRIPTS: Dict[str, str] = {
+    'bash': BASH_SCRIPT,
+    'powershell': POWERSHELL_SCRIPT,
+    'clink': CLINK_SCRIPT,
+}
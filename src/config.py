@@ -3,12 +3,14 @@ ProxyManX Windows - Configuration Management Module
 Handles saving, loading, and managing proxy configuration profiles.
 """
 
+import io
 import os
 import json
 import configparser
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from utils import get_colors, print_colored
+from locking import writes_state
+from utils import get_colors, print_colored, atomic_write_text
 
 
 class ConfigManager:
@@ -27,38 +29,49 @@ class ConfigManager:
             for file in self.config_dir.glob('*.ini'):
                 configs.append(file.stem)
             for file in self.config_dir.glob('*.json'):
-                configs.append(file.stem)
+                if not file.name.startswith('.'):  # State files such as .journal.json
+                    configs.append(file.stem)
         return sorted(configs)
     
+    def render_config(self, config: Dict[str, Any]) -> str:
+        """Render a profile in the .ini format written by save_config()."""
+        # Create ConfigParser instance
+        parser = configparser.ConfigParser()
+        
+        # Add proxy settings section
+        parser.add_section('proxy')
+        parser.set('proxy', 'http_host', config.get('http_host', ''))
+        parser.set('proxy', 'http_port', str(config.get('http_port', '')))
+        parser.set('proxy', 'https_host', config.get('https_host', ''))
+        parser.set('proxy', 'https_port', str(config.get('https_port', '')))
+        parser.set('proxy', 'ftp_host', config.get('ftp_host', ''))
+        parser.set('proxy', 'ftp_port', str(config.get('ftp_port', '')))
+        parser.set('proxy', 'use_auth', str(config.get('use_auth', False)))
+        parser.set('proxy', 'username', config.get('username', ''))
+        parser.set('proxy', 'password', config.get('password', ''))
+        parser.set('proxy', 'no_proxy', config.get('no_proxy', ''))
+        parser.set('proxy', 'use_same', str(config.get('use_same', False)))
+        if config.get('docker_daemon'):
+            parser.set('proxy', 'docker_daemon', 'True')
+        
+        buffer = io.StringIO()
+        parser.write(buffer)
+        return buffer.getvalue()
+    
+    @writes_state
     def save_config(self, name: str, config: Dict[str, Any]) -> bool:
         """Save a configuration profile."""
         try:
             config_file = self.config_dir / f'{name}.ini'
             
-            # Create ConfigParser instance
-            parser = configparser.ConfigParser()
-            
-            # Add proxy settings section
-            parser.add_section('proxy')
-            parser.set('proxy', 'http_host', config.get('http_host', ''))
-            parser.set('proxy', 'http_port', str(config.get('http_port', '')))
-            parser.set('proxy', 'https_host', config.get('https_host', ''))
-            parser.set('proxy', 'https_port', str(config.get('https_port', '')))
-            parser.set('proxy', 'ftp_host', config.get('ftp_host', ''))
-            parser.set('proxy', 'ftp_port', str(config.get('ftp_port', '')))
-            parser.set('proxy', 'use_auth', str(config.get('use_auth', False)))
-            parser.set('proxy', 'username', config.get('username', ''))
-            parser.set('proxy', 'password', config.get('password', ''))
-            parser.set('proxy', 'no_proxy', config.get('no_proxy', ''))
-            parser.set('proxy', 'use_same', str(config.get('use_same', False)))
-            
             # Write to file
-            with open(config_file, 'w') as f:
-                parser.write(f)
+            atomic_write_text(config_file, self.render_config(config))
+            self.refresh_completion_cache()
+            self.refresh_env_scripts(name)
             
             print_colored(f"✅ Configuration saved to {config_file}", self.colors['green'])
             return True
-            
+        
         except Exception as e:
             print_colored(f"❌ Error saving configuration: {e}", self.colors['red'])
             return False
@@ -98,7 +111,8 @@ class ConfigManager:
                 'username': parser.get('proxy', 'username'),
                 'password': parser.get('proxy', 'password'),
                 'no_proxy': parser.get('proxy', 'no_proxy'),
-                'use_same': parser.getboolean('proxy', 'use_same')
+                'use_same': parser.getboolean('proxy', 'use_same'),
+                'docker_daemon': parser.getboolean('proxy', 'docker_daemon', fallback=False)
             }
             
             # Convert port strings back to integers if not empty
@@ -109,11 +123,12 @@ class ConfigManager:
                     config[port_key] = ''
             
             return config
-            
+        
         except Exception as e:
             print_colored(f"❌ Error loading configuration: {e}", self.colors['red'])
             return None
     
+    @writes_state
     def delete_config(self, name: str) -> bool:
         """Delete a configuration profile."""
         try:
@@ -124,9 +139,11 @@ class ConfigManager:
                 return False
             
             config_file.unlink()
+            self.refresh_completion_cache()
+            self.refresh_env_scripts(name)
             print_colored(f"✅ Configuration '{name}' deleted", self.colors['green'])
             return True
-            
+        
         except Exception as e:
             print_colored(f"❌ Error deleting configuration: {e}", self.colors['red'])
             return False
@@ -164,29 +181,38 @@ class ConfigManager:
     def show_current_configs(self) -> None:
         """Show current proxy configurations for all targets."""
         from targets import get_available_targets
+        from inspector import show_target_configs
         
         print_colored("Current Proxy Configurations for All Targets:", self.colors['cyan'])
         print_colored("=" * 60, self.colors['cyan'])
         
-        available_targets = get_available_targets()
-        
-        for target_name, target in available_targets.items():
-            try:
-                print_colored(f"\n{target_name.upper()}", self.colors['blue'])
-                target.list_proxy()
-            except Exception as e:
-                print_colored(f"\n{target_name.upper()}", self.colors['blue'])
-                print_colored(f"  Error reading settings: {e}", self.colors['red'])
+        show_target_configs(get_available_targets())
         
         print_colored("\n" + "=" * 60, self.colors['cyan'])
         print_colored("Use 'proxymanx list' to see available profiles", self.colors['cyan'])
     
+    def refresh_completion_cache(self, targets: Optional[List[str]] = None) -> None:
+        """Rewrite the shell completion cache with the current profile (and target) names."""
+        from completion import write_completion_cache
+        try:
+            write_completion_cache(self.config_dir, self.list_configs(), targets)
+        except OSError:
+            pass  # Completion is a convenience; never fail a profile change over it
+    
+    def refresh_env_scripts(self, name: str) -> None:
+        """Re-render the cached shell statements of a profile that was saved or deleted."""
+        from dirrules import DirectoryRules
+        try:
+            DirectoryRules(self.config_dir).profile_changed(self, name)
+        except OSError:
+            pass
+    
+    @writes_state
     def set_active_profile(self, profile_name: str) -> None:
         """Set the currently active profile."""
         try:
             state_file = self.config_dir / '.active_profile'
-            with open(state_file, 'w') as f:
-                f.write(profile_name)
+            atomic_write_text(state_file, profile_name)
         except Exception as e:
             print_colored(f"Warning: Could not save active profile state: {e}", self.colors['yellow'])
     
@@ -207,6 +233,7 @@ class ConfigManager:
         except Exception:
             return None
     
+    @writes_state
     def clear_active_profile(self) -> None:
         """Clear the active profile state."""
         try:
@@ -0,0 +1,364 @@
+"""
+ProxyManX Windows - Directory Rules
+Maps directory trees to profiles and compiles them into a prefix index that
+shell prompt hooks read directly, so changing directory never starts Python.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from locking import writes_state
+from shellenv import DIRECT, SHELL_EXTENSIONS, drop_env_scripts, env_script_path, write_env_scripts
+from utils import *
+
+RULES_NAME = 'dir-rules.txt'
+INDEX_NAME = '.dirindex'
+
+RULES_HEADER = """# ProxyManX directory rules: <profile> <directory>
+# The longest matching directory wins; 'direct' clears the proxy variables.
+# Run 'proxymanx rules compile' after editing this file by hand.
+"""
+
+
+def normalize_directory(path: str) -> str:
+    """Absolute path with '/' separators and a trailing '/', case-folded on Windows."""
+    path = os.path.abspath(os.path.expanduser(path)).replace('\\', '/')
+    if os.name == 'nt':
+        path = path.lower()
+    return path.rstrip('/') + '/'
+
+
+class DirectoryRules:
+    """The rules file and the compiled index the prompt hooks consume."""
+    
+    def __init__(self, config_dir: Path):
+        self.config_dir = Path(config_dir)
+        self.rules_file = self.config_dir / RULES_NAME
+        self.index_file = self.config_dir / INDEX_NAME
+    
+    def load(self) -> List[Tuple[str, str]]:
+        """(profile, directory) pairs in file order."""
+        rules = []
+        try:
+            with open(self.rules_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    parts = line.split(None, 1)
+                    if len(parts) == 2:
+                        rules.append((parts[0], parts[1]))
+        except FileNotFoundError:
+            pass
+        return rules
+    
+    @writes_state
+    def save(self, rules: List[Tuple[str, str]]) -> None:
+        width = max([len(profile) for profile, _ in rules] + [8])
+        lines = [f"{profile:{width}} {directory}" for profile, directory in rules]
+        atomic_write_text(self.rules_file, RULES_HEADER + ''.join(line + '\n' for line in lines))
+    
+    def add(self, directory: str, profile: str) -> None:
+        """Map a directory tree to a profile, replacing any rule for the same directory."""
+        key = normalize_directory(directory)
+        rules = [(p, d) for p, d in self.load() if normalize_directory(d) != key]
+        rules.append((profile, os.path.abspath(os.path.expanduser(directory))))
+        self.save(rules)
+    
+    def remove(self, directory: str) -> bool:
+        """Drop the rule for a directory; False if there was none."""
+        key = normalize_directory(directory)
+        rules = self.load()
+        kept = [(p, d) for p, d in rules if normalize_directory(d) != key]
+        if len(kept) == len(rules):
+            return False
+        self.save(kept)
+        return True
+    
+    def index_entries(self) -> List[Tuple[str, str]]:
+        """(prefix, profile) pairs, longest prefix first, so the first match is the best one."""
+        entries = {}
+        for profile, directory in self.load():
+            prefix = normalize_directory(directory)
+            entries[prefix] = profile
+            # Git Bash reports C:\src as /c/src
+            if len(prefix) > 2 and prefix[1] == ':':
+                entries['/' + prefix[0] + prefix[2:]] = profile
+        return sorted(entries.items(), key=lambda entry: (-len(entry[0]), entry[0]))
+    
+    def match(self, directory: str) -> Optional[str]:
+        """Profile governing a directory, or None when no rule covers it."""
+        key = normalize_directory(directory)
+        for prefix, profile in self.index_entries():
+            if key.startswith(prefix):
+                return profile
+        return None
+    
+    @writes_state
+    def compile(self, config_manager) -> List[str]:
+        """Write the prefix index and every referenced profile's env scripts; returns missing profiles."""
+        entries = self.index_entries()
+        missing = []
+        for profile in sorted({profile for _, profile in entries} | {DIRECT}):
+            with capture_messages(always=True):
+                if not write_env_scripts(config_manager, profile):
+                    missing.append(profile)
+        # '#fold' tells the hooks to lower-case the working directory before matching
+        header = '#fold\n' if os.name == 'nt' else '#exact\n'
+        atomic_write_text(self.index_file, header + ''.join(f"{prefix}\t{profile}\n" for prefix, profile in entries))
+        return missing
+    
+    def is_stale(self) -> bool:
+        """True when the rules file was edited after the index was compiled."""
+        try:
+            rules_mtime = os.stat(self.rules_file).st_mtime_ns
+        except OSError:
+            return False
+        try:
+            return os.stat(self.index_file).st_mtime_ns < rules_mtime
+        except OSError:
+            return True
+    
+    def profile_changed(self, config_manager, profile: str) -> None:
+        """Re-render a saved or deleted profile's env scripts if they were cached or a rule uses it."""
+        cached = any(env_script_path(self.config_dir, profile, shell).exists() for shell in SHELL_EXTENSIONS)
+        drop_env_scripts(self.config_dir, profile)
+        if cached or any(name == profile for name, _ in self.load()):
+            with capture_messages(always=True):
+                write_env_scripts(config_manager, profile)
+
+def manage_dir_rules(config_manager, args: List[str], json_output: bool = False) -> None:
+    """Handle 'proxymanx rules [list|add|remove|which|compile] ...'."""
+    started = time.perf_counter()
+    rules = DirectoryRules(config_manager.config_dir)
+    action = args[0].lower() if args else 'list'
+    status = 'ok'
+    fields = {}
+    
+    if action == 'add' and len(args) == 3:
+        directory, profile = args[1], args[2]
+        if profile != DIRECT and profile not in config_manager.list_configs():
+            print_error(f"Configuration '{profile}' not found")
+            status = 'error'
+        elif not os.path.isdir(os.path.expanduser(directory)):
+            print_error(f"Not a directory: {directory}")
+            status = 'error'
+        else:
+            rules.add(directory, profile)
+            print_success(f"'{profile}' now applies under {os.path.abspath(os.path.expanduser(directory))}")
+    elif action == 'remove' and len(args) == 2:
+        if rules.remove(args[1]):
+            print_success(f"Rule for {args[1]} removed")
+        else:
+            print_warning(f"No rule for {args[1]}")
+            status = 'unchanged'
+    elif action == 'which' and len(args) <= 2:
+        directory = args[1] if len(args) == 2 else os.getcwd()
+        if rules.is_stale():
+            rules.compile(config_manager)
+        profile = rules.match(directory)
+        fields = {'directory': directory, 'profile': profile}
+        if not json_output:
+            print_info(f"{directory}: {profile or 'no rule (session settings unchanged)'}")
+    elif action == 'list' and len(args) <= 1:
+        entries = rules.load()
+        if json_output:
+            for profile, directory in entries:
+                emit_json({'type': 'rule', 'profile': profile, 'directory': directory})
+        elif not entries:
+            print_warning("No directory rules (add one with 'proxymanx rules add <dir> <profile>')")
+        else:
+            colors = get_colors()
+            for profile, directory in entries:
+                print_colored(f"  {profile:20} {directory}", colors['white'])
+    elif action != 'compile' or len(args) != 1:
+        print_error("Usage: proxymanx rules [list | add <dir> <profile|direct> | remove <dir> | which [dir] | compile]")
+        status = 'error'
+    
+    if status == 'ok' and action in ('add', 'remove', 'compile'):
+        missing = rules.compile(config_manager)
+        if missing:
+            print_warning(f"Rules refer to missing profiles: {', '.join(missing)}")
+            fields['missing'] = missing
+        if action == 'compile':
+            print_success(f"Compiled {len(rules.index_entries())} prefix(es) into {rules.index_file}")
+    
+    if json_output:
+        emit_json(dict({'type': 'result', 'command': 'rules', 'action': action, 'status': status,
+                        'duration_ms': round((time.perf_counter() - started) * 1000, 1)}, **fields))
+
+
+BASH_HOOK = r'''# ProxyManX directory rules for bash. Enable with:
+#   eval "$(proxymanx hook bash)"
+declare -A _proxymanx_dirs
+declare -A _proxymanx_saved
+_proxymanx_index_text=
+_proxymanx_index_lines=()
+_proxymanx_dir=
+_proxymanx_profile=
+_proxymanx_hook() {
+    # Same directory as the last prompt: nothing to do
+    [ "$PWD" = "$_proxymanx_dir" ] && return 0
+    _proxymanx_dir=$PWD
+    local text="" key selected="" line var
+    [ -r "$HOME/.proxymanx/.dirindex" ] && IFS= read -r -d '' text < "$HOME/.proxymanx/.dirindex"
+    if [ "$text" != "$_proxymanx_index_text" ]; then
+        _proxymanx_index_text=$text
+        mapfile -t _proxymanx_index_lines <<< "$text"
+        _proxymanx_dirs=()
+    fi
+    key="${PWD%/}/"
+    [[ $text == '#fold'* ]] && key="${key,,}"
+    if [ -n "${_proxymanx_dirs[$key]+x}" ]; then
+        selected=${_proxymanx_dirs[$key]}
+    else
+        for line in "${_proxymanx_index_lines[@]}"; do
+            [[ $line == *$'\t'* && $key == "${line%%$'\t'*}"* ]] || continue
+            selected=${line#*$'\t'}
+            break
+        done
+        _proxymanx_dirs[$key]=$selected
+    fi
+    [ "$selected" = "$_proxymanx_profile" ] && return 0
+    if [ -z "$_proxymanx_profile" ]; then
+        # Entering a rule's tree: remember the session's own settings
+        _proxymanx_saved=()
+        for var in HTTP_PROXY HTTPS_PROXY http_proxy https_proxy NO_PROXY no_proxy; do
+            [ -n "${!var+x}" ] && _proxymanx_saved[$var]=${!var}
+        done
+    fi
+    if [ -n "$selected" ]; then
+        [ -r "$HOME/.proxymanx/.env/$selected.sh" ] || return 0
+        . "$HOME/.proxymanx/.env/$selected.sh"
+    else
+        for var in HTTP_PROXY HTTPS_PROXY http_proxy https_proxy NO_PROXY no_proxy; do
+            if [ -n "${_proxymanx_saved[$var]+x}" ]; then export "$var=${_proxymanx_saved[$var]}"; else unset "$var"; fi
+        done
+    fi
+    _proxymanx_profile=$selected
+}
+case ";$PROMPT_COMMAND;" in
+    *";_proxymanx_hook;"*) ;;
+    *) PROMPT_COMMAND="_proxymanx_hook${PROMPT_COMMAND:+;$PROMPT_COMMAND}" ;;
+esac
+'''
+
+POWERSHELL_HOOK = r'''# ProxyManX directory rules for PowerShell. Enable by adding to $PROFILE:
+#   proxymanx hook powershell | Out-String | Invoke-Expression
+$global:ProxyManXDirs = [System.Collections.Generic.Dictionary[string, string]]::new()
+$global:ProxyManXSaved = @{}
+$global:ProxyManXIndexText = $null
+$global:ProxyManXIndexLines = @()
+$global:ProxyManXDir = $null
+$global:ProxyManXDirProfile = ''
+if (-not $global:ProxyManXPrompt) { $global:ProxyManXPrompt = $function:prompt }
+
+function global:Update-ProxyManXDirectory {
+    $dir = $ExecutionContext.SessionState.Path.CurrentFileSystemLocation.ProviderPath
+    # Same directory as the last prompt: nothing to do
+    if ($dir -eq $global:ProxyManXDir) { return }
+    $global:ProxyManXDir = $dir
+    $index = Join-Path $HOME '.proxymanx\.dirindex'
+    $text = if ([System.IO.File]::Exists($index)) { [System.IO.File]::ReadAllText($index) } else { '' }
+    if ($text -ne $global:ProxyManXIndexText) {
+        $global:ProxyManXIndexText = $text
+        $global:ProxyManXIndexLines = @($text -split "`n" | Where-Object { $_.Contains("`t") })
+        $global:ProxyManXDirs.Clear()
+    }
+    $key = ($dir -replace '\\', '/').TrimEnd('/') + '/'
+    if ($text.StartsWith('#fold')) { $key = $key.ToLowerInvariant() }
+    $selected = ''
+    if (-not $global:ProxyManXDirs.TryGetValue($key, [ref]$selected)) {
+        $selected = ''
+        foreach ($line in $global:ProxyManXIndexLines) {
+            $prefix, $name = $line -split "`t", 2
+            if ($key.StartsWith($prefix, [System.StringComparison]::Ordinal)) { $selected = $name; break }
+        }
+        $global:ProxyManXDirs[$key] = $selected
+    }
+    if ($selected -eq $global:ProxyManXDirProfile) { return }
+    $names = 'HTTP_PROXY', 'HTTPS_PROXY', 'NO_PROXY'
+    if (-not $global:ProxyManXDirProfile) {
+        # Entering a rule's tree: remember the session's own settings
+        $global:ProxyManXSaved = @{}
+        foreach ($name in $names) { $global:ProxyManXSaved[$name] = [Environment]::GetEnvironmentVariable($name) }
+    }
+    if ($selected) {
+        $script = Join-Path $HOME ".proxymanx\.env\$selected.ps1"
+        if (-not [System.IO.File]::Exists($script)) { return }
+        . $script
+    } else {
+        foreach ($name in $names) { [Environment]::SetEnvironmentVariable($name, $global:ProxyManXSaved[$name]) }
+    }
+    $global:ProxyManXDirProfile = $selected
+}
+
+function global:prompt {
+    Update-ProxyManXDirectory
+    & $global:ProxyManXPrompt
+}
+'''
+
+CLINK_HOOK = r'''-- ProxyManX directory rules for cmd.exe with clink. Enable with:
+--   proxymanx hook clink > "%LOCALAPPDATA%\clink\proxymanx_rules.lua"
+local home = os.getenv("USERPROFILE") .. "\\.proxymanx\\"
+local names = {"HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY"}
+local state = {text = nil, entries = {}, dirs = {}, profile = "", saved = {}}
+
+local function read_file(path)
+    local file = io.open(path, "r")
+    if not file then return nil end
+    local text = file:read("*a")
+    file:close()
+    return text
+end
+
+local function update()
+    local dir = os.getcwd()
+    -- Same directory as the last prompt: nothing to do
+    if dir == state.dir then return end
+    state.dir = dir
+    local text = read_file(home .. ".dirindex") or ""
+    if text ~= state.text then
+        state.text, state.entries, state.dirs = text, {}, {}
+        for prefix, name in text:gmatch("([^\t\n]+)\t([^\n]+)") do
+            table.insert(state.entries, {prefix, name})
+        end
+    end
+    local key = dir:gsub("\\", "/"):gsub("/+$", "") .. "/"
+    if text:sub(1, 5) == "#fold" then key = key:lower() end
+    local selected = state.dirs[key]
+    if selected == nil then
+        selected = ""
+        for _, entry in ipairs(state.entries) do
+            if key:sub(1, #entry[1]) == entry[1] then selected = entry[2]; break end
+        end
+        state.dirs[key] = selected
+    end
+    if selected == state.profile then return end
+    if state.profile == "" then
+        -- Entering a rule's tree: remember the session's own settings
+        for _, name in ipairs(names) do state.saved[name] = os.getenv(name) or "" end
+    end
+    if selected ~= "" then
+        local script = read_file(home .. ".env\\" .. selected .. ".cmd")
+        if not script then return end
+        for name, value in script:gmatch('set "([^=\n]+)=([^\n]*)"') do os.setenv(name, value) end
+    else
+        for name, value in pairs(state.saved) do os.setenv(name, value) end
+    end
+    state.profile = selected
+end
+
+local filter = clink.promptfilter(1)
+function filter:filter(prompt)
+    update()
+end
+'''
+
+HOOK_SCRIPTS: Dict[str, str] = {
+    'bash': BASH_HOOK,
+    'powershell': POWERSHELL_HOOK,
+    'clink': CLINK_HOOK,
+}
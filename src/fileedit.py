@@ -0,0 +1,669 @@
+"""
+ProxyManX Windows - In-place Config File Editing
+Small format-preserving editors for the config files that targets patch
+directly. Only the lines for the affected keys change; comments, ordering
+and unrelated content are kept as they are.
+"""
+
+import copy
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from utils import atomic_write, atomic_write_text
+
+_SECTION_RE = re.compile(r'^\s*\[([^\]]+)\]')
+
+
+def read_text(path: Union[str, Path]) -> str:
+    """Read a text file with its line endings preserved, or '' if it does not exist."""
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def missing_files(paths: List[Union[str, Path]]) -> List[str]:
+    """The paths that do not exist yet, for snapshots: restoring removes the files a change created."""
+    return [str(path) for path in paths if not os.path.exists(path)]
+
+
+def remove_created_files(paths: List[str], skeletons: Tuple[str, ...] = ()) -> None:
+    """Delete files a snapshot recorded as missing, once only an empty skeleton is left in them.
+    
+    A file the user has since put their own settings in is kept. Whitespace is
+    ignored when comparing against the skeletons ('' always counts as empty).
+    """
+    empty = {''.join(skeleton.split()) for skeleton in skeletons} | {''}
+    for path in paths:
+        if ''.join(read_text(path).split()) not in empty:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def detect_newline(content: str) -> str:
+    """Return the line ending used by the content (default '\\n')."""
+    return '\r\n' if '\r\n' in content else '\n'
+
+
+def write_if_changed(path: Union[str, Path], original: str, content: str) -> bool:
+    """Atomically write content unless it equals the original. Returns True if written."""
+    if content == original:
+        return False
+    atomic_write_text(path, content)
+    return True
+
+
+def load_json_file(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load a JSON object from a file ({} if it does not exist or is empty)."""
+    content = read_text(path)
+    if not content.strip():
+        return {}
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} does not contain a JSON object")
+    return data
+
+
+def write_json_if_changed(path: Union[str, Path], before: Dict[str, Any], after: Dict[str, Any],
+                          indent: Union[int, str] = '\t') -> bool:
+    """Atomically write a JSON object unless it is equal to what was loaded."""
+    if before == after:
+        return False
+    atomic_write_text(path, json.dumps(after, indent=indent) + '\n')
+    return True
+
+
+def patch_json_section(path: Union[str, Path], keys: List[str], value: Optional[Dict[str, Any]],
+                       indent: Union[int, str] = '\t') -> bool:
+    """Set (or with value=None remove) a nested object in a JSON file, keeping all other keys.
+    
+    Empty parent objects left behind by a removal are pruned.
+    """
+    before = load_json_file(path)
+    if not before and value is None:
+        return False
+    after = copy.deepcopy(before)
+    
+    parents = [after]
+    for key in keys[:-1]:
+        child = parents[-1].get(key)
+        if not isinstance(child, dict):
+            if value is None:
+                return False
+            child = parents[-1][key] = {}
+        parents.append(child)
+    
+    if value is None:
+        parents[-1].pop(keys[-1], None)
+        for parent, key in reversed(list(zip(parents[:-1], keys[:-1]))):
+            if parent.get(key) == {}:
+                del parent[key]
+    else:
+        parents[-1][keys[-1]] = value
+    return write_json_if_changed(path, before, after, indent)
+
+
+def get_json_section(path: Union[str, Path], keys: List[str]) -> Optional[Any]:
+    """Read a nested value from a JSON file, or None."""
+    value = load_json_file(path)
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _ensure_trailing_newline(lines: List[str], newline: str) -> None:
+    if lines and not lines[-1].endswith(('\n', '\r')):
+        lines[-1] += newline
+
+
+def _ini_section_span(lines: List[str], section: str) -> Optional[Tuple[int, int]]:
+    """Return (header_index, end_index) of a section, end being exclusive."""
+    start = None
+    for i, line in enumerate(lines):
+        match = _SECTION_RE.match(line)
+        if not match:
+            continue
+        if start is not None:
+            return start, i
+        if match.group(1).strip().lower() == section.lower():
+            start = i
+    return (start, len(lines)) if start is not None else None
+
+
+def _ini_option_spans(lines: List[str], start: int, end: int, key: str) -> List[Tuple[int, int]]:
+    """Spans of every 'key = value' line (plus continuation lines) within a section."""
+    pattern = re.compile(r'^\s*' + re.escape(key) + r'\s*[=:]', re.IGNORECASE)
+    spans = []
+    i = start + 1
+    while i < end:
+        if pattern.match(lines[i]):
+            j = i + 1
+            while j < end and lines[j].strip() and lines[j][0] in ' \t':
+                j += 1
+            spans.append((i, j))
+            i = j
+        else:
+            i += 1
+    return spans
+
+
+def get_ini_option(content: str, section: str, key: str) -> Optional[str]:
+    """Read an option from INI text (first occurrence), or None."""
+    lines = content.splitlines(True)
+    span = _ini_section_span(lines, section)
+    if not span:
+        return None
+    spans = _ini_option_spans(lines, span[0], span[1], key)
+    if not spans:
+        return None
+    start, end = spans[0]
+    value = re.split(r'[=:]', lines[start], 1)[1].strip()
+    extra = [line.strip() for line in lines[start + 1:end]]
+    return '\n'.join([value] + extra) if extra else value
+
+
+def set_ini_option(content: str, section: str, key: str, value: Optional[str]) -> str:
+    """Set (or with value=None remove) an option in INI text, touching only its lines."""
+    newline = detect_newline(content)
+    lines = content.splitlines(True)
+    span = _ini_section_span(lines, section)
+    
+    if span is None:
+        if value is None:
+            return content
+        _ensure_trailing_newline(lines, newline)
+        if lines and lines[-1].strip():
+            lines.append(newline)
+        lines += [f"[{section}]{newline}", f"{key} = {value}{newline}"]
+        return ''.join(lines)
+    
+    start, end = span
+    spans = _ini_option_spans(lines, start, end, key)
+    new_line = [] if value is None else [f"{key} = {value}{newline}"]
+    
+    if spans:
+        # Replace the first occurrence, drop any duplicates
+        for i, j in reversed(spans[1:]):
+            del lines[i:j]
+        i, j = spans[0]
+        lines[i:j] = new_line
+    elif new_line:
+        # Insert after the last non-blank line of the section
+        insert_at = end
+        while insert_at > start + 1 and not lines[insert_at - 1].strip():
+            insert_at -= 1
+        if insert_at == len(lines):
+            _ensure_trailing_newline(lines, newline)
+        lines[insert_at:insert_at] = new_line
+    return ''.join(lines)
+
+
+def _yaml_key_span(lines: List[str], key: str) -> Optional[Tuple[int, int]]:
+    """Span of a top-level YAML key and its indented body (trailing blanks excluded)."""
+    pattern = re.compile(r'^' + re.escape(key) + r'\s*:')
+    for i, line in enumerate(lines):
+        if not pattern.match(line):
+            continue
+        j = i + 1
+        while j < len(lines) and (not lines[j].strip() or lines[j][0] in ' \t'):
+            j += 1
+        while j > i + 1 and not lines[j - 1].strip():
+            j -= 1
+        return i, j
+    return None
+
+
+def get_yaml_block(content: str, key: str) -> Optional[List[str]]:
+    """Return the lines of a top-level YAML key (without line endings), or None."""
+    lines = content.splitlines(True)
+    span = _yaml_key_span(lines, key)
+    if not span:
+        return None
+    return [line.rstrip('\r\n') for line in lines[span[0]:span[1]]]
+
+
+def set_yaml_block(content: str, key: str, block: Optional[List[str]]) -> str:
+    """Replace (or with block=None remove) a top-level YAML key and its body.
+    
+    ``block`` holds the full lines to write, starting with the ``key:`` line.
+    """
+    newline = detect_newline(content)
+    lines = content.splitlines(True)
+    span = _yaml_key_span(lines, key)
+    new_lines = [line + newline for line in block] if block else []
+    
+    if span:
+        lines[span[0]:span[1]] = new_lines
+    elif new_lines:
+        _ensure_trailing_newline(lines, newline)
+        lines += new_lines
+    return ''.join(lines)
+
+
+def _properties_key(line: str) -> Optional[str]:
+    """Return the key of a Java properties line, or None for comments/blank lines."""
+    stripped = line.lstrip()
+    if not stripped or stripped[0] in '#!':
+        return None
+    match = re.match(r'((?:\\.|[^\s=:\\])+)', stripped)
+    return match.group(1) if match else None
+
+
+def _properties_spans(lines: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """Map each key to the spans of its logical lines (following '\\' continuations)."""
+    spans = {}
+    i = 0
+    while i < len(lines):
+        j = i + 1
+        line = lines[i].rstrip('\r\n')
+        while j < len(lines) and (len(line) - len(line.rstrip('\\'))) % 2 == 1:
+            line = lines[j].rstrip('\r\n')
+            j += 1
+        key = _properties_key(lines[i])
+        if key is not None:
+            spans.setdefault(key, []).append((i, j))
+        i = j
+    return spans
+
+
+def get_properties(content: str, keys: List[str]) -> Dict[str, Optional[str]]:
+    """Read values for the given keys from Java properties text (None when missing)."""
+    lines = content.splitlines(True)
+    spans = _properties_spans(lines)
+    values = {}
+    for key in keys:
+        if key not in spans:
+            values[key] = None
+            continue
+        start, end = spans[key][-1]
+        text = ''.join(line.rstrip('\r\n').rstrip('\\').lstrip() if n else line.rstrip('\r\n').rstrip('\\')
+                       for n, line in enumerate(lines[start:end]))
+        values[key] = re.sub(r'^\s*' + re.escape(key) + r'\s*[=:\s]\s*', '', text, count=1)
+    return values
+
+
+def set_properties(content: str, values: Dict[str, Optional[str]]) -> str:
+    """Set (or with None remove) keys in Java properties text; new keys are appended."""
+    newline = detect_newline(content)
+    lines = content.splitlines(True)
+    spans = _properties_spans(lines)
+    
+    replacements = {}
+    appended = []
+    for key, value in values.items():
+        new_line = [] if value is None else [f"{key}={value}{newline}"]
+        if key in spans:
+            first, *duplicates = spans[key]
+            replacements[first] = new_line
+            for span in duplicates:
+                replacements[span] = []
+        elif new_line:
+            appended += new_line
+    
+    for (start, end), new_line in sorted(replacements.items(), reverse=True):
+        lines[start:end] = new_line
+    if appended:
+        _ensure_trailing_newline(lines, newline)
+        lines += appended
+    return ''.join(lines)
+
+
+def _scan_xml_element(src_lines, tag: str, container: str, element, dst=None) -> Tuple[bool, Optional[str]]:
+    """Stream lines, replacing (or inserting) one element outside comments.
+    
+    Returns (changed, original_element_text). With dst=None the input is
+    only scanned. ``element`` is None (remove), raw text, or a list of
+    lines that is indented to match the surrounding markup.
+    """
+    patterns = {
+        'before': re.compile(r'<!--|<' + re.escape(tag) + r'(?=[\s/>])|</' + re.escape(container) + r'\s*>'),
+        'inside': re.compile(r'<!--|</' + re.escape(tag) + r'\s*>'),
+    }
+    state = 'before'
+    in_comment = False
+    original = []
+    changed = False
+    newline = None
+    
+    def render(indent: str) -> str:
+        if element is None:
+            return ''
+        if isinstance(element, str):
+            return element
+        return (newline + indent).join(element)
+    
+    def write(text: str) -> None:
+        if dst is not None and text:
+            dst.write(text)
+    
+    for line in src_lines:
+        if newline is None:
+            newline = '\r\n' if line.endswith('\r\n') else '\n'
+        if state == 'after':
+            write(line)
+            continue
+        
+        pos = 0
+        line_start = 0
+        while pos < len(line):
+            if in_comment:
+                end = line.find('-->', pos)
+                stop = len(line) if end == -1 else end + 3
+                if state == 'inside':
+                    original.append(line[pos:stop])
+                else:
+                    write(line[pos:stop])
+                in_comment = end == -1
+                pos = stop
+                continue
+            
+            match = patterns[state].search(line, pos) if state != 'after' else None
+            if state == 'after' or not match:
+                if state == 'inside':
+                    original.append(line[pos:])
+                else:
+                    write(line[pos:])
+                break
+            
+            token = match.group(0)
+            if token == '<!--':
+                if state == 'inside':
+                    original.append(line[pos:match.end()])
+                else:
+                    write(line[pos:match.end()])
+                in_comment = True
+                pos = match.end()
+                continue
+            
+            prefix = line[line_start:match.start()]
+            indent = prefix if not prefix.strip() else re.match(r'\s*', line).group(0)
+            
+            if state == 'before' and token.startswith('</'):
+                # Element missing: insert it before the container's closing tag
+                if element is not None:
+                    child_indent = indent + '  '
+                    write(line[pos:match.start()])
+                    if prefix.strip():
+                        write(newline)
+                    write(child_indent + render(child_indent) + newline + indent)
+                    changed = True
+                else:
+                    write(line[pos:match.start()])
+                write(line[match.start():])
+                state = 'after'
+                break
+            
+            if state == 'before':
+                tag_end = line.find('>', match.end())
+                if tag_end == -1:
+                    raise ValueError(f"<{tag}> start tag spans several lines")
+                replaced_indent = indent
+                write(line[pos:match.start()] if element is not None or prefix.strip() else '')
+                original.append(line[match.start():tag_end + 1])
+                pos = tag_end + 1
+                if line[tag_end - 1] == '/':
+                    state = 'closing'
+                else:
+                    state = 'inside'
+                    continue
+            else:
+                original.append(line[pos:match.end()])
+                pos = match.end()
+                state = 'closing'
+            
+            if state == 'closing':
+                rendered = render(replaced_indent)
+                original_text = ''.join(original)
+                changed = rendered != original_text
+                rest = line[pos:]
+                if element is None and not rest.strip() and not prefix.strip():
+                    rest = ''
+                write(rendered + rest)
+                state = 'after'
+                break
+    
+    if state == 'before' and element is not None:
+        raise ValueError(f"No <{container}> element found")
+    return changed, (''.join(original) if original else None)
+
+
+def read_xml_element(path: Union[str, Path], tag: str, container: str) -> Optional[str]:
+    """Return the raw text of the first element outside comments, streaming the file."""
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as src:
+            return _scan_xml_element(src, tag, container, None)[1]
+    except FileNotFoundError:
+        return None
+
+
+def replace_xml_element(path: Union[str, Path], tag: str, container: str,
+                        element: Union[None, str, List[str]], skeleton: str = None) -> bool:
+    """Replace, insert or remove an element, streaming the file into a temp file.
+    
+    Nothing outside the element is parsed or rebuilt, so large files with
+    many unrelated elements cost one sequential pass. The temp file is
+    discarded when the element is already up to date; otherwise it
+    atomically replaces the original. ``skeleton`` is used when the file
+    does not exist yet.
+    """
+    path = Path(path)
+    if not path.exists():
+        if element is None or skeleton is None:
+            return False
+        return atomic_write(path, lambda dst: _scan_xml_element(skeleton.splitlines(True), tag, container,
+                                                                element, dst)[0])
+    
+    def stream(dst) -> bool:
+        with open(path, 'r', encoding='utf-8', newline='') as src:
+            return _scan_xml_element(src, tag, container, element, dst)[0]
+    
+    return atomic_write(path, stream)
+
+
+def _skip_jsonc_trivia(text: str, pos: int) -> int:
+    """Skip whitespace and // or /* */ comments."""
+    length = len(text)
+    while pos < length:
+        char = text[pos]
+        if char in ' \t\r\n':
+            pos += 1
+        elif text.startswith('//', pos):
+            end = text.find('\n', pos)
+            pos = length if end == -1 else end + 1
+        elif text.startswith('/*', pos):
+            end = text.find('*/', pos + 2)
+            pos = length if end == -1 else end + 2
+        else:
+            break
+    return pos
+
+
+def _skip_jsonc_string(text: str, pos: int) -> int:
+    """Return the position just past the string starting at pos."""
+    pos += 1
+    while pos < len(text):
+        char = text[pos]
+        if char == '\\':
+            pos += 2
+        elif char == '"':
+            return pos + 1
+        else:
+            pos += 1
+    raise ValueError("Unterminated string in JSONC")
+
+
+def _skip_jsonc_value(text: str, pos: int) -> int:
+    """Return the position just past the value starting at pos."""
+    if text[pos] == '"':
+        return _skip_jsonc_string(text, pos)
+    if text[pos] in '[{':
+        depth = 0
+        while pos < len(text):
+            pos = _skip_jsonc_trivia(text, pos)
+            char = text[pos]
+            if char == '"':
+                pos = _skip_jsonc_string(text, pos)
+                continue
+            if char in '[{':
+                depth += 1
+            elif char in ']}':
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            pos += 1
+        raise ValueError("Unterminated object or array in JSONC")
+    match = re.compile(r'[^\s,\]}/]+').match(text, pos)
+    if not match:
+        raise ValueError(f"Unexpected character {text[pos]!r} in JSONC")
+    return match.end()
+
+
+def _scan_jsonc_members(text: str) -> Tuple[List[Dict[str, Any]], int]:
+    """Scan the members of the top-level JSONC object.
+    
+    Returns (members, close_pos) where each member records its key and the
+    offsets of the key, value and following comma (None if absent).
+    """
+    pos = _skip_jsonc_trivia(text, 0)
+    if pos >= len(text) or text[pos] != '{':
+        raise ValueError("JSONC document is not an object")
+    pos += 1
+    members = []
+    while True:
+        pos = _skip_jsonc_trivia(text, pos)
+        if pos >= len(text):
+            raise ValueError("Unterminated JSONC object")
+        if text[pos] == '}':
+            return members, pos
+        key_start = pos
+        key_end = _skip_jsonc_string(text, pos)
+        key = json.loads(text[key_start:key_end])
+        pos = _skip_jsonc_trivia(text, key_end)
+        if text[pos] != ':':
+            raise ValueError(f"Expected ':' after {key!r} in JSONC")
+        value_start = _skip_jsonc_trivia(text, pos + 1)
+        value_end = _skip_jsonc_value(text, value_start)
+        pos = _skip_jsonc_trivia(text, value_end)
+        comma = None
+        if pos < len(text) and text[pos] == ',':
+            comma = pos
+            pos += 1
+        members.append({'key': key, 'key_start': key_start, 'value_start': value_start,
+                        'value_end': value_end, 'comma': comma})
+
+
+def get_jsonc_values(text: str, keys: List[str]) -> Dict[str, Any]:
+    """Read top-level values from JSONC text (keys not present are omitted)."""
+    if not text.strip():
+        return {}
+    values = {}
+    for member in _scan_jsonc_members(text)[0]:
+        if member['key'] in keys:
+            raw = text[member['value_start']:member['value_end']]
+            try:
+                values[member['key']] = json.loads(raw)
+            except ValueError:
+                values[member['key']] = raw
+    return values
+
+
+def _jsonc_line_end(text: str, pos: int) -> int:
+    """Start of the next line when only whitespace and comments follow pos on its line, else pos."""
+    end = pos
+    while True:
+        while end < len(text) and text[end] in ' \t':
+            end += 1
+        if text.startswith('/*', end):
+            close = text.find('*/', end + 2)
+            if close == -1:
+                return pos
+            end = close + 2
+            continue
+        if text.startswith(('//', '\r\n', '\n'), end):
+            newline_pos = text.find('\n', end)
+            if newline_pos != -1:
+                return newline_pos + 1
+        return pos
+
+
+def _jsonc_set(text: str, key: str, value: Any) -> str:
+    """Set or remove (value=None) one top-level key, editing only its span."""
+    members, close_pos = _scan_jsonc_members(text)
+    member = next((m for m in members if m['key'] == key), None)
+    newline = detect_newline(text)
+    
+    if value is not None:
+        rendered = json.dumps(value)
+        if member:
+            return text[:member['value_start']] + rendered + text[member['value_end']:]
+        if members:
+            last = members[-1]
+            line_start = text.rfind('\n', 0, last['key_start']) + 1
+            indent = re.match(r'[ \t]*', text[line_start:]).group(0) or '    '
+            entry = f"{json.dumps(key)}: {rendered}"
+            if last['comma'] is None:
+                text = text[:last['value_end']] + ',' + text[last['value_end']:]
+                anchor = last['value_end'] + 1
+            else:
+                # Keep the trailing-comma style
+                anchor = last['comma'] + 1
+                entry += ','
+            # Insert after the last member's own line so its trailing comment stays with it
+            insert_at = _jsonc_line_end(text, anchor)
+            if insert_at == anchor:
+                return text[:anchor] + f"{newline}{indent}{entry}" + text[anchor:]
+            return text[:insert_at] + f"{indent}{entry}{newline}" + text[insert_at:]
+        entry = f"{newline}    {json.dumps(key)}: {rendered}{newline}"
+        body = text[text.index('{') + 1:close_pos]
+        if body.strip():
+            # Only comments inside: keep them and append after
+            return text[:close_pos].rstrip(' \t') + entry.lstrip('\r\n') + text[close_pos:]
+        return text[:text.index('{') + 1] + entry + text[close_pos:]
+    
+    if not member:
+        return text
+    index = members.index(member)
+    line_start = text.rfind('\n', 0, member['key_start']) + 1
+    start = line_start if not text[line_start:member['key_start']].strip() else member['key_start']
+    end = member['value_end'] if member['comma'] is None else member['comma'] + 1
+    newline_pos = text.find('\n', end)
+    if newline_pos != -1 and not text[end:newline_pos].strip():
+        if start == line_start or member['comma'] is not None:
+            end = newline_pos + 1
+    elif start == line_start:
+        # A comment follows on the line: leave it in the member's place
+        start = member['key_start']
+        end = len(text) - len(text[end:].lstrip(' \t'))
+    text = text[:start] + text[end:]
+    if member['comma'] is None and index > 0:
+        # Last member without trailing comma: drop only the comma separating it
+        comma = members[index - 1]['comma']
+        text = text[:comma] + text[comma + 1:]
+    return text
+
+
+def patch_jsonc_file(path: Union[str, Path], values: Dict[str, Any]) -> bool:
+    """Set or remove (None) top-level keys in a JSONC file with one atomic write.
+    
+    Comments, trailing commas and formatting outside the affected values
+    are preserved; the write is skipped when nothing changes.
+    """
+    original = read_text(path)
+    if not original.strip():
+        if all(value is None for value in values.values()):
+            return False
+        original_for_edit = "{}\n"
+    else:
+        original_for_edit = original
+    content = original_for_edit
+    for key, value in values.items():
+        content = _jsonc_set(content, key, value)
+    return write_if_changed(path, original, content)
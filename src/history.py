@@ -0,0 +1,151 @@
+"""
+ProxyManX Windows - Operation History
+Size-rotated log of set/unset/load operations with per-target timings, and
+latency statistics computed by streaming over it.
+"""
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+# The live log is rotated to history.jsonl.1 .. .N once it would exceed this size
+HISTORY_MAX_BYTES = 1024 * 1024
+HISTORY_BACKUPS = 3
+
+WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_window(text: str) -> float:
+    """Parse a time window such as '90m', '24h' or '7d' into seconds."""
+    text = text.strip().lower()
+    if text and text[-1] in WINDOW_UNITS:
+        seconds = float(text[:-1]) * WINDOW_UNITS[text[-1]]
+    else:
+        seconds = float(text)
+    if seconds <= 0:
+        raise ValueError(f"time window must be positive: {text}")
+    return seconds
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with log-spaced buckets (about 5% relative error)."""
+    
+    GROWTH = 1.05
+    MIN_MS = 0.1
+    
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+    
+    def add(self, duration_ms: float) -> None:
+        """Count one observation."""
+        index = 0 if duration_ms <= self.MIN_MS else math.ceil(math.log(duration_ms / self.MIN_MS, self.GROWTH))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+    
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add another histogram's observations (e.g. one kept by a worker thread)."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile, or None when empty."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return round(self.MIN_MS * self.GROWTH ** index, 1)
+
+
+class OperationHistory:
+    """Append-only JSON-lines log of proxy operations."""
+    
+    def __init__(self, config_dir: Path):
+        self.history_file = Path(config_dir) / 'history.jsonl'
+    
+    def append(self, command: str, status: str, duration_ms: float,
+               targets: Dict[str, Dict[str, Any]], profile: Optional[str] = None) -> None:
+        """Append one operation record; costs a stat and a single write."""
+        record = {
+            'time': round(time.time(), 3),
+            'command': command,
+            'profile': profile,
+            'status': status,
+            'duration_ms': duration_ms,
+            'targets': targets
+        }
+        line = json.dumps(record, separators=(',', ':'), default=str) + '\n'
+        try:
+            if self.history_file.stat().st_size + len(line) > HISTORY_MAX_BYTES:
+                self._rotate()
+        except FileNotFoundError:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_file, 'a', encoding='utf-8') as f:
+            f.write(line)
+    
+    def _rotate(self) -> None:
+        """Shift history.jsonl -> .1 -> .2 ..., dropping the oldest backup."""
+        for index in range(HISTORY_BACKUPS - 1, 0, -1):
+            older = self._backup_path(index)
+            if older.exists():
+                os.replace(older, self._backup_path(index + 1))
+        os.replace(self.history_file, self._backup_path(1))
+    
+    def _backup_path(self, index: int) -> Path:
+        return self.history_file.with_name(f"{self.history_file.name}.{index}")
+    
+    def _files(self) -> List[Path]:
+        """Log files from oldest to newest."""
+        paths = [self._backup_path(index) for index in range(HISTORY_BACKUPS, 0, -1)]
+        return [path for path in paths + [self.history_file] if path.exists()]
+    
+    def iter_records(self, since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield records oldest first, one line at a time."""
+        for path in self._files():
+            try:
+                # A file last written before the window holds nothing inside it
+                if since is not None and path.stat().st_mtime < since:
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Torn or hand-edited line
+                        if since is None or record.get('time', 0) >= since:
+                            yield record
+            except FileNotFoundError:
+                continue  # Rotated away while reading
+    
+    def stats(self, window_seconds: float) -> Dict[str, Dict[str, Any]]:
+        """Per-target count, failure rate, p50/p95/p99 latency and processes spawned."""
+        totals = {}
+        for record in self.iter_records(since=time.time() - window_seconds):
+            for name, result in (record.get('targets') or {}).items():
+                entry = totals.setdefault(name, {'count': 0, 'failures': 0, 'spawned': 0,
+                                                 'histogram': LatencyHistogram()})
+                entry['count'] += 1
+                entry['failures'] += result.get('status') != 'ok'
+                entry['spawned'] += result.get('spawned', 0)
+                entry['histogram'].add(result.get('duration_ms', 0))
+        
+        stats = {}
+        for name in sorted(totals):
+            entry = totals[name]
+            histogram = entry['histogram']
+            stats[name] = {
+                'count': entry['count'],
+                'failure_rate': round(entry['failures'] / entry['count'], 3),
+                'p50_ms': histogram.percentile(50),
+                'p95_ms': histogram.percentile(95),
+                'p99_ms': histogram.percentile(99),
+                'avg_spawned': round(entry['spawned'] / entry['count'], 1)
+            }
+        return stats
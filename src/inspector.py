@@ -0,0 +1,104 @@
+"""
+ProxyManX Windows - Target Inspector
+Reads the current settings of many targets concurrently and renders them.
+"""
+
+import threading
+import time
+from typing import Dict, List, Any, Callable, Iterator, Mapping, Optional
+from utils import *
+
+# Seconds to wait for one target before reporting it as timed out
+DEFAULT_READ_TIMEOUT = 10.0
+
+
+def read_target_config(target_name: str, targets: Mapping) -> Dict[str, Any]:
+    """Read one target's current settings into a structured record."""
+    started = time.perf_counter()
+    record = {'type': 'target', 'command': 'configs', 'target': target_name}
+    with capture_messages(always=True) as messages:
+        try:
+            # Get current proxy settings for this target
+            current_settings = targets[target_name].list_proxy()
+            record['status'] = 'active' if current_settings else 'inactive'
+            record['settings'] = current_settings
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = str(e)
+    if messages:
+        record['messages'] = messages
+    record['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def iter_target_configs(targets: Mapping, names: Optional[List[str]] = None,
+                        timeout: float = DEFAULT_READ_TIMEOUT,
+                        reader: Callable[[str, Mapping], Dict[str, Any]] = read_target_config
+                        ) -> Iterator[Dict[str, Any]]:
+    """Read targets in parallel and yield their records in the given order.
+    
+    Every target gets its own daemon thread, so each record is yielded as
+    soon as it and all records before it are ready, and a target that hangs
+    is reported as 'timeout' without holding up the rest or process exit.
+    """
+    names = list(targets.keys()) if names is None else names
+    if time_remaining() is not None:
+        timeout = min(timeout, time_remaining())
+    results = {}
+    events = {name: threading.Event() for name in names}
+    
+    def worker(name):
+        results[name] = reader(name, targets)
+        events[name].set()
+    
+    started = time.perf_counter()
+    for name in names:
+        threading.Thread(target=worker, args=(name,), name=f"proxymanx-read-{name}", daemon=True).start()
+    
+    # All reads start together, so they share one deadline
+    deadline = started + timeout
+    for name in names:
+        if events[name].wait(max(0.0, deadline - time.perf_counter())):
+            yield results[name]
+        else:
+            yield {'type': 'target', 'command': 'configs', 'target': name, 'status': 'timeout',
+                   'error': f"timed out after {timeout:g}s", 'duration_ms': round(timeout * 1000, 1)}
+
+
+def print_target_config(record: Dict[str, Any]) -> None:
+    """Render a record from read_target_config() for the terminal."""
+    colors = get_colors()
+    title = record['target'].title()
+    current_settings = record.get('settings')
+    
+    if record['status'] == 'active':
+        # Target has proxy settings
+        print_colored(f"\n[ACTIVE] {title}", colors['green'])
+        if isinstance(current_settings, dict):
+            for key, value in current_settings.items():
+                print_colored(f"  {key}: {value}", colors['white'])
+        else:
+            print_colored(f"  {current_settings}", colors['white'])
+    elif record['status'] == 'inactive':
+        # Target has no proxy settings
+        print_colored(f"\n[INACTIVE] {title}", colors['yellow'])
+        print_colored(f"  No proxy settings configured", colors['white'])
+    elif record['status'] == 'timeout':
+        print_colored(f"\n[TIMED OUT] {title}", colors['yellow'])
+        print_colored(f"  Settings could not be read: {record.get('error')}", colors['white'])
+    else:
+        print_colored(f"\n[ERROR] {title}", colors['red'])
+        print_colored(f"  Error reading settings: {record.get('error')}", colors['white'])
+    
+    for message in record.get('messages', []):
+        print_colored(f"  {message}", colors['white'])
+
+
+def show_target_configs(targets: Mapping, json_output: bool = False,
+                        timeout: float = DEFAULT_READ_TIMEOUT) -> None:
+    """Stream every target's current settings to the terminal or as NDJSON."""
+    for record in iter_target_configs(targets, timeout=timeout):
+        if json_output:
+            emit_json(record)
+        else:
+            print_target_config(record)
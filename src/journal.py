@@ -0,0 +1,54 @@
+"""
+ProxyManX Windows - Transaction Journal
+Records the previous state of every target touched by an apply/unset so the
+change can be rolled back on failure or reverted later with 'proxymanx undo'.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+from utils import atomic_write_text
+
+
+class TransactionJournal:
+    """Single-entry journal holding the last transaction's previous values."""
+    
+    def __init__(self, config_dir: Path):
+        self.journal_file = Path(config_dir) / '.journal.json'
+    
+    def record(self, action: str, snapshots: Dict[str, Dict[str, Any]],
+               profile: Optional[str] = None, previous_profile: Optional[str] = None) -> Dict[str, Any]:
+        """Write the journal for a transaction (one write per transaction)."""
+        entry = {
+            'id': f"{int(time.time() * 1000):x}",
+            'time': time.time(),
+            'action': action,
+            'profile': profile,
+            'previous_profile': previous_profile,
+            'targets': snapshots
+        }
+        self.replace(entry)
+        return entry
+    
+    def replace(self, entry: Optional[Dict[str, Any]]) -> None:
+        """Overwrite the journal with an existing entry (or clear it for None)."""
+        if entry is None:
+            self.clear()
+        else:
+            atomic_write_text(self.journal_file, json.dumps(entry, separators=(',', ':')))
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the last recorded transaction, or None."""
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def clear(self) -> None:
+        """Forget the last transaction."""
+        try:
+            self.journal_file.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,163 @@
+"""
+ProxyManX Windows - State Locking
+Reader/writer lock over the ~/.proxymanx state directory, shared between all
+ProxyManX processes: readers run in parallel, writers run one at a time.
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+from utils import time_remaining
+
+LOCK_NAME = '.lock'
+
+# How long a command waits for other ProxyManX processes before giving up;
+# a --deadline that runs out sooner cuts the wait short
+LOCK_TIMEOUT = 30.0
+
+if os.name == 'nt':
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+    
+    LOCKFILE_FAIL_IMMEDIATELY = 0x1
+    LOCKFILE_EXCLUSIVE_LOCK = 0x2
+    ERROR_LOCK_VIOLATION = 33
+    
+    class _OVERLAPPED(ctypes.Structure):
+        _fields_ = [('Internal', ctypes.c_void_p), ('InternalHigh', ctypes.c_void_p),
+                    ('Offset', wintypes.DWORD), ('OffsetHigh', wintypes.DWORD), ('hEvent', wintypes.HANDLE)]
+    
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    
+    def _try_lock(fd: int, exclusive: bool) -> bool:
+        flags = LOCKFILE_FAIL_IMMEDIATELY | (LOCKFILE_EXCLUSIVE_LOCK if exclusive else 0)
+        overlapped = _OVERLAPPED()
+        if _kernel32.LockFileEx(wintypes.HANDLE(msvcrt.get_osfhandle(fd)), flags, 0, 1, 0, ctypes.byref(overlapped)):
+            return True
+        error = ctypes.get_last_error()
+        if error == ERROR_LOCK_VIOLATION:
+            return False
+        raise ctypes.WinError(error)
+    
+    def _unlock(fd: int) -> None:
+        overlapped = _OVERLAPPED()
+        _kernel32.UnlockFileEx(wintypes.HANDLE(msvcrt.get_osfhandle(fd)), 0, 1, 0, ctypes.byref(overlapped))
+else:
+    import fcntl
+    
+    def _try_lock(fd: int, exclusive: bool) -> bool:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+    
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class LockTimeout(OSError):
+    """Another ProxyManX process held the state lock for too long."""
+
+
+class LockDeadline(LockTimeout):
+    """The command's deadline ran out while waiting for the state lock."""
+
+
+class StateLock:
+    """Cross-process reader/writer lock on a lock file, re-entrant within a process.
+    
+    Nested requests inside a held lock are free; asking for the exclusive
+    lock while holding the shared one upgrades it (briefly releasing it) and
+    the shared lock is taken back afterwards.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._guard = threading.RLock()
+        self._fd = None
+        self._mode = None
+    
+    def _acquire(self, mode: str, timeout: float) -> None:
+        remaining = time_remaining()
+        budget = timeout if remaining is None else min(timeout, remaining)
+        deadline = time.monotonic() + budget
+        delay = 0.001
+        while not _try_lock(self._fd, mode == 'exclusive'):
+            if time.monotonic() >= deadline:
+                if budget < timeout:
+                    raise LockDeadline(f"Missed the deadline after {budget:.3g}s waiting for another "
+                                       f"ProxyManX process ({self.path})")
+                raise LockTimeout(f"Timed out after {timeout:g}s waiting for another ProxyManX process ({self.path})")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        self._mode = mode
+    
+    @contextmanager
+    def _hold(self, mode: str, timeout: float) -> Iterator[None]:
+        with self._guard:
+            previous = self._mode
+            if previous == 'exclusive' or previous == mode:
+                yield
+                return
+            
+            if self._fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o600)
+            else:
+                _unlock(self._fd)  # Upgrade shared -> exclusive
+            try:
+                self._acquire(mode, timeout)
+                yield
+            finally:
+                _unlock(self._fd)
+                self._mode = None
+                if previous is None:
+                    os.close(self._fd)
+                    self._fd = None
+                else:
+                    self._acquire(previous, timeout)
+    
+    def shared(self, timeout: float = LOCK_TIMEOUT):
+        """Context manager for reading state; any number of readers may hold it."""
+        return self._hold('shared', timeout)
+    
+    def exclusive(self, timeout: float = LOCK_TIMEOUT):
+        """Context manager for changing state; excludes readers and other writers."""
+        return self._hold('exclusive', timeout)
+
+
+_locks: Dict[Path, StateLock] = {}
+_locks_guard = threading.Lock()
+
+
+def state_lock() -> StateLock:
+    """The lock guarding the current user's ~/.proxymanx directory."""
+    path = Path.home() / '.proxymanx' / LOCK_NAME
+    with _locks_guard:
+        if path not in _locks:
+            _locks[path] = StateLock(path)
+        return _locks[path]
+
+
+def reads_state(func):
+    """Decorator: run func holding the shared state lock."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with state_lock().shared():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def writes_state(func):
+    """Decorator: run func holding the exclusive state lock."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with state_lock().exclusive():
+            return func(*args, **kwargs)
+    return wrapper
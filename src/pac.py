@@ -0,0 +1,610 @@
+"""
+ProxyManX Windows - PAC/WPAD Resolution
+Fetches a proxy auto-config script from a file, a URL or WPAD discovery, runs it
+in the PAC sandbox and reports the proxy chain for URLs. Scripts, their parse
+trees and DNS answers are cached; a script is reloaded only when it changes.
+"""
+
+import fnmatch
+import functools
+import hashlib
+import ipaddress
+import json
+import marshal
+import math
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from pacscript import AST_VERSION, PacScriptError, Script, UNDEFINED, to_number, to_string
+from utils import *
+
+PAC_CACHE_DIR = '.pac'
+PAC_TIMEOUT = 10
+
+# A downloaded script is used this long before it is revalidated with the server
+PAC_REFRESH = 300
+
+# How long DNS answers (including failures) are reused
+DNS_CACHE_TTL = 300
+
+WPAD_FILE = 'wpad.dat'
+
+# Scripts calling these can return different answers for the same URL, so their results are not cached
+UNCACHEABLE_HELPERS = {'weekdayRange', 'dateRange', 'timeRange', 'myIpAddress', 'myIpAddressEx', 'alert'}
+
+DAYS = ('SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT')
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+CHAIN_TYPES = {'DIRECT', 'PROXY', 'HTTP', 'HTTPS', 'SOCKS', 'SOCKS4', 'SOCKS5'}
+
+
+class PacError(Exception):
+    """A PAC script could not be fetched, discovered or evaluated."""
+
+
+@functools.lru_cache(maxsize=512)
+def _shell_pattern(pattern: str):
+    return re.compile(fnmatch.translate(pattern), re.DOTALL)
+
+
+def _ip_address(text: str):
+    try:
+        return ipaddress.ip_address(text)
+    except ValueError:
+        return None
+
+
+def _in_range(now: Tuple, start: Tuple, end: Tuple) -> bool:
+    """start <= now <= end, wrapping around when start is after end."""
+    if start <= end:
+        return start <= now <= end
+    return now >= start or now <= end
+
+
+class PacHelpers:
+    """The standard PAC helper functions, with DNS answers cached for DNS_CACHE_TTL."""
+    
+    def __init__(self, ttl: float = DNS_CACHE_TTL, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.alerts = []
+        self._dns = {}
+        self._lock = threading.Lock()
+    
+    def lookup(self, host: str) -> List[str]:
+        """Addresses for a host name (IPv4 first); IP literals resolve to themselves."""
+        if _ip_address(host):
+            return [host]
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dns.get(host)
+            if cached and cached[0] > now:
+                return cached[1]
+        try:
+            infos = socket.getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            addresses.sort(key=lambda address: ':' in address)
+        except (OSError, UnicodeError):
+            addresses = []
+        with self._lock:
+            self._dns[host] = (now + self.ttl, addresses)
+        return addresses
+    
+    def my_addresses(self) -> List[str]:
+        """This machine's addresses, the one on the default route first."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dns.get(None)
+            if cached and cached[0] > now:
+                return cached[1]
+        addresses = []
+        try:
+            # Connecting a UDP socket sends nothing but selects the outgoing interface
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+                probe.connect(('10.255.255.255', 1))
+                addresses.append(probe.getsockname()[0])
+        except OSError:
+            pass
+        addresses.extend(address for address in self.lookup(socket.gethostname()) if address not in addresses)
+        addresses = addresses or ['127.0.0.1']
+        with self._lock:
+            self._dns[None] = (now + self.ttl, addresses)
+        return addresses
+    
+    def _clock(self, args: List[Any]) -> Tuple[time.struct_time, List[Any]]:
+        """The current time (GMT when the last argument says so) and the remaining arguments."""
+        if args and to_string(args[-1]).upper() == 'GMT':
+            return time.gmtime(self.clock()), args[:-1]
+        return time.localtime(self.clock()), args
+    
+    def builtins(self) -> Dict[str, Any]:
+        """Globals a PAC script runs with."""
+        def text(value):
+            return '' if value is None or value is UNDEFINED else to_string(value)
+        
+        def dns_resolve(host):
+            ipv4 = [address for address in self.lookup(text(host)) if ':' not in address]
+            return ipv4[0] if ipv4 else None
+        
+        def is_in_net(host, pattern, mask):
+            address = _ip_address(text(host)) or _ip_address(dns_resolve(host) or '')
+            try:
+                network = ipaddress.IPv4Network(f"{text(pattern)}/{text(mask)}", strict=False)
+            except ValueError:
+                return False
+            return address is not None and address.version == 4 and address in network
+        
+        def is_in_net_ex(host, prefix):
+            try:
+                network = ipaddress.ip_network(text(prefix), strict=False)
+            except ValueError:
+                return False
+            return any(_ip_address(address) in network for address in self.lookup(text(host))
+                       if _ip_address(address).version == network.version)
+        
+        def local_host_or_domain_is(host, hostdom):
+            host, hostdom = text(host).lower(), text(hostdom).lower()
+            return host == hostdom or ('.' not in host and hostdom.startswith(host + '.'))
+        
+        def convert_addr(address):
+            try:
+                return float(int(ipaddress.IPv4Address(text(address))))
+            except ValueError:
+                return 0.0
+        
+        def weekday_range(*args):
+            now, args = self._clock(list(args))
+            days = [DAYS.index(text(day).upper()) for day in args if text(day).upper() in DAYS]
+            if not days or len(days) != len(args):
+                return False
+            today = (now.tm_wday + 1) % 7
+            return _in_range((today,), (days[0],), (days[-1],))
+        
+        def date_range(*args):
+            now, args = self._clock(list(args))
+            fields = []
+            for value in args:
+                if to_string(value).upper() in MONTHS:
+                    fields.append(('month', MONTHS.index(to_string(value).upper()) + 1))
+                else:
+                    number = to_number(value)
+                    if number != number:
+                        return False
+                    fields.append(('year' if number >= 1000 else 'day', int(number)))
+            current = {'year': now.tm_year, 'month': now.tm_mon, 'day': now.tm_mday}
+            if len(fields) == 1:
+                return current[fields[0][0]] == fields[0][1]
+            half = len(fields) // 2
+            start, end = fields[:half], fields[half:]
+            if not fields or len(fields) % 2 or [kind for kind, _ in start] != [kind for kind, _ in end]:
+                return False
+            order = sorted(range(half), key=lambda index: ('year', 'month', 'day').index(start[index][0]))
+            return _in_range(tuple(current[start[index][0]] for index in order),
+                             tuple(start[index][1] for index in order), tuple(end[index][1] for index in order))
+        
+        def time_range(*args):
+            now, args = self._clock(list(args))
+            values = [to_number(value) for value in args]
+            if any(value != value for value in values) or len(values) not in (1, 2, 4, 6):
+                return False
+            values = [int(value) for value in values]
+            current = (now.tm_hour, now.tm_min, now.tm_sec)
+            if len(values) == 1:
+                return now.tm_hour == values[0]
+            half = len(values) // 2
+            return _in_range(current[:half], tuple(values[:half]), tuple(values[half:]))
+        
+        def alert(message=UNDEFINED):
+            self.alerts.append(text(message))
+        
+        def parse_int(value=UNDEFINED, radix=UNDEFINED):
+            match = re.match(r'\s*([+-]?)(0[xX])?([0-9a-zA-Z]*)', text(value))
+            base = int(to_number(radix)) if radix is not UNDEFINED and to_number(radix) == to_number(radix) else 0
+            if match.group(2) and base in (0, 16):
+                base = 16
+            base = base or 10
+            digits = ''
+            for char in match.group(3):
+                if not char.isdigit() and not char.isalpha() or int(char, 36) >= base:
+                    break
+                digits += char
+            if not digits or not 2 <= base <= 36:
+                return math.nan
+            return float(int(match.group(1) + digits, base))
+        
+        def parse_float(value=UNDEFINED):
+            match = re.match(r'\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)', text(value))
+            return float(match.group(1)) if match else math.nan
+        
+        def sh_exp_match(value=UNDEFINED, pattern=UNDEFINED):
+            return _shell_pattern(text(pattern)).match(text(value)) is not None
+        
+        def sort_ip_address_list(addresses=UNDEFINED):
+            parsed = [_ip_address(address) for address in text(addresses).split(';')]
+            if not parsed or None in parsed:
+                return False
+            return ';'.join(str(address) for address in sorted(parsed, key=lambda a: (a.version == 4, a)))
+        
+        def rounding(function):
+            def apply(x=math.nan):
+                number = to_number(x)
+                return float(function(number)) if math.isfinite(number) else number
+            return apply
+        
+        return {
+            'isPlainHostName': lambda host=UNDEFINED: '.' not in text(host),
+            'dnsDomainIs': lambda host=UNDEFINED, domain=UNDEFINED: text(host).lower().endswith(text(domain).lower()),
+            'localHostOrDomainIs': local_host_or_domain_is,
+            'isResolvable': lambda host=UNDEFINED: dns_resolve(host) is not None,
+            'isInNet': is_in_net,
+            'dnsResolve': dns_resolve,
+            'convert_addr': convert_addr,
+            'myIpAddress': lambda: next((address for address in self.my_addresses() if ':' not in address),
+                                        '127.0.0.1'),
+            'dnsDomainLevels': lambda host=UNDEFINED: float(text(host).count('.')),
+            'shExpMatch': sh_exp_match,
+            'weekdayRange': weekday_range,
+            'dateRange': date_range,
+            'timeRange': time_range,
+            'alert': alert,
+            # Microsoft's IPv6-aware extensions
+            'dnsResolveEx': lambda host=UNDEFINED: ';'.join(self.lookup(text(host))),
+            'isResolvableEx': lambda host=UNDEFINED: bool(self.lookup(text(host))),
+            'isInNetEx': is_in_net_ex,
+            'myIpAddressEx': lambda: ';'.join(self.my_addresses()),
+            'sortIpAddressList': sort_ip_address_list,
+            'getClientVersion': lambda: '1.0',
+            # The few language built-ins PAC files commonly rely on
+            'parseInt': parse_int,
+            'parseFloat': parse_float,
+            'isNaN': lambda value=UNDEFINED: to_number(value) != to_number(value),
+            'String': lambda value='': text(value) if value is not UNDEFINED else 'undefined',
+            'Number': lambda value=0.0: to_number(value),
+            'Math': {
+                'floor': rounding(math.floor),
+                'ceil': rounding(math.ceil),
+                'round': rounding(lambda number: math.floor(number + 0.5)),
+                'abs': lambda x=math.nan: abs(to_number(x)),
+                'min': lambda *values: min((to_number(v) for v in values), default=math.inf),
+                'max': lambda *values: max((to_number(v) for v in values), default=-math.inf),
+            },
+        }
+
+
+def parse_chain(result: str) -> List[Dict[str, Any]]:
+    """Split a FindProxyForURL() result such as 'PROXY a:8080; DIRECT' into entries."""
+    chain = []
+    for entry in to_string(result).split(';'):
+        parts = entry.split()
+        if not parts or parts[0].upper() not in CHAIN_TYPES:
+            continue  # Browsers skip entries they cannot parse
+        kind = parts[0].upper()
+        if kind == 'DIRECT':
+            chain.append({'type': 'DIRECT'})
+            continue
+        if len(parts) != 2:
+            continue
+        host, _, port = parts[1].rpartition(':')
+        if not host or not port.isdigit():
+            continue
+        chain.append({'type': kind, 'host': host.strip('[]'), 'port': int(port)})
+    return chain
+
+
+def format_chain(chain: List[Dict[str, Any]]) -> str:
+    return '; '.join('DIRECT' if entry['type'] == 'DIRECT' else f"{entry['type']} {entry['host']}:{entry['port']}"
+                     for entry in chain)
+
+
+def wpad_urls(domain: str) -> List[str]:
+    """WPAD DNS candidates, most specific first: wpad.a.b.c, then wpad.b.c (never a bare TLD)."""
+    labels = [label for label in domain.strip('.').lower().split('.') if label]
+    if len(labels) == 1:
+        return [f"http://wpad.{labels[0]}/{WPAD_FILE}"]
+    return [f"http://wpad.{'.'.join(labels[index:])}/{WPAD_FILE}" for index in range(len(labels) - 1)]
+
+
+def local_domain() -> Optional[str]:
+    """This machine's DNS domain, as WPAD discovery searches it."""
+    domain = os.environ.get('USERDNSDOMAIN')
+    if not domain:
+        fqdn = socket.getfqdn()
+        domain = fqdn.partition('.')[2] if '.' in fqdn else None
+    return domain.lower() if domain else None
+
+
+class PacLoader:
+    """Fetches PAC scripts and keeps compiled scripts, on disk and in memory.
+    
+    Downloaded scripts are stored with their validators and reused for
+    PAC_REFRESH seconds, then revalidated with a conditional request. Parse
+    trees are stored by content digest, so an unchanged script is never
+    parsed twice.
+    """
+    
+    def __init__(self, config_dir: Path):
+        self.cache_dir = Path(config_dir) / PAC_CACHE_DIR
+        self._scripts = {}
+    
+    def _cache_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / (hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + suffix)
+    
+    def _load_meta(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(self._cache_path(key, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _save_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        atomic_write_text(self._cache_path(key, '.json'), json.dumps(meta, indent=2))
+    
+    def fetch(self, source: str) -> Tuple[str, str]:
+        """The script text for a source and where it came from.
+        
+        The source is a file path, a file:, http: or https: URL, 'wpad' or
+        'wpad:<domain>'.
+        """
+        if source.lower() == 'wpad' or source.lower().startswith('wpad:'):
+            return self._discover(source.partition(':')[2] or local_domain())
+        if re.match(r'^https?://', source, re.IGNORECASE):
+            return self._fetch_http(source), source
+        if source.lower().startswith('file:'):
+            source = urllib.request.url2pathname(urllib.parse.urlparse(source).path)
+        path = Path(source).expanduser()
+        try:
+            return path.read_bytes().decode('utf-8-sig', errors='replace'), str(path)
+        except OSError as e:
+            raise PacError(f"cannot read PAC file {path}: {e.strerror or e}")
+    
+    def _fetch_http(self, url: str, refresh: float = PAC_REFRESH) -> str:
+        meta = self._load_meta(url)
+        script_path = self._cache_path(url, '.pac')
+        cached = None
+        if meta:
+            try:
+                cached = script_path.read_text(encoding='utf-8')
+            except OSError:
+                meta = {}
+        if cached is not None and time.time() - meta.get('checked', 0) < refresh:
+            return cached
+        
+        request = urllib.request.Request(url, headers={'User-Agent': 'ProxyManX-PAC'})
+        if cached is not None and meta.get('etag'):
+            request.add_header('If-None-Match', meta['etag'])
+        if cached is not None and meta.get('last_modified'):
+            request.add_header('If-Modified-Since', meta['last_modified'])
+        # WPAD and PAC servers are reached directly, never through a proxy they describe
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        try:
+            with opener.open(request, timeout=min(PAC_TIMEOUT, time_remaining() or PAC_TIMEOUT)) as response:
+                text = response.read().decode('utf-8-sig', errors='replace')
+                validators = {'etag': response.headers.get('ETag'),
+                              'last_modified': response.headers.get('Last-Modified')}
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self._save_meta(url, dict(meta, checked=time.time()))
+                return cached
+            raise PacError(f"cannot fetch {url}: HTTP {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            if cached is not None:
+                print_warning(f"Cannot reach {url} ({getattr(e, 'reason', e)}); using the cached PAC script")
+                return cached
+            raise PacError(f"cannot fetch {url}: {getattr(e, 'reason', e)}")
+        
+        atomic_write_text(script_path, text)
+        self._save_meta(url, dict(validators, checked=time.time()))
+        return text
+    
+    def _discover(self, domain: Optional[str]) -> Tuple[str, str]:
+        """WPAD via DNS: the first wpad.<domain> host that serves wpad.dat."""
+        if not domain:
+            raise PacError("WPAD needs a DNS domain; use --pac wpad:<domain>")
+        key = f"wpad:{domain}"
+        meta = self._load_meta(key)
+        candidates = wpad_urls(domain)
+        if meta.get('url') in candidates and time.time() - meta.get('checked', 0) < PAC_REFRESH:
+            candidates.remove(meta['url'])
+            candidates.insert(0, meta['url'])
+        errors = []
+        for url in candidates:
+            try:
+                text = self._fetch_http(url)
+            except PacError as e:
+                errors.append(str(e))
+                continue
+            if meta.get('url') != url or time.time() - meta.get('checked', 0) >= PAC_REFRESH:
+                self._save_meta(key, {'url': url, 'checked': time.time()})
+            return text, url
+        raise PacError(f"WPAD found no PAC script for {domain} ({'; '.join(errors)})")
+    
+    def compile(self, text: str) -> Script:
+        """The compiled script for a source text, parsing it only if no cached tree exists."""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        script = self._scripts.get(digest)
+        if script is not None:
+            return script
+        
+        tree_path = self.cache_dir / f"{digest[:32]}.ast"
+        tree = None
+        try:
+            with open(tree_path, 'rb') as f:
+                version, tree = marshal.load(f)
+            if version != AST_VERSION:
+                tree = None
+        except (OSError, EOFError, ValueError, TypeError):
+            tree = None
+        if tree is None:
+            try:
+                script = Script.from_source(text)
+            except PacScriptError as e:
+                raise PacError(f"invalid PAC script: {e}")
+            self._store_tree(tree_path, script.tree)
+        else:
+            script = Script(tree)
+        self._scripts[digest] = script
+        return script
+    
+    def _store_tree(self, path: Path, tree: list) -> None:
+        """Write a parse tree atomically (best effort: the cache is only an optimization)."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((AST_VERSION, tree), f)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError):
+            pass
+
+
+class PacEngine:
+    """Resolves URLs through a PAC script, reloading it only when its text changes.
+    
+    Results are cached per URL for scripts that do not depend on the time of
+    day or on the local address, for as long as DNS answers are.
+    """
+    
+    def __init__(self, config_dir: Path, source: str = 'wpad', helpers: Optional[PacHelpers] = None):
+        self.source = source
+        self.loader = PacLoader(config_dir)
+        self.helpers = helpers or PacHelpers()
+        self.origin = None
+        self._digest = None
+        self._script = None
+        self._globals = None
+        self._entry = None
+        self._results = {}
+        self._cacheable = False
+        self._lock = threading.RLock()
+    
+    def refresh(self) -> bool:
+        """Reload the script if its text changed; True when it did."""
+        text, origin = self.loader.fetch(self.source)
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            self.origin = origin
+            if digest == self._digest:
+                return False
+            script = self.loader.compile(text)
+            try:
+                scope = script.instantiate(self.helpers.builtins())
+            except PacScriptError as e:
+                raise PacError(f"PAC script failed to load: {e}")
+            entry = next((name for name in ('FindProxyForURLEx', 'FindProxyForURL')
+                          if name in scope.variables and callable(scope.variables[name])), None)
+            if entry is None:
+                raise PacError("PAC script does not define FindProxyForURL(url, host)")
+            self._digest, self._script, self._globals, self._entry = digest, script, scope, entry
+            self._cacheable = not (script.names & UNCACHEABLE_HELPERS)
+            self._results = {}
+            return True
+    
+    def find_proxy(self, url: str) -> str:
+        """The raw FindProxyForURL() answer for a URL."""
+        if self._script is None:
+            self.refresh()
+        parts = urllib.parse.urlsplit(url if '://' in url else f"http://{url}")
+        host = (parts.hostname or '').lower()
+        if not host:
+            raise PacError(f"not a URL: {url}")
+        # Like browsers, hide the path and query of https URLs from the script
+        if parts.scheme.lower() in ('https', 'wss'):
+            url = f"{parts.scheme}://{parts.netloc}/"
+        elif '://' not in url:
+            url = f"http://{url}"
+        
+        with self._lock:
+            cached = self._results.get(url) if self._cacheable else None
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            try:
+                result = self._script.call(self._globals, self._entry, url, host)
+            except PacScriptError as e:
+                raise PacError(f"FindProxyForURL failed for {url}: {e}")
+            result = 'DIRECT' if result is None or result is UNDEFINED or to_string(result).strip() == '' \
+                else to_string(result)
+            if self._cacheable:
+                self._results[url] = (time.monotonic() + self.helpers.ttl, result)
+            return result
+    
+    def resolve(self, url: str) -> List[Dict[str, Any]]:
+        """The proxy chain for a URL, in the order a client should try it."""
+        return parse_chain(self.find_proxy(url))
+
+
+def static_profile(chain: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """A fixed profile for the first HTTP proxy in a chain (None when there is none)."""
+    proxy = next((entry for entry in chain if entry['type'] in ('PROXY', 'HTTP', 'HTTPS')), None)
+    if proxy is None:
+        return None
+    return {
+        'http_host': proxy['host'], 'http_port': proxy['port'],
+        'https_host': proxy['host'], 'https_port': proxy['port'],
+        'ftp_host': proxy['host'], 'ftp_port': proxy['port'],
+        'use_auth': False, 'username': '', 'password': '',
+        'no_proxy': get_default_no_proxy(), 'use_same': True
+    }
+
+
+def resolve_urls(config_manager, urls: List[str], source: Optional[str] = None, save_as: Optional[str] = None,
+                 json_output: bool = False) -> bool:
+    """Print the proxy chain for each URL; optionally save the first answer as a static profile."""
+    started = time.perf_counter()
+    engine = PacEngine(config_manager.config_dir, source or 'wpad')
+    try:
+        engine.refresh()
+    except PacError as e:
+        print_error(str(e))
+        if json_output:
+            emit_json({'type': 'result', 'command': 'resolve', 'status': 'error', 'error': str(e)})
+        return False
+    
+    if not json_output:
+        print_header("PAC Resolution")
+        print_colored(f"Script: {engine.origin}", get_colors()['cyan'])
+    
+    chains = []
+    ok = True
+    for url in urls:
+        try:
+            chain = engine.resolve(url)
+        except PacError as e:
+            print_error(str(e))
+            ok = False
+            if json_output:
+                emit_json({'type': 'resolve', 'url': url, 'error': str(e)})
+            continue
+        chains.append(chain)
+        if json_output:
+            emit_json({'type': 'resolve', 'url': url, 'result': format_chain(chain), 'chain': chain})
+        else:
+            print_colored(f"{url}", get_colors()['white'])
+            print_colored(f"  -> {format_chain(chain) or '(no usable entries)'}",
+                          get_colors()['green'] if chain else get_colors()['yellow'])
+    for message in engine.helpers.alerts:
+        print_info(f"PAC alert: {message}")
+    
+    saved = None
+    if save_as and chains:
+        profile = static_profile(chains[0])
+        if profile is None:
+            print_error(f"{urls[0]} resolves to {format_chain(chains[0]) or 'nothing'}: no HTTP proxy to save")
+            ok = False
+        elif config_manager.save_config(save_as, profile):
+            saved = save_as
+            print_info(f"Apply it with 'proxymanx load {save_as}'")
+        else:
+            ok = False
+    
+    if json_output:
+        emit_json({'type': 'result', 'command': 'resolve', 'status': 'ok' if ok else 'failed',
+                   'source': engine.origin, 'saved': saved,
+                   'duration_ms': round((time.perf_counter() - started) * 1000, 1)})
+    return ok
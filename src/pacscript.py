@@ -0,0 +1,1343 @@
+"""
+ProxyManX Windows - PAC Script Language
+Parser and evaluator for the JavaScript subset PAC files are written in.
+Scripts only see the globals they are given and run under a step budget, so a
+PAC file cannot reach the file system or the network, or loop forever.
+"""
+
+import math
+import re
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# Bump when the parse tree format changes, so cached trees are not reused
+AST_VERSION = 1
+
+# Loop iterations and function calls allowed per evaluation
+STEP_BUDGET = 1_000_000
+
+KEYWORDS = {'var', 'let', 'const', 'function', 'return', 'if', 'else', 'for', 'while', 'do', 'break',
+            'continue', 'switch', 'case', 'default', 'true', 'false', 'null', 'undefined', 'typeof',
+            'in', 'void', 'try', 'catch', 'finally', 'throw', 'new', 'this', 'delete', 'instanceof'}
+
+TOKEN_RE = re.compile(r'''
+    (?P<skip>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<num>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<str>"(?:[^"\\\n]|\\.|\\\n)*"|'(?:[^'\\\n]|\\.|\\\n)*')
+  | (?P<punct>>>>=|===|!==|>>>|<<=|>>=|&&|\|\||==|!=|<=|>=|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<|>>
+              |[{}()\[\];,.<>+\-*/%&|^!~?:=])
+''', re.S | re.X)
+
+REGEX_RE = re.compile(r'/((?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+)/([gimsuy]*)')
+ESCAPE_RE = re.compile(r'\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\n|.)', re.S)
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0', '\n': ''}
+
+# Binary operator precedence, loosest first
+PRECEDENCE = {'||': 1, '&&': 2, '|': 3, '^': 4, '&': 5, '==': 6, '!=': 6, '===': 6, '!==': 6,
+              '<': 7, '>': 7, '<=': 7, '>=': 7, 'in': 7, '<<': 8, '>>': 8, '>>>': 8,
+              '+': 9, '-': 9, '*': 10, '/': 10, '%': 10}
+ASSIGN_OPS = {'=', '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=', '>>>='}
+
+
+class PacScriptError(Exception):
+    """A PAC script could not be parsed or failed while running."""
+
+
+class _Undefined:
+    """JavaScript's undefined (None stands for null)."""
+    
+    def __repr__(self):
+        return 'undefined'
+    
+    def __bool__(self):
+        return False
+
+
+UNDEFINED = _Undefined()
+
+
+class _Thrown(Exception):
+    """A value thrown by the script's own throw statement."""
+    
+    def __init__(self, value):
+        super().__init__(value)
+        self.value = value
+
+
+# Tokenizer
+
+def _unescape(body: str) -> str:
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in 'ux' and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return ESCAPES.get(escape, escape)
+    return ESCAPE_RE.sub(replace, body)
+
+
+def tokenize(source: str) -> List[Tuple[str, Any, int]]:
+    """Split a script into (kind, value, offset) tokens."""
+    tokens = []
+    position = 0
+    length = len(source)
+    while position < length:
+        if source[position] == '/' and _regex_allowed(tokens):
+            match = REGEX_RE.match(source, position)
+            if match:
+                tokens.append(('regex', (match.group(1), match.group(2)), position))
+                position = match.end()
+                continue
+        match = TOKEN_RE.match(source, position)
+        if not match:
+            raise PacScriptError(f"unexpected character {source[position]!r} at offset {position}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'num':
+            tokens.append(('num', float(int(text, 16)) if text[1:2] in 'xX' else float(text), position))
+        elif kind == 'str':
+            tokens.append(('str', _unescape(text[1:-1]), position))
+        elif kind != 'skip':
+            tokens.append((kind, text, position))
+        position = match.end()
+    tokens.append(('eof', None, length))
+    return tokens
+
+
+def _regex_allowed(tokens: List[Tuple[str, Any, int]]) -> bool:
+    """A slash starts a regex literal unless it follows something that ends an expression."""
+    if not tokens:
+        return True
+    kind, value, _ = tokens[-1]
+    if kind == 'punct':
+        return value not in (')', ']', '}')
+    return kind == 'name' and value in KEYWORDS and value not in ('this', 'true', 'false', 'null', 'undefined')
+
+
+# Parser: produces a tree of tuples and lists only, so it can be cached with marshal
+
+class _Parser:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = tokenize(source)
+        self.index = 0
+    
+    def peek(self, offset: int = 0) -> Tuple[str, Any, int]:
+        return self.tokens[min(self.index + offset, len(self.tokens) - 1)]
+    
+    def at(self, value: str) -> bool:
+        kind, text, _ = self.tokens[self.index]
+        return kind in ('punct', 'name') and text == value
+    
+    def accept(self, value: str) -> bool:
+        if self.at(value):
+            self.index += 1
+            return True
+        return False
+    
+    def expect(self, value: str) -> None:
+        if not self.accept(value):
+            kind, text, offset = self.peek()
+            raise PacScriptError(f"expected '{value}' but found {text if kind != 'eof' else 'end of script'!r} "
+                                 f"at offset {offset}")
+    
+    def identifier(self) -> str:
+        kind, text, offset = self.peek()
+        if kind != 'name' or text in KEYWORDS:
+            raise PacScriptError(f"expected a name but found {text!r} at offset {offset}")
+        self.index += 1
+        return text
+    
+    def program(self) -> list:
+        body = []
+        while self.peek()[0] != 'eof':
+            body.append(self.statement())
+        return body
+    
+    def block(self) -> list:
+        self.expect('{')
+        body = []
+        while not self.accept('}'):
+            if self.peek()[0] == 'eof':
+                raise PacScriptError("unterminated block")
+            body.append(self.statement())
+        return body
+    
+    def end_statement(self) -> None:
+        # Automatic semicolon insertion: a line break, '}' or the end of the script ends a statement
+        if not self.accept(';') and not self.at('}') and self.peek()[0] != 'eof':
+            kind, text, offset = self.peek()
+            if '\n' in self.source[self.tokens[self.index - 1][2]:offset]:
+                return
+            raise PacScriptError(f"expected ';' but found {text!r} at offset {offset}")
+    
+    def function_rest(self) -> Tuple[list, list]:
+        self.expect('(')
+        params = []
+        while not self.accept(')'):
+            params.append(self.identifier())
+            if not self.at(')'):
+                self.expect(',')
+        return params, self.block()
+    
+    def declarations(self) -> tuple:
+        declared = []
+        while True:
+            name = self.identifier()
+            declared.append((name, self.assignment() if self.accept('=') else None))
+            if not self.accept(','):
+                return ('var', declared)
+    
+    def statement(self) -> tuple:
+        kind, text, offset = self.peek()
+        if kind == 'punct' and text == '{':
+            return ('block', self.block())
+        if kind == 'punct' and text == ';':
+            self.index += 1
+            return ('empty',)
+        if kind != 'name' or text not in KEYWORDS:
+            expression = self.expression()
+            self.end_statement()
+            return ('expr', expression)
+        
+        self.index += 1
+        if text in ('var', 'let', 'const'):
+            node = self.declarations()
+            self.end_statement()
+            return node
+        if text == 'function':
+            name = self.identifier()
+            params, body = self.function_rest()
+            return ('function', name, params, body)
+        if text == 'return':
+            value = None
+            if not self.at(';') and not self.at('}') and self.peek()[0] != 'eof':
+                value = self.expression()
+            self.end_statement()
+            return ('return', value)
+        if text == 'if':
+            self.expect('(')
+            test = self.expression()
+            self.expect(')')
+            consequent = self.statement()
+            alternate = self.statement() if self.accept('else') else None
+            return ('if', test, consequent, alternate)
+        if text == 'for':
+            return self.for_statement()
+        if text == 'while':
+            self.expect('(')
+            test = self.expression()
+            self.expect(')')
+            return ('while', test, self.statement())
+        if text == 'do':
+            body = self.statement()
+            self.expect('while')
+            self.expect('(')
+            test = self.expression()
+            self.expect(')')
+            self.accept(';')
+            return ('dowhile', body, test)
+        if text in ('break', 'continue'):
+            self.end_statement()
+            return (text,)
+        if text == 'switch':
+            return self.switch_statement()
+        if text == 'throw':
+            value = self.expression()
+            self.end_statement()
+            return ('throw', value)
+        if text == 'try':
+            return self.try_statement()
+        # A keyword that starts an expression (typeof, true, this, ...)
+        self.index -= 1
+        expression = self.expression()
+        self.end_statement()
+        return ('expr', expression)
+    
+    def for_statement(self) -> tuple:
+        self.expect('(')
+        init = None
+        if self.at('var') or self.at('let') or self.at('const'):
+            self.index += 1
+            if self.peek(1)[1] == 'in':
+                name = self.identifier()
+                self.expect('in')
+                subject = self.expression()
+                self.expect(')')
+                return ('forin', name, subject, self.statement())
+            init = self.declarations()
+        elif not self.at(';'):
+            if self.peek()[0] == 'name' and self.peek(1)[1] == 'in':
+                name = self.identifier()
+                self.expect('in')
+                subject = self.expression()
+                self.expect(')')
+                return ('forin', name, subject, self.statement())
+            init = ('expr', self.expression())
+        self.expect(';')
+        test = None if self.at(';') else self.expression()
+        self.expect(';')
+        update = None if self.at(')') else self.expression()
+        self.expect(')')
+        return ('for', init, test, update, self.statement())
+    
+    def switch_statement(self) -> tuple:
+        self.expect('(')
+        discriminant = self.expression()
+        self.expect(')')
+        self.expect('{')
+        cases = []
+        while not self.accept('}'):
+            if self.accept('default'):
+                test = None
+            else:
+                self.expect('case')
+                test = self.expression()
+            self.expect(':')
+            body = []
+            while not (self.at('case') or self.at('default') or self.at('}')):
+                body.append(self.statement())
+            cases.append((test, body))
+        return ('switch', discriminant, cases)
+    
+    def try_statement(self) -> tuple:
+        body = self.block()
+        param, handler, finalizer = None, None, None
+        if self.accept('catch'):
+            if self.accept('('):
+                param = self.identifier()
+                self.expect(')')
+            handler = self.block()
+        if self.accept('finally'):
+            finalizer = self.block()
+        if handler is None and finalizer is None:
+            raise PacScriptError("try needs catch or finally")
+        return ('try', body, param, handler, finalizer)
+    
+    def expression(self) -> tuple:
+        expression = self.assignment()
+        if self.at(','):
+            sequence = [expression]
+            while self.accept(','):
+                sequence.append(self.assignment())
+            return ('seq', sequence)
+        return expression
+    
+    def assignment(self) -> tuple:
+        target = self.conditional()
+        kind, text, offset = self.peek()
+        if kind == 'punct' and text in ASSIGN_OPS:
+            if target[0] not in ('name', 'member'):
+                raise PacScriptError(f"invalid assignment target at offset {offset}")
+            self.index += 1
+            return ('assign', text, target, self.assignment())
+        return target
+    
+    def conditional(self) -> tuple:
+        test = self.binary(1)
+        if self.accept('?'):
+            consequent = self.assignment()
+            self.expect(':')
+            return ('cond', test, consequent, self.assignment())
+        return test
+    
+    def binary(self, min_precedence: int) -> tuple:
+        left = self.unary()
+        while True:
+            kind, operator, _ = self.peek()
+            precedence = PRECEDENCE.get(operator) if kind in ('punct', 'name') else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.index += 1
+            right = self.binary(precedence + 1)
+            left = ('logic' if operator in ('&&', '||') else 'bin', operator, left, right)
+    
+    def unary(self) -> tuple:
+        kind, text, offset = self.peek()
+        if kind == 'punct' and text in ('!', '-', '+', '~') or kind == 'name' and text in ('typeof', 'void'):
+            self.index += 1
+            return ('unary', text, self.unary())
+        if kind == 'punct' and text in ('++', '--'):
+            self.index += 1
+            return ('update', text, True, self.unary())
+        expression = self.postfix()
+        kind, text, _ = self.peek()
+        if kind == 'punct' and text in ('++', '--'):
+            self.index += 1
+            return ('update', text, False, expression)
+        return expression
+    
+    def postfix(self) -> tuple:
+        expression = self.primary()
+        while True:
+            if self.accept('.'):
+                kind, name, offset = self.peek()
+                if kind != 'name':
+                    raise PacScriptError(f"expected a property name at offset {offset}")
+                self.index += 1
+                expression = ('member', expression, ('lit', name))
+            elif self.accept('['):
+                expression = ('member', expression, self.expression())
+                self.expect(']')
+            elif self.accept('('):
+                arguments = []
+                while not self.accept(')'):
+                    arguments.append(self.assignment())
+                    if not self.at(')'):
+                        self.expect(',')
+                expression = ('call', expression, arguments)
+            else:
+                return expression
+    
+    def primary(self) -> tuple:
+        kind, text, offset = self.peek()
+        self.index += 1
+        if kind == 'num' or kind == 'str':
+            return ('lit', text)
+        if kind == 'regex':
+            return ('regex', text[0], text[1])
+        if kind == 'name':
+            if text == 'true' or text == 'false':
+                return ('lit', text == 'true')
+            if text == 'null':
+                return ('lit', None)
+            if text == 'undefined':
+                return ('undef',)
+            if text == 'function':
+                name = None if self.at('(') else self.identifier()
+                params, body = self.function_rest()
+                return ('func', name, params, body)
+            if text not in KEYWORDS:
+                return ('name', text)
+        if kind == 'punct' and text == '(':
+            expression = self.expression()
+            self.expect(')')
+            return expression
+        if kind == 'punct' and text == '[':
+            items = []
+            while not self.accept(']'):
+                items.append(self.assignment())
+                if not self.at(']'):
+                    self.expect(',')
+            return ('array', items)
+        if kind == 'punct' and text == '{':
+            entries = []
+            while not self.accept('}'):
+                key_kind, key, _ = self.peek()
+                if key_kind not in ('name', 'str', 'num'):
+                    raise PacScriptError(f"invalid object key at offset {offset}")
+                self.index += 1
+                self.expect(':')
+                entries.append((to_string(key), self.assignment()))
+                if not self.at('}'):
+                    self.expect(',')
+            return ('object', entries)
+        raise PacScriptError(f"unexpected {text if kind != 'eof' else 'end of script'!r} at offset {offset}")
+
+
+def parse(source: str) -> list:
+    """Parse a script into its tree (a list of statements)."""
+    try:
+        return _Parser(source).program()
+    except RecursionError:
+        raise PacScriptError("script is nested too deeply")
+
+
+# Values
+
+def to_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if value is UNDEFINED:
+        return 'undefined'
+    if value is None:
+        return 'null'
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        if value != value:
+            return 'NaN'
+        if value in (math.inf, -math.inf):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return str(int(value)) if float(value).is_integer() and abs(value) < 1e21 else repr(float(value))
+    if isinstance(value, list):
+        return ','.join('' if item is None or item is UNDEFINED else to_string(item) for item in value)
+    if isinstance(value, JSRegExp):
+        return f"/{value.source}/{value.flags}"
+    if callable(value):
+        return 'function'
+    return '[object Object]'
+
+
+def to_number(value: Any) -> float:
+    if value is True or value is False:
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return value
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0.0
+        try:
+            return float(int(text, 16)) if text[:2] in ('0x', '0X') else float(text)
+        except ValueError:
+            return math.nan
+    if isinstance(value, list) and len(value) <= 1:
+        return to_number(to_string(value))
+    return math.nan
+
+
+def _to_int32(value: Any) -> int:
+    number = to_number(value)
+    if number != number or number in (math.inf, -math.inf):
+        return 0
+    number = int(number) & 0xFFFFFFFF
+    return number - 0x100000000 if number & 0x80000000 else number
+
+
+def truthy(value: Any) -> bool:
+    if value is None or value is UNDEFINED or value is False:
+        return False
+    if isinstance(value, (int, float)) and value is not True:
+        return value == value and value != 0
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+
+def typeof(value: Any) -> str:
+    if value is UNDEFINED:
+        return 'undefined'
+    if value is True or value is False:
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if callable(value):
+        return 'function'
+    return 'object'
+
+
+def strict_equals(left: Any, right: Any) -> bool:
+    if typeof(left) != typeof(right):
+        return False
+    if isinstance(left, (str, int, float)) or left is None or left is UNDEFINED:
+        return left == right
+    return left is right
+
+
+def loose_equals(left: Any, right: Any) -> bool:
+    if (left is None or left is UNDEFINED) and (right is None or right is UNDEFINED):
+        return True
+    if left is None or left is UNDEFINED or right is None or right is UNDEFINED:
+        return False
+    if typeof(left) == typeof(right):
+        return strict_equals(left, right)
+    if isinstance(left, (list, dict)) and isinstance(right, (list, dict)):
+        return False
+    if isinstance(left, (list, dict)) or isinstance(right, (list, dict)):
+        return to_string(left) == to_string(right)
+    return to_number(left) == to_number(right)
+
+
+def _compare(operator: str, left: Any, right: Any) -> bool:
+    if isinstance(left, str) and isinstance(right, str):
+        pass
+    else:
+        left, right = to_number(left), to_number(right)
+        if left != left or right != right:
+            return False
+    if operator == '<':
+        return left < right
+    if operator == '>':
+        return left > right
+    if operator == '<=':
+        return left <= right
+    return left >= right
+
+
+def _add(left: Any, right: Any) -> Any:
+    if isinstance(left, (str, list, dict)) or isinstance(right, (str, list, dict)):
+        return to_string(left) + to_string(right)
+    return to_number(left) + to_number(right)
+
+
+def _arithmetic(operator: str, left: Any, right: Any) -> Any:
+    if operator == '+':
+        return _add(left, right)
+    if operator in ('-', '*', '/', '%'):
+        left, right = to_number(left), to_number(right)
+        if operator == '-':
+            return left - right
+        if operator == '*':
+            return left * right
+        if operator == '/':
+            if right == 0:
+                if left == 0 or left != left:
+                    return math.nan
+                return math.copysign(math.inf, left) * math.copysign(1, right)
+            return left / right
+        if right == 0 or left != left or right != right or left in (math.inf, -math.inf):
+            return math.nan
+        return math.fmod(left, right)
+    if operator == '>>>':
+        return float((_to_int32(left) & 0xFFFFFFFF) >> (_to_int32(right) & 31))
+    left, right = _to_int32(left), _to_int32(right)
+    if operator == '&':
+        return float(left & right)
+    if operator == '|':
+        return float(_to_int32(left | right))
+    if operator == '^':
+        return float(_to_int32(left ^ right))
+    if operator == '<<':
+        return float(_to_int32(left << (right & 31)))
+    return float(left >> (right & 31))
+
+
+class JSRegExp:
+    """A regex literal; JavaScript and Python syntax agree for what PAC files use."""
+    
+    def __init__(self, source: str, flags: str):
+        self.source = source
+        self.flags = flags
+        options = (re.IGNORECASE if 'i' in flags else 0) | (re.MULTILINE if 'm' in flags else 0) | \
+                  (re.DOTALL if 's' in flags else 0)
+        try:
+            self.pattern = re.compile(source.replace('(?<', '(?P<').replace('(?P<=', '(?<=')
+                                      .replace('(?P<!', '(?<!'), options)
+        except re.error as e:
+            raise PacScriptError(f"invalid regular expression /{source}/: {e}")
+    
+    @property
+    def is_global(self) -> bool:
+        return 'g' in self.flags
+
+
+class JSFunction:
+    """A function defined by the script, closing over the scope it was defined in."""
+    
+    def __init__(self, name: Optional[str], params: List[str], body: Callable, hoisted: Tuple,
+                 scope: 'Scope'):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.hoisted = hoisted
+        self.scope = scope
+    
+    def __call__(self, *arguments):
+        runtime = self.scope.runtime
+        runtime.tick()
+        scope = Scope(self.scope, runtime)
+        variables = scope.variables
+        for name in self.hoisted[0]:
+            variables[name] = UNDEFINED
+        for index, name in enumerate(self.params):
+            variables[name] = arguments[index] if index < len(arguments) else UNDEFINED
+        variables['arguments'] = list(arguments)
+        for name, params, body, hoisted in self.hoisted[1]:
+            variables[name] = JSFunction(name, params, body, hoisted, scope)
+        signal = self.body(scope)
+        if signal is not None and signal[0] == 'return':
+            return signal[1]
+        return UNDEFINED
+
+
+class Runtime:
+    """Per-evaluation state: the remaining step budget."""
+    
+    def __init__(self, budget: int = STEP_BUDGET):
+        self.remaining = budget
+    
+    def tick(self) -> None:
+        self.remaining -= 1
+        if self.remaining < 0:
+            raise PacScriptError("script exceeded its step budget (infinite loop?)")
+
+
+class Scope:
+    def __init__(self, parent: Optional['Scope'], runtime: Runtime):
+        self.variables = {}
+        self.parent = parent
+        self.runtime = runtime
+    
+    def lookup(self, name: str) -> Any:
+        scope = self
+        while scope is not None:
+            variables = scope.variables
+            if name in variables:
+                return variables[name]
+            scope = scope.parent
+        raise PacScriptError(f"{name} is not defined")
+    
+    def assign(self, name: str, value: Any) -> None:
+        scope = self
+        while scope is not None:
+            if name in scope.variables:
+                scope.variables[name] = value
+                return
+            if scope.parent is None:
+                scope.variables[name] = value  # Sloppy-mode implicit global
+                return
+            scope = scope.parent
+
+
+# Built-in methods on strings, arrays and regexes
+
+def _index(value: Any, default: int = 0) -> int:
+    number = to_number(value) if value is not UNDEFINED else default
+    if number != number:
+        return 0
+    if number in (math.inf, -math.inf):
+        return 2 ** 31 if number > 0 else -2 ** 31
+    return int(number)
+
+
+def _slice_bounds(length: int, start: Any, end: Any) -> Tuple[int, int]:
+    start = _index(start)
+    end = length if end is UNDEFINED else _index(end)
+    start = max(length + start, 0) if start < 0 else min(start, length)
+    end = max(length + end, 0) if end < 0 else min(end, length)
+    return start, end
+
+
+def _replacement(template: str) -> Callable:
+    def expand(match):
+        def substitute(reference):
+            token = reference.group(1)
+            if token == '$':
+                return '$'
+            if token == '&':
+                return match.group(0)
+            index = int(token)
+            if index <= (match.re.groups or 0):
+                return match.group(index) or ''
+            return reference.group(0)
+        return re.sub(r'\$(\$|&|\d{1,2})', substitute, template)
+    return expand
+
+
+def _string_method(text: str, name: str) -> Optional[Callable]:
+    def arg(arguments, index, default=UNDEFINED):
+        return arguments[index] if index < len(arguments) else default
+    
+    def index_of(*a):
+        start = min(max(_index(arg(a, 1)), 0), len(text))
+        return float(text.find(to_string(arg(a, 0)), start))
+    
+    def last_index_of(*a):
+        return float(text.rfind(to_string(arg(a, 0))))
+    
+    def substring(*a):
+        start = min(max(_index(arg(a, 0)), 0), len(text))
+        end = len(text) if arg(a, 1) is UNDEFINED else min(max(_index(arg(a, 1)), 0), len(text))
+        return text[min(start, end):max(start, end)]
+    
+    def substr(*a):
+        start = _index(arg(a, 0))
+        start = max(len(text) + start, 0) if start < 0 else start
+        length = len(text) - start if arg(a, 1) is UNDEFINED else max(_index(arg(a, 1)), 0)
+        return text[start:start + length]
+    
+    def slice_(*a):
+        start, end = _slice_bounds(len(text), arg(a, 0), arg(a, 1))
+        return text[start:end]
+    
+    def split(*a):
+        separator = arg(a, 0)
+        if separator is UNDEFINED:
+            parts = [text]
+        elif isinstance(separator, JSRegExp):
+            parts = separator.pattern.split(text)
+        else:
+            separator = to_string(separator)
+            parts = list(text) if separator == '' else text.split(separator)
+        limit = arg(a, 1)
+        return parts if limit is UNDEFINED else parts[:_index(limit)]
+    
+    def replace(*a):
+        pattern, replacement = arg(a, 0), arg(a, 1)
+        expand = replacement if callable(replacement) and not isinstance(replacement, str) else None
+        if isinstance(pattern, JSRegExp):
+            regex, count = pattern.pattern, 0 if pattern.is_global else 1
+        else:
+            regex, count = re.compile(re.escape(to_string(pattern))), 1
+        if expand is not None:
+            return regex.sub(lambda m: to_string(expand(m.group(0), *[g if g is not None else UNDEFINED
+                                                                       for g in m.groups()])),
+                             text, count=count)
+        return regex.sub(_replacement(to_string(replacement)), text, count=count)
+    
+    def match(*a):
+        pattern = arg(a, 0)
+        regex = pattern if isinstance(pattern, JSRegExp) else JSRegExp(to_string(pattern), '')
+        if regex.is_global:
+            found = [m.group(0) for m in regex.pattern.finditer(text)]
+            return found or None
+        found = regex.pattern.search(text)
+        if not found:
+            return None
+        return [found.group(0)] + [g if g is not None else UNDEFINED for g in found.groups()]
+    
+    def search(*a):
+        pattern = arg(a, 0)
+        regex = pattern if isinstance(pattern, JSRegExp) else JSRegExp(to_string(pattern), '')
+        found = regex.pattern.search(text)
+        return float(found.start()) if found else -1.0
+    
+    def char_at(*a):
+        index = _index(arg(a, 0))
+        return text[index] if 0 <= index < len(text) else ''
+    
+    def char_code_at(*a):
+        index = _index(arg(a, 0))
+        return float(ord(text[index])) if 0 <= index < len(text) else math.nan
+    
+    methods = {
+        'indexOf': index_of,
+        'lastIndexOf': last_index_of,
+        'substring': substring,
+        'substr': substr,
+        'slice': slice_,
+        'split': split,
+        'replace': replace,
+        'match': match,
+        'search': search,
+        'charAt': char_at,
+        'charCodeAt': char_code_at,
+        'toLowerCase': lambda *a: text.lower(),
+        'toUpperCase': lambda *a: text.upper(),
+        'trim': lambda *a: text.strip(),
+        'startsWith': lambda *a: text.startswith(to_string(arg(a, 0))),
+        'endsWith': lambda *a: text.endswith(to_string(arg(a, 0))),
+        'includes': lambda *a: to_string(arg(a, 0)) in text,
+        'concat': lambda *a: text + ''.join(to_string(item) for item in a),
+        'toString': lambda *a: text,
+    }
+    return methods.get(name)
+
+
+def _array_method(items: list, name: str) -> Optional[Callable]:
+    def index_of(*a):
+        for index, item in enumerate(items):
+            if a and strict_equals(item, a[0]):
+                return float(index)
+        return -1.0
+    
+    def push(*a):
+        items.extend(a)
+        return float(len(items))
+    
+    def slice_(*a):
+        start, end = _slice_bounds(len(items), a[0] if a else UNDEFINED, a[1] if len(a) > 1 else UNDEFINED)
+        return items[start:end]
+    
+    methods = {
+        'indexOf': index_of,
+        'includes': lambda *a: index_of(*a) >= 0,
+        'push': push,
+        'pop': lambda *a: items.pop() if items else UNDEFINED,
+        'shift': lambda *a: items.pop(0) if items else UNDEFINED,
+        'join': lambda *a: (',' if not a or a[0] is UNDEFINED else to_string(a[0])).join(
+            '' if item is None or item is UNDEFINED else to_string(item) for item in items),
+        'slice': slice_,
+        'concat': lambda *a: items + [x for item in a for x in (item if isinstance(item, list) else [item])],
+        'toString': lambda *a: to_string(items),
+    }
+    return methods.get(name)
+
+
+def get_member(value: Any, key: Any) -> Any:
+    """value[key] with JavaScript semantics for the types scripts can create."""
+    if value is None or value is UNDEFINED:
+        raise PacScriptError(f"cannot read property '{to_string(key)}' of {to_string(value)}")
+    if isinstance(value, dict):
+        return value.get(to_string(key), UNDEFINED)
+    if isinstance(value, (str, list)):
+        if isinstance(key, (int, float)) and not isinstance(key, bool):
+            index = int(key) if float(key).is_integer() else -1
+            return value[index] if 0 <= index < len(value) else UNDEFINED
+        name = to_string(key)
+        if name == 'length':
+            return float(len(value))
+        if name.isdigit():
+            return get_member(value, float(name))
+        method = _string_method(value, name) if isinstance(value, str) else _array_method(value, name)
+        return UNDEFINED if method is None else method
+    if isinstance(value, JSRegExp):
+        name = to_string(key)
+        if name == 'test':
+            return lambda *a: value.pattern.search(to_string(a[0] if a else UNDEFINED)) is not None
+        if name == 'exec':
+            return lambda *a: _string_method(to_string(a[0] if a else UNDEFINED), 'match')(
+                JSRegExp(value.source, value.flags.replace('g', '')))
+        if name == 'source':
+            return value.source
+        return UNDEFINED
+    return UNDEFINED
+
+
+def set_member(target: Any, key: Any, value: Any) -> None:
+    if isinstance(target, dict):
+        target[to_string(key)] = value
+    elif isinstance(target, list) and isinstance(key, (int, float)) and float(key).is_integer() and key >= 0:
+        index = int(key)
+        target.extend([UNDEFINED] * (index + 1 - len(target)))
+        target[index] = value
+    elif target is None or target is UNDEFINED:
+        raise PacScriptError(f"cannot set property '{to_string(key)}' of {to_string(target)}")
+
+
+# Compiler: turns the tree into nested closures once, so evaluation does no dispatch on node types
+
+def _hoist(body: list) -> Tuple[List[str], List[Tuple]]:
+    """Names declared with var/let/const and function declarations anywhere in a function body."""
+    names, functions = [], []
+    
+    def visit(node):
+        if not isinstance(node, tuple) or not node:
+            return
+        kind = node[0]
+        if kind == 'var':
+            names.extend(name for name, _ in node[1])
+        elif kind == 'function':
+            functions.append((node[1], node[2], _compile_body(node[3]), _hoist(node[3])))
+        elif kind == 'forin':
+            names.append(node[1])
+            visit(node[3])
+        elif kind == 'block':
+            for child in node[1]:
+                visit(child)
+        elif kind == 'if':
+            visit(node[2])
+            visit(node[3])
+        elif kind == 'for':
+            visit(node[1])
+            visit(node[4])
+        elif kind in ('while', 'dowhile'):
+            visit(node[2] if kind == 'while' else node[1])
+        elif kind == 'switch':
+            for _, statements in node[2]:
+                for child in statements:
+                    visit(child)
+        elif kind == 'try':
+            if node[2]:
+                names.append(node[2])
+            for block in node[1], node[3] or [], node[4] or []:
+                for child in block:
+                    visit(child)
+    
+    for statement in body:
+        visit(statement)
+    return names, functions
+
+
+def _compile_body(statements: list) -> Callable:
+    compiled = [_compile_statement(statement) for statement in statements
+                if statement[0] not in ('function', 'empty')]
+    
+    def run(scope):
+        for statement in compiled:
+            signal = statement(scope)
+            if signal is not None:
+                return signal
+        return None
+    return run
+
+
+def _compile_statement(node: tuple) -> Callable:
+    kind = node[0]
+    if kind == 'expr':
+        expression = _compile_expression(node[1])
+        
+        def run(scope):
+            expression(scope)
+        return run
+    
+    if kind == 'var':
+        assignments = [(name, _compile_expression(value)) for name, value in node[1] if value is not None]
+        
+        def run(scope):
+            for name, value in assignments:
+                scope.assign(name, value(scope))
+        return run
+    
+    if kind == 'return':
+        value = _compile_expression(node[1]) if node[1] is not None else None
+        return lambda scope: ('return', value(scope) if value else UNDEFINED)
+    
+    if kind == 'if':
+        test = _compile_expression(node[1])
+        consequent = _compile_statement(node[2])
+        alternate = _compile_statement(node[3]) if node[3] is not None else None
+        
+        def run(scope):
+            if truthy(test(scope)):
+                return consequent(scope)
+            if alternate is not None:
+                return alternate(scope)
+            return None
+        return run
+    
+    if kind == 'block':
+        return _compile_body(node[1])
+    
+    if kind in ('empty', 'function'):
+        return lambda scope: None
+    
+    if kind in ('break', 'continue'):
+        signal = (kind,)
+        return lambda scope: signal
+    
+    if kind in ('for', 'while', 'dowhile'):
+        if kind == 'for':
+            init = _compile_statement(node[1]) if node[1] is not None else None
+            test = _compile_expression(node[2]) if node[2] is not None else None
+            update = _compile_expression(node[3]) if node[3] is not None else None
+            body = _compile_statement(node[4])
+        else:
+            init, update = None, None
+            test = _compile_expression(node[1] if kind == 'while' else node[2])
+            body = _compile_statement(node[2] if kind == 'while' else node[1])
+        check_first = kind != 'dowhile'
+        
+        def run(scope):
+            if init is not None:
+                init(scope)
+            first = True
+            while True:
+                scope.runtime.tick()
+                if (check_first or not first) and test is not None and not truthy(test(scope)):
+                    return None
+                first = False
+                signal = body(scope)
+                if signal is not None:
+                    if signal[0] == 'break':
+                        return None
+                    if signal[0] == 'return':
+                        return signal
+                if update is not None:
+                    update(scope)
+        return run
+    
+    if kind == 'forin':
+        name = node[1]
+        subject = _compile_expression(node[2])
+        body = _compile_statement(node[3])
+        
+        def run(scope):
+            value = subject(scope)
+            if isinstance(value, dict):
+                keys = list(value.keys())
+            elif isinstance(value, (list, str)):
+                keys = [str(index) for index in range(len(value))]
+            else:
+                keys = []
+            for key in keys:
+                scope.runtime.tick()
+                scope.assign(name, key)
+                signal = body(scope)
+                if signal is not None:
+                    if signal[0] == 'break':
+                        return None
+                    if signal[0] == 'return':
+                        return signal
+            return None
+        return run
+    
+    if kind == 'switch':
+        discriminant = _compile_expression(node[1])
+        cases = [(_compile_expression(test) if test is not None else None, _compile_body(body))
+                 for test, body in node[2]]
+        
+        def run(scope):
+            value = discriminant(scope)
+            start = None
+            for index, (test, _) in enumerate(cases):
+                if test is not None and strict_equals(value, test(scope)):
+                    start = index
+                    break
+            if start is None:
+                start = next((index for index, (test, _) in enumerate(cases) if test is None), None)
+                if start is None:
+                    return None
+            for _, body in cases[start:]:
+                signal = body(scope)
+                if signal is not None:
+                    return None if signal[0] == 'break' else signal
+            return None
+        return run
+    
+    if kind == 'throw':
+        value = _compile_expression(node[1])
+        
+        def run(scope):
+            raise _Thrown(value(scope))
+        return run
+    
+    if kind == 'try':
+        body = _compile_body(node[1])
+        param = node[2]
+        handler = _compile_body(node[3]) if node[3] is not None else None
+        finalizer = _compile_body(node[4]) if node[4] is not None else None
+        
+        def run(scope):
+            try:
+                try:
+                    return body(scope)
+                except (_Thrown, PacScriptError) as e:
+                    if handler is None or 'step budget' in str(e):
+                        raise
+                    if param:
+                        scope.assign(param, e.value if isinstance(e, _Thrown) else str(e))
+                    return handler(scope)
+            finally:
+                if finalizer is not None:
+                    signal = finalizer(scope)
+                    if signal is not None:
+                        return signal  # As in JavaScript, finally overrides the outcome
+        return run
+    
+    raise PacScriptError(f"unsupported statement: {kind}")
+
+
+def _compile_reference(node: tuple) -> Tuple[Callable, Callable]:
+    """(read, write) accessors for an assignment target."""
+    if node[0] == 'name':
+        name = node[1]
+        return (lambda scope: scope.lookup(name)), (lambda scope, value: scope.assign(name, value))
+    obj = _compile_expression(node[1])
+    key = _compile_expression(node[2])
+    
+    def locate(scope):
+        return obj(scope), key(scope)
+    
+    def read(scope):
+        target, name = locate(scope)
+        return get_member(target, name)
+    
+    def write(scope, value):
+        target, name = locate(scope)
+        set_member(target, name, value)
+    return read, write
+
+
+def _compile_expression(node: tuple) -> Callable:
+    kind = node[0]
+    if kind == 'lit':
+        value = node[1]
+        return lambda scope: value
+    
+    if kind == 'undef':
+        return lambda scope: UNDEFINED
+    
+    if kind == 'name':
+        name = node[1]
+        return lambda scope: scope.lookup(name)
+    
+    if kind == 'regex':
+        source, flags = node[1], node[2]
+        JSRegExp(source, flags)  # Report bad patterns when the script is loaded
+        return lambda scope: JSRegExp(source, flags)
+    
+    if kind == 'array':
+        items = [_compile_expression(item) for item in node[1]]
+        return lambda scope: [item(scope) for item in items]
+    
+    if kind == 'object':
+        entries = [(key, _compile_expression(value)) for key, value in node[1]]
+        return lambda scope: {key: value(scope) for key, value in entries}
+    
+    if kind == 'func':
+        name, params = node[1], node[2]
+        body, hoisted = _compile_body(node[3]), _hoist(node[3])
+        return lambda scope: JSFunction(name, params, body, hoisted, scope)
+    
+    if kind == 'member':
+        obj = _compile_expression(node[1])
+        key = _compile_expression(node[2])
+        return lambda scope: get_member(obj(scope), key(scope))
+    
+    if kind == 'call':
+        arguments = [_compile_expression(argument) for argument in node[2]]
+        callee = _compile_expression(node[1])
+        if node[1][0] == 'name':
+            description = node[1][1]
+        elif node[1][0] == 'member' and node[1][2][0] == 'lit':
+            description = f".{to_string(node[1][2][1])}"
+        else:
+            description = 'expression'
+        
+        def run(scope):
+            function = callee(scope)
+            if not callable(function):
+                raise PacScriptError(f"{to_string(description)} is not a function")
+            return function(*[argument(scope) for argument in arguments])
+        return run
+    
+    if kind == 'unary':
+        operator = node[1]
+        if operator == 'typeof' and node[2][0] == 'name':
+            name = node[2][1]
+            
+            def typeof_name(scope):
+                try:
+                    return typeof(scope.lookup(name))
+                except PacScriptError:
+                    return 'undefined'
+            return typeof_name
+        operand = _compile_expression(node[2])
+        if operator == '!':
+            return lambda scope: not truthy(operand(scope))
+        if operator == '-':
+            return lambda scope: -to_number(operand(scope))
+        if operator == '+':
+            return lambda scope: to_number(operand(scope))
+        if operator == '~':
+            return lambda scope: float(~_to_int32(operand(scope)))
+        if operator == 'typeof':
+            return lambda scope: typeof(operand(scope))
+        return lambda scope: (operand(scope), UNDEFINED)[1]
+    
+    if kind == 'update':
+        operator, prefix = node[1], node[2]
+        read, write = _compile_reference(node[3])
+        delta = 1 if operator == '++' else -1
+        
+        def run(scope):
+            old = to_number(read(scope))
+            write(scope, old + delta)
+            return old + delta if prefix else old
+        return run
+    
+    if kind == 'assign':
+        operator = node[1]
+        read, write = _compile_reference(node[2])
+        value = _compile_expression(node[3])
+        if operator == '=':
+            def run(scope):
+                result = value(scope)
+                write(scope, result)
+                return result
+        else:
+            binary = operator[:-1]
+            
+            def run(scope):
+                result = _arithmetic(binary, read(scope), value(scope))
+                write(scope, result)
+                return result
+        return run
+    
+    if kind == 'logic':
+        left = _compile_expression(node[2])
+        right = _compile_expression(node[3])
+        if node[1] == '&&':
+            def run(scope):
+                value = left(scope)
+                return right(scope) if truthy(value) else value
+        else:
+            def run(scope):
+                value = left(scope)
+                return value if truthy(value) else right(scope)
+        return run
+    
+    if kind == 'cond':
+        test = _compile_expression(node[1])
+        consequent = _compile_expression(node[2])
+        alternate = _compile_expression(node[3])
+        return lambda scope: consequent(scope) if truthy(test(scope)) else alternate(scope)
+    
+    if kind == 'seq':
+        expressions = [_compile_expression(expression) for expression in node[1]]
+        
+        def run(scope):
+            value = UNDEFINED
+            for expression in expressions:
+                value = expression(scope)
+            return value
+        return run
+    
+    if kind == 'bin':
+        operator = node[1]
+        left = _compile_expression(node[2])
+        right = _compile_expression(node[3])
+        if operator == '===':
+            return lambda scope: strict_equals(left(scope), right(scope))
+        if operator == '!==':
+            return lambda scope: not strict_equals(left(scope), right(scope))
+        if operator == '==':
+            return lambda scope: loose_equals(left(scope), right(scope))
+        if operator == '!=':
+            return lambda scope: not loose_equals(left(scope), right(scope))
+        if operator in ('<', '>', '<=', '>='):
+            return lambda scope: _compare(operator, left(scope), right(scope))
+        if operator == 'in':
+            def contains(scope):
+                key, container = left(scope), right(scope)
+                if isinstance(container, dict):
+                    return to_string(key) in container
+                if isinstance(container, list):
+                    return get_member(container, to_number(key)) is not UNDEFINED
+                raise PacScriptError("'in' needs an object")
+            return contains
+        return lambda scope: _arithmetic(operator, left(scope), right(scope))
+    
+    raise PacScriptError(f"unsupported expression: {kind}")
+
+
+class Script:
+    """A parsed and compiled PAC script, ready to be run against a set of globals."""
+    
+    def __init__(self, tree: list):
+        self.tree = tree
+        self._body = _compile_body(tree)
+        self._hoisted = _hoist(tree)
+        self.names = _referenced_names(tree)
+    
+    @classmethod
+    def from_source(cls, source: str) -> 'Script':
+        return cls(parse(source))
+    
+    def instantiate(self, builtins: Dict[str, Any]) -> Scope:
+        """Run the script's top level against fresh globals and return them."""
+        scope = Scope(None, Runtime())
+        scope.variables.update(builtins)
+        for name in self._hoisted[0]:
+            scope.variables[name] = UNDEFINED
+        for name, params, body, hoisted in self._hoisted[1]:
+            scope.variables[name] = JSFunction(name, params, body, hoisted, scope)
+        self._run(self._body, scope)
+        return scope
+    
+    def call(self, scope: Scope, name: str, *arguments) -> Any:
+        """Call a global function defined by the script with a fresh step budget."""
+        function = scope.variables.get(name)
+        if not isinstance(function, JSFunction):
+            raise PacScriptError(f"script does not define {name}()")
+        scope.runtime.remaining = STEP_BUDGET
+        return self._run(lambda _: function(*arguments), scope)
+    
+    @staticmethod
+    def _run(callback: Callable, scope: Scope) -> Any:
+        try:
+            return callback(scope)
+        except _Thrown as e:
+            raise PacScriptError(f"uncaught exception: {to_string(e.value)}")
+        except RecursionError:
+            raise PacScriptError("maximum call depth exceeded")
+        except (TypeError, ValueError, OverflowError, IndexError) as e:
+            raise PacScriptError(f"script error: {e}")
+
+
+def _referenced_names(tree: Any) -> frozenset:
+    """Every identifier the script reads or calls."""
+    names = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, tuple) and node and node[0] == 'name':
+            names.add(node[1])
+        elif isinstance(node, (tuple, list)):
+            stack.extend(child for child in node if isinstance(child, (tuple, list)))
+    return frozenset(names)
@@ -0,0 +1,204 @@
+"""
+ProxyManX Windows - Profile Picker
+Interactive fuzzy finder over saved profiles (name and endpoint).
+"""
+
+import itertools
+import os
+import re
+import sys
+from typing import List, Optional, Tuple
+from utils import *
+
+PICKER_ROWS = 10
+
+# Keys read together (a paste or a burst of typing) but not handled yet
+_pending_keys = []
+
+
+class FuzzyIndex:
+    """Incremental fuzzy matcher over a fixed list of entries.
+    
+    All entries are joined into one text buffer (one line per entry, tagged
+    with its position) so matching runs inside the regex engine. Matches
+    only shrink as the query grows, so each keystroke scans the previous
+    keystroke's narrowed buffer and backspace pops back to it. Narrowing and
+    ranking both stop after NARROW_LIMIT matching lines, so a broad query
+    costs the same with 200 or 20,000 profiles.
+    """
+    
+    NARROW_LIMIT = 500
+    
+    def __init__(self, entries: List[Tuple[str, str]]):
+        self.entries = entries
+        lines = [f"{name} {detail}".lower().replace('\n', ' ').replace('\x00', ' ') + f"\x00{position}"
+                 for position, (name, detail) in enumerate(entries)]
+        self.query = ''
+        # (buffer, count) per query length; buffer is None when too many lines matched to copy
+        self.stack = [('\n'.join(lines), len(lines))]
+    
+    def _buffer(self) -> str:
+        """Narrowest materialized buffer containing every current match."""
+        for buffer, _ in reversed(self.stack):
+            if buffer is not None:
+                return buffer
+    
+    @staticmethod
+    def _line_pattern(query: str) -> str:
+        """Pattern for a whole line whose text contains the query as a subsequence.
+        
+        Each gap excludes the character that ends it, so the engine takes the
+        earliest occurrence and a line that does not match fails in linear time.
+        """
+        gaps = ''.join(f"[^{re.escape(char)}\n\x00]*{re.escape(char)}" for char in query)
+        return '^' + gaps + '[^\n]*$'
+    
+    def push(self, char: str) -> None:
+        """Extend the query by one character."""
+        query = self.query + char.lower()
+        lines = []
+        for match in re.finditer(self._line_pattern(query), self._buffer(), re.MULTILINE):
+            lines.append(match.group())
+            if len(lines) > self.NARROW_LIMIT:
+                self.stack.append((None, None))
+                break
+        else:
+            self.stack.append(('\n'.join(lines), len(lines)))
+        self.query = query
+    
+    def pop(self) -> None:
+        """Remove the last query character."""
+        if self.query:
+            self.query = self.query[:-1]
+            self.stack.pop()
+    
+    def count(self) -> str:
+        """Number of matching entries, or 'N+' when only a lower bound is known."""
+        count = self.stack[-1][1]
+        return str(count) if count is not None else f"{self.NARROW_LIMIT}+"
+    
+    def top(self, limit: int) -> List[int]:
+        """Up to limit positions: prefix matches, then substrings, then fuzzy matches."""
+        buffer = self.stack[-1][0]
+        if buffer is None:
+            # Too many matches to rank them all; rank the first NARROW_LIMIT instead
+            matches = re.finditer(self._line_pattern(self.query), self._buffer(), re.MULTILINE)
+            buffer = '\n'.join(match.group() for match in itertools.islice(matches, self.NARROW_LIMIT))
+        literal = re.escape(self.query)
+        tiers = ['^' + literal + '[^\n]*$', '^[^\n\x00]*?' + literal + '[^\n]*$', self._line_pattern(self.query)]
+        found = []
+        for tier in (tiers if self.query else tiers[-1:]):
+            for match in re.finditer(tier, buffer, re.MULTILINE):
+                position = int(match.group().rpartition('\x00')[2])
+                if position not in found:
+                    found.append(position)
+                    if len(found) == limit:
+                        return found
+        return found
+
+
+def _read_key() -> str:
+    """Read one keypress as 'up', 'down', 'enter', 'backspace', 'escape' or a character."""
+    if os.name == 'nt':
+        import msvcrt
+        char = msvcrt.getwch()
+        if char in ('\x00', '\xe0'):
+            return {'H': 'up', 'P': 'down'}.get(msvcrt.getwch(), '')
+    else:
+        # Unbuffered read, so an arrow key's escape sequence arrives in one piece
+        if not _pending_keys:
+            data = os.read(sys.stdin.fileno(), 64).decode('utf-8', 'ignore')
+            _pending_keys.extend(re.findall(r'\x1b[\[O][0-9;]*[A-Za-z~]|.', data, re.DOTALL))
+        if not _pending_keys:
+            return 'escape'  # End of input
+        char = _pending_keys.pop(0)
+        if len(char) > 1:
+            return {'A': 'up', 'B': 'down'}.get(char[-1], '')
+    if char in ('\r', '\n'):
+        return 'enter'
+    if char in ('\x08', '\x7f'):
+        return 'backspace'
+    if char in ('\x1b', '\x03'):
+        return 'escape'
+    return char
+
+
+class _RawTerminal:
+    """Put a POSIX terminal into cbreak mode for the duration of the picker."""
+    
+    def __enter__(self):
+        self.saved = None
+        if os.name != 'nt':
+            import termios
+            import tty
+            self.saved = termios.tcgetattr(sys.stdin)
+            tty.setcbreak(sys.stdin.fileno())
+        return self
+    
+    def __exit__(self, *exc):
+        if self.saved is not None:
+            import termios
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.saved)
+
+
+def load_profile_entries(config_manager) -> List[Tuple[str, str]]:
+    """(name, 'host:port') for every saved profile, read once per session."""
+    entries = []
+    with capture_messages(always=True):
+        for name in config_manager.list_configs():
+            config = config_manager.load_config(name) or {}
+            entries.append((name, f"{config.get('http_host', '')}:{config.get('http_port', '')}"))
+    return entries
+
+
+def pick_profile(entries: List[Tuple[str, str]], rows: int = PICKER_ROWS) -> Optional[str]:
+    """Let the user filter profiles by typing; returns the chosen name or None."""
+    if not entries:
+        print_warning("No saved profiles found")
+        return None
+    if not sys.stdin.isatty() or not sys.stdout.isatty():
+        print_error("The profile picker needs an interactive terminal")
+        return None
+    
+    colors = get_colors()
+    index = FuzzyIndex(entries)
+    selected = 0
+    drawn = 0
+    
+    def draw():
+        nonlocal drawn
+        visible = index.top(rows)
+        lines = [f"{colors['cyan']}> {index.query}{colors['reset']}  ({index.count()}/{len(entries)})"]
+        for row, position in enumerate(visible):
+            name, detail = entries[position]
+            marker = f"{colors['green']}>" if row == selected else " "
+            lines.append(f"{marker} {name:30} {detail}{colors['reset']}")
+        # Cursor up over the previous frame and clear below (both understood by colorama)
+        out = (f"\r\x1b[{drawn}A" if drawn else "") + "\x1b[J" + "\n".join(lines) + "\n"
+        sys.stdout.write(out)
+        sys.stdout.flush()
+        drawn = len(lines)
+        return visible
+    
+    print_colored("Type to filter, Up/Down to move, Enter to apply, Esc to cancel", colors['cyan'])
+    with _RawTerminal():
+        visible = draw()
+        while True:
+            key = _read_key()
+            if key == 'escape':
+                return None
+            if key == 'enter':
+                return entries[visible[selected]][0] if visible else None
+            if key == 'up':
+                selected = max(selected - 1, 0)
+            elif key == 'down':
+                selected = min(selected + 1, max(len(visible) - 1, 0))
+            elif key == 'backspace':
+                index.pop()
+                selected = 0
+            elif len(key) == 1 and key.isprintable():
+                index.push(key)
+                selected = 0
+            else:
+                continue
+            visible = draw()
@@ -0,0 +1,251 @@
+"""
+ProxyManX Windows - Proxy Benchmark
+Measures time to first byte, tail latency and throughput through each profile's
+proxy by driving concurrent downloads (http targets) or CONNECT tunnels (https).
+"""
+
+import base64
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from typing import Dict, List, Any, Tuple
+from history import LatencyHistogram
+from utils import *
+
+BENCH_TIMEOUT = 10
+READ_SIZE = 64 * 1024
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 10.0
+PERCENTILES = (50, 95, 99)
+
+
+class BenchError(Exception):
+    """One benchmark request failed."""
+
+
+def _proxy_address(config: Dict[str, Any], scheme: str) -> Tuple[str, int]:
+    """The proxy a profile uses for a scheme (HTTPS falls back to the HTTP proxy)."""
+    if scheme == 'https' and config.get('https_host') and config.get('https_port'):
+        return config['https_host'], int(config['https_port'])
+    return config['http_host'], int(config['http_port'])
+
+
+def _proxy_authorization(config: Dict[str, Any]) -> str:
+    if not config.get('use_auth') or not config.get('username'):
+        return ''
+    token = base64.b64encode(f"{config['username']}:{config.get('password', '')}".encode('utf-8')).decode('ascii')
+    return f"Proxy-Authorization: Basic {token}\r\n"
+
+
+def _read_head(sock: socket.socket, buffer: bytes = b'') -> Tuple[int, Dict[str, str], bytes]:
+    """Read a response head; returns (status, lower-cased headers, body bytes already received)."""
+    while b'\r\n\r\n' not in buffer:
+        data = sock.recv(READ_SIZE)
+        if not data:
+            raise BenchError("connection closed before the response headers")
+        buffer += data
+        if len(buffer) > 65536:
+            raise BenchError("response headers too large")
+    head, _, rest = buffer.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise BenchError(f"malformed status line: {lines[0][:60]!r}")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, rest
+
+
+def fetch_once(config: Dict[str, Any], target: urllib.parse.SplitResult, insecure: bool = False
+               ) -> Dict[str, Any]:
+    """One request through the profile's proxy: tunnel, first-byte and total times (ms) and body bytes."""
+    scheme = target.scheme.lower()
+    host = target.hostname
+    port = target.port or (443 if scheme == 'https' else 80)
+    path = urllib.parse.urlunsplit(('', '', target.path or '/', target.query, ''))
+    authority = f"[{host}]:{port}" if ':' in host else f"{host}:{port}"
+    auth = _proxy_authorization(config)
+    started = time.perf_counter()
+    tunnel_ms = None
+    
+    sock = socket.create_connection(_proxy_address(config, scheme), timeout=BENCH_TIMEOUT)
+    try:
+        if scheme == 'https':
+            sock.sendall(f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n{auth}\r\n".encode('latin-1'))
+            status, _, _ = _read_head(sock)
+            if status != 200:
+                raise BenchError(f"CONNECT returned HTTP {status}")
+            tunnel_ms = (time.perf_counter() - started) * 1000
+            context = ssl.create_default_context()
+            if insecure:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            sock = context.wrap_socket(sock, server_hostname=host)
+            request = f"GET {path} HTTP/1.1\r\nHost: {target.netloc}\r\n"
+        else:
+            request = f"GET {urllib.parse.urlunsplit(target)} HTTP/1.1\r\nHost: {target.netloc}\r\n{auth}"
+        sock.sendall((request + "User-Agent: ProxyManX-Bench\r\nConnection: close\r\n\r\n").encode('latin-1'))
+        
+        first = sock.recv(READ_SIZE)
+        if not first:
+            raise BenchError("connection closed without a response")
+        ttfb_ms = (time.perf_counter() - started) * 1000
+        status, headers, body = _read_head(sock, first)
+        if not 200 <= status < 300:
+            raise BenchError(f"HTTP {status}")
+        
+        expected = int(headers['content-length']) if headers.get('content-length', '').isdigit() else None
+        received = len(body)
+        while expected is None or received < expected:
+            data = sock.recv(READ_SIZE)
+            if not data:
+                break
+            received += len(data)
+        if expected is not None and received < expected:
+            raise BenchError(f"body truncated at {received} of {expected} bytes")
+    finally:
+        sock.close()
+    return {'tunnel_ms': tunnel_ms, 'ttfb_ms': ttfb_ms,
+            'total_ms': (time.perf_counter() - started) * 1000, 'bytes': received}
+
+
+class _Worker(threading.Thread):
+    """Issues requests back to back until the end time, keeping its own statistics."""
+    
+    def __init__(self, config: Dict[str, Any], target: urllib.parse.SplitResult, until: float, insecure: bool):
+        super().__init__(daemon=True)
+        self.config = config
+        self.target = target
+        self.until = until
+        self.insecure = insecure
+        self.ttfb = LatencyHistogram()
+        self.total = LatencyHistogram()
+        self.tunnel = LatencyHistogram()
+        self.bytes = 0
+        self.errors = Counter()
+    
+    def run(self) -> None:
+        while time.perf_counter() < self.until:
+            try:
+                result = fetch_once(self.config, self.target, self.insecure)
+            except (OSError, BenchError) as e:
+                self.errors[str(e) if isinstance(e, BenchError) else e.__class__.__name__] += 1
+                time.sleep(0.01)  # A refusing proxy must not turn the loop into a busy spin
+                continue
+            self.ttfb.add(result['ttfb_ms'])
+            self.total.add(result['total_ms'])
+            if result['tunnel_ms'] is not None:
+                self.tunnel.add(result['tunnel_ms'])
+            self.bytes += result['bytes']
+
+
+def bench_profile(config: Dict[str, Any], target: str, concurrency: int = DEFAULT_CONCURRENCY,
+                  duration: float = DEFAULT_DURATION, insecure: bool = False) -> Dict[str, Any]:
+    """Drive concurrent requests through one profile's proxy for a while and summarize them."""
+    parts = urllib.parse.urlsplit(target)
+    started = time.perf_counter()
+    workers = [_Worker(config, parts, started + duration, insecure) for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    
+    ttfb, total, tunnel = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    errors = Counter()
+    received = 0
+    for worker in workers:
+        ttfb.merge(worker.ttfb)
+        total.merge(worker.total)
+        tunnel.merge(worker.tunnel)
+        errors.update(worker.errors)
+        received += worker.bytes
+    
+    host, port = _proxy_address(config, parts.scheme.lower())
+    summary = {
+        'proxy': f"{host}:{port}",
+        'requests': total.count,
+        'errors': sum(errors.values()),
+        'error_kinds': dict(errors.most_common(5)),
+        'duration_s': round(elapsed, 2),
+        'requests_per_s': round(total.count / elapsed, 1),
+        'mb_per_s': round(received / elapsed / 1e6, 2),
+        'bytes': received
+    }
+    for name, histogram in (('ttfb', ttfb), ('latency', total), ('tunnel', tunnel)):
+        if histogram.count:
+            for pct in PERCENTILES:
+                summary[f"{name}_p{pct}_ms"] = histogram.percentile(pct)
+    return summary
+
+
+def _format_ms(value) -> str:
+    return '-' if value is None else f"{value:g}"
+
+
+def run_benchmark(config_manager, profiles: List[str], target: str, concurrency: int = DEFAULT_CONCURRENCY,
+                  duration: float = DEFAULT_DURATION, insecure: bool = False, json_output: bool = False) -> bool:
+    """Benchmark each profile's proxy in turn (default: every saved profile) and print a comparison."""
+    started = time.perf_counter()
+    parts = urllib.parse.urlsplit(target)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        print_error(f"Target must be an http:// or https:// URL: {target}")
+        return False
+    
+    profiles = profiles or config_manager.list_configs()
+    if not profiles:
+        print_error("No saved profiles to benchmark")
+        return False
+    
+    if not json_output:
+        print_header("Proxy Benchmark")
+        mode = 'CONNECT tunnels + TLS' if parts.scheme.lower() == 'https' else 'proxied GETs'
+        print_colored(f"Target {target} via {mode}, {concurrency} concurrent for {duration:g}s per profile",
+                      get_colors()['cyan'])
+    
+    results = {}
+    for name in profiles:
+        config = config_manager.load_config(name)
+        if not config or not config.get('http_host') or not config.get('http_port'):
+            print_warning(f"Skipping '{name}': no proxy configured")
+            continue
+        if not json_output:
+            host, port = _proxy_address(config, parts.scheme.lower())
+            print_colored(f"Benchmarking {name} ({host}:{port})...", get_colors()['blue'])
+        summary = bench_profile(config, target, concurrency, duration, insecure)
+        results[name] = summary
+        if json_output:
+            emit_json(dict({'type': 'bench', 'profile': name}, **summary))
+    
+    ok = bool(results) and all(summary['requests'] for summary in results.values())
+    if json_output:
+        emit_json({'type': 'result', 'command': 'bench-proxy', 'status': 'ok' if ok else 'failed',
+                   'target': target, 'concurrency': concurrency,
+                   'duration_ms': round((time.perf_counter() - started) * 1000, 1)})
+        return ok
+    
+    if not results:
+        return False
+    colors = get_colors()
+    print_colored(f"\n  {'Profile':14} {'Reqs':>7} {'Errs':>5} {'TTFB p50':>9} {'p95':>8} {'p99':>8} "
+                  f"{'Total p50':>10} {'p95':>8} {'p99':>8} {'MB/s':>8}", colors['cyan'])
+    for name, summary in results.items():
+        ms = lambda key: _format_ms(summary.get(key))
+        color = colors['red'] if summary['errors'] and not summary['requests'] else \
+            colors['yellow'] if summary['errors'] else colors['white']
+        print_colored(f"  {name:14} {summary['requests']:>7} {summary['errors']:>5} {ms('ttfb_p50_ms'):>9} "
+                      f"{ms('ttfb_p95_ms'):>8} {ms('ttfb_p99_ms'):>8} {ms('latency_p50_ms'):>10} "
+                      f"{ms('latency_p95_ms'):>8} {ms('latency_p99_ms'):>8} {summary['mb_per_s']:>8}", color)
+        if summary.get('tunnel_p50_ms') is not None:
+            print_colored(f"  {'':14} CONNECT p50/p95/p99: {ms('tunnel_p50_ms')} / {ms('tunnel_p95_ms')} / "
+                          f"{ms('tunnel_p99_ms')} ms", colors['white'])
+        for kind, count in summary['error_kinds'].items():
+            print_colored(f"  {'':14} {count} x {kind}", colors['yellow'])
+    print_colored("\nLatencies in ms; percentiles are accurate to about 5%", colors['white'])
+    return ok
@@ -5,20 +5,38 @@ Core application logic for proxy management.
 
 import sys
 import os
-from typing import Dict, List, Any, Optional
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable
+from completion import COMPLETION_SCRIPTS
 from config import ConfigManager
-from targets import get_available_targets, get_target_descriptions, PROXY_TARGETS
+from dirrules import HOOK_SCRIPTS, manage_dir_rules
+from inspector import show_target_configs
+from history import parse_window
+from locking import reads_state, writes_state
+from picker import load_profile_entries, pick_profile
+from shellenv import show_env
+from status import show_status
+from targets import get_available_targets, get_target_descriptions
 from utils import *
+from watcher import MAX_INTERVAL, DriftWatcher
 
 
 class ProxyManX:
     """Main proxy management class."""
     
-    def __init__(self):
+    def __init__(self, json_output: bool = False):
         self.colors = get_colors()
+        self.json_output = json_output
         self.config_manager = ConfigManager()
+        self._profile_entries = None
         self.available_targets = get_available_targets()
+        from api import ProxySession  # asyncio and thread pools are only needed past the fast paths
+        self.session = ProxySession(self.available_targets, self.config_manager, quiet=False)
+        self.journal = self.session.journal
+        self.history = self.session.history
         self.target_descriptions = get_target_descriptions()
+        self.config_manager.refresh_completion_cache(list(self.available_targets.keys()))
     
     def interactive_set_proxy(self) -> None:
         """Interactive proxy configuration."""
@@ -109,6 +127,10 @@ class ProxyManX:
     
     def _get_target_selection(self, allow_auto_all=False) -> Optional[List[str]]:
         """Get target selection from user."""
+        # Machine-readable mode never prompts
+        if self.json_output:
+            return list(self.available_targets.keys())
+        
         # Check if we're running non-interactively (e.g., from subprocess)
         if allow_auto_all and not sys.stdin.isatty():
             # Running non-interactively, return all targets
@@ -147,27 +169,102 @@ class ProxyManX:
                     print_warning(f"Invalid target number: {index}")
             
             return selected_targets if selected_targets else None
-            
+        
         except ValueError:
             print_error("Invalid selection format")
             return None
     
-    def _apply_proxy_settings(self, config: Dict[str, Any], targets: List[str]) -> None:
-        """Apply proxy settings to selected targets."""
+    def _apply_proxy_settings(self, config: Dict[str, Any], targets: List[str],
+                              profile: Optional[str] = None, action: str = 'apply') -> bool:
+        """Apply proxy settings to selected targets as a single transaction."""
         print_header("Applying Proxy Settings")
         
-        for target_name in targets:
-            target = self.available_targets[target_name]
-            print_colored(f"Setting proxy for {target_name}...", self.colors['blue'])
-            
-            try:
-                success = target.set_proxy(config)
-                if success:
-                    print_success(f"{target_name} proxy configured")
-                else:
-                    print_error(f"Failed to configure {target_name} proxy")
-            except Exception as e:
-                print_error(f"Error configuring {target_name}: {e}")
+        return self._run_transaction(action, targets, lambda target: target.set_proxy(config),
+                                     "Setting proxy for", "proxy configured", "configure",
+                                     profile=profile)
+    
+    def _run_transaction(self, action: str, targets: List[str], operation: Callable,
+                         verb: str, done: str, failed: str, profile: Optional[str] = None) -> bool:
+        """Run an operation across targets through the session, reporting progress as it goes."""
+        started = time.perf_counter()
+        
+        def on_start(target_name: str) -> None:
+            print_colored(f"{verb} {target_name}...", self.colors['blue'])
+        
+        def on_target(outcome: 'TargetOutcome') -> None:
+            if self.json_output:
+                record = {'type': 'target', 'command': action}
+                record.update(outcome.to_dict())
+                del record['spawned']
+                emit_json(record)
+            if outcome.ok:
+                print_success(f"{outcome.target} {done}")
+            else:
+                print_error(f"Failed to {failed} {outcome.target} proxy")
+                print_warning("Rolling back all targets to their previous settings")
+        
+        result = self.session.run_transaction(action, targets, operation, profile=profile,
+                                              include_states=self.json_output, failed=failed,
+                                              on_start=on_start, on_target=on_target,
+                                              on_rollback=self._report_rollback)
+        if result.ok:
+            self._emit_result(action, 'ok', started, profile=profile)
+            return True
+        
+        if not all(result.rollback.values()):
+            print_warning("Run 'proxymanx undo' to retry the rollback")
+        for message in result.messages:
+            print_error(message)
+        if result.timed_out:
+            print_warning(f"Missed the deadline: {', '.join(result.timed_out)}")
+        self._emit_result(action, result.status, started, profile=profile,
+                          failed_target=result.failed_target, timed_out=result.timed_out)
+        return False
+    
+    def _emit_result(self, command: str, status: str, started: float, **fields) -> None:
+        """Emit the closing NDJSON record for a command in --json mode."""
+        if not self.json_output:
+            return
+        record = {
+            'type': 'result',
+            'command': command,
+            'status': status,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+        record.update(fields)
+        emit_json(record)
+    
+    def _report_rollback(self, target_name: str, restored: bool) -> None:
+        """Show whether a rolled-back target got its previous settings back."""
+        if self.json_output:
+            emit_json({'type': 'rollback', 'target': target_name,
+                       'status': 'restored' if restored else 'failed'})
+        if restored:
+            print_success(f"{target_name} restored")
+        else:
+            print_error(f"Could not restore {target_name}")
+    
+    @writes_state
+    def undo_last_transaction(self) -> None:
+        """Revert the last journaled apply/unset."""
+        print_header("Undo Last Change")
+        started = time.perf_counter()
+        
+        entry = self.journal.load()
+        if entry:
+            description = entry['action'] + (f" of profile '{entry['profile']}'" if entry.get('profile') else "")
+            print_colored(f"Reverting {description} ({', '.join(entry['targets'])})", self.colors['cyan'])
+        
+        result = self.session.undo(on_rollback=self._report_rollback)
+        if result.status == 'noop':
+            print_warning("Nothing to undo")
+            self._emit_result('undo', 'noop', started)
+        elif not result.ok:
+            print_warning("Some targets could not be restored; journal kept for another attempt")
+            self._emit_result('undo', 'failed', started, transaction=entry['id'])
+        else:
+            print_success("Previous proxy settings restored")
+            self._emit_result('undo', 'ok', started, transaction=entry['id'])
     
     def unset_proxy(self, targets: List[str] = None) -> None:
         """Unset proxy settings."""
@@ -178,27 +275,25 @@ class ProxyManX:
         
         print_header("Unsetting Proxy Settings")
         
+        selected = []
         for target_name in targets:
             if target_name not in self.available_targets:
                 print_warning(f"Target '{target_name}' is not available")
-                continue
-            
-            target = self.available_targets[target_name]
-            print_colored(f"Unsetting proxy for {target_name}...", self.colors['blue'])
-            
-            try:
-                success = target.unset_proxy()
-                if success:
-                    print_success(f"{target_name} proxy cleared")
-                else:
-                    print_error(f"Failed to clear {target_name} proxy")
-            except Exception as e:
-                print_error(f"Error clearing {target_name}: {e}")
+                if self.json_output:
+                    emit_json({'type': 'target', 'command': 'unset', 'target': target_name,
+                               'status': 'unavailable'})
+            else:
+                selected.append(target_name)
+        
+        if not self._run_transaction('unset', selected, lambda target: target.unset_proxy(),
+                                     "Unsetting proxy for", "proxy cleared", "clear"):
+            return
         
         # Clear active profile when unsetting proxy
         self.config_manager.clear_active_profile()
         print_colored("Active profile cleared", self.colors['yellow'])
     
+    @reads_state
     def list_proxy_settings(self) -> None:
         """List saved proxy profiles and current active configuration."""
         print_header("Proxy Profiles")
@@ -206,6 +301,15 @@ class ProxyManX:
         # Get all saved configurations
         configs = self.config_manager.list_configs()
         
+        if self.json_output:
+            active_profile = self._detect_active_profile() if configs else None
+            emit_json({
+                'type': 'profiles',
+                'profiles': [{'name': name, 'active': name == active_profile} for name in configs],
+                'active': active_profile
+            })
+            return
+        
         if not configs:
             print_colored("No saved profiles found", self.colors['yellow'])
             print_colored("Use 'proxymanx set' to create a new profile", self.colors['cyan'])
@@ -229,30 +333,50 @@ class ProxyManX:
         
         print_colored("\nUse 'proxymanx configs' to see detailed configuration for all targets", self.colors['cyan'])
     
-    def load_and_apply_config(self, config_name: str) -> None:
+    def load_and_apply_config(self, config_name: str, targets: List[str] = None) -> None:
         """Load and apply a saved configuration."""
         print_header(f"Loading Configuration: {config_name}")
         
+        started = time.perf_counter()
+        
         # Load configuration
-        config = self.config_manager.load_config(config_name)
+        with capture_messages() as messages:
+            config = self.config_manager.load_config(config_name)
         if not config:
+            self._emit_result('load', 'error', started, profile=config_name, messages=messages)
             return
         
-        # Show configuration details
-        self._show_config_details(config)
+        if not self.json_output:
+            # Show configuration details
+            self._show_config_details(config)
         
         # Get target selection
-        targets = self._get_target_selection()
+        if targets is None:
+            targets = self._get_target_selection()
+        else:
+            targets = [name for name in targets if name in self.available_targets]
         if not targets:
+            self._emit_result('load', 'error', started, profile=config_name,
+                              messages=["No available targets selected"])
             return
         
         # Apply settings
-        self._apply_proxy_settings(config, targets)
+        if not self._apply_proxy_settings(config, targets, profile=config_name, action='load'):
+            print_error(f"Profile '{config_name}' was not applied; previous settings restored")
+            return
         
         # Track this as the active profile
         self.config_manager.set_active_profile(config_name)
         print_colored(f"Profile '{config_name}' is now active", self.colors['green'])
     
+    def pick_and_apply_config(self) -> None:
+        """Choose a profile with the fuzzy picker and apply it to all available targets."""
+        if self._profile_entries is None:
+            self._profile_entries = load_profile_entries(self.config_manager)
+        name = pick_profile(self._profile_entries)
+        if name:
+            self.load_and_apply_config(name, list(self.available_targets.keys()))
+    
     def _show_config_details(self, config: Dict[str, Any]) -> None:
         """Show configuration details."""
         print_colored("Configuration Details:", self.colors['cyan'])
@@ -265,39 +389,122 @@ class ProxyManX:
         print_colored(f"  No Proxy: {config['no_proxy']}", self.colors['white'])
         print()
     
+    @reads_state
     def show_current_configs(self) -> None:
         """Show current configuration for all targets."""
         print_header("Current Proxy Configuration")
         
         print_colored("Current Settings for All Targets:", self.colors['cyan'])
         
-        # Check each target
-        for target_name, target_instance in self.available_targets.items():
-            
-            try:
-                # Get current proxy settings for this target
-                current_settings = target_instance.list_proxy()
-                
-                if current_settings:
-                    # Target has proxy settings
-                    print_colored(f"\n[ACTIVE] {target_name.title()}", self.colors['green'])
-                    if isinstance(current_settings, dict):
-                        for key, value in current_settings.items():
-                            print_colored(f"  {key}: {value}", self.colors['white'])
-                    else:
-                        print_colored(f"  {current_settings}", self.colors['white'])
-                else:
-                    # Target has no proxy settings
-                    print_colored(f"\n[INACTIVE] {target_name.title()}", self.colors['yellow'])
-                    print_colored(f"  No proxy settings configured", self.colors['white'])
-                    
-            except Exception as e:
-                print_colored(f"\n[ERROR] {target_name.title()}", self.colors['red'])
-                print_colored(f"  Error reading settings: {e}", self.colors['white'])
+        # Targets are read concurrently and printed in order as they finish
+        show_target_configs(self.available_targets, json_output=self.json_output)
         
         print_colored(f"\nUse 'proxymanx set' to configure proxy settings", self.colors['cyan'])
         print_colored(f"Use 'proxymanx list' to see saved profiles", self.colors['cyan'])
     
+    def show_history(self, stats: bool = False, window: str = '7d', limit: int = 20) -> None:
+        """Show recent operations, or per-target latency statistics over a window."""
+        started = time.perf_counter()
+        try:
+            window_seconds = parse_window(window)
+        except ValueError:
+            print_error(f"Invalid time window: {window} (use e.g. 30m, 24h, 7d)")
+            self._emit_result('history', 'error', started)
+            return
+        
+        if stats:
+            print_header(f"Operation Statistics (last {window})")
+            target_stats = self.history.stats(window_seconds)
+            if self.json_output:
+                for name, values in target_stats.items():
+                    emit_json(dict({'type': 'stats', 'target': name}, **values))
+                self._emit_result('history', 'ok', started, window=window)
+                return
+            if not target_stats:
+                print_colored("No operations recorded in this window", self.colors['yellow'])
+                return
+            print_colored(f"  {'Target':12} {'Count':>6} {'Failed':>7} {'p50 ms':>9} {'p95 ms':>9} "
+                          f"{'p99 ms':>9} {'Procs':>6}", self.colors['cyan'])
+            for name, values in target_stats.items():
+                color = self.colors['red'] if values['failure_rate'] else self.colors['white']
+                print_colored(f"  {name:12} {values['count']:>6} {values['failure_rate']:>7.1%} "
+                              f"{values['p50_ms']:>9} {values['p95_ms']:>9} {values['p99_ms']:>9} "
+                              f"{values['avg_spawned']:>6}", color)
+            return
+        
+        print_header("Operation History")
+        recent = deque(self.history.iter_records(since=time.time() - window_seconds), maxlen=limit)
+        if self.json_output:
+            for record in recent:
+                emit_json(dict({'type': 'history'}, **record))
+            self._emit_result('history', 'ok', started, window=window)
+            return
+        if not recent:
+            print_colored("No operations recorded in this window", self.colors['yellow'])
+            return
+        for record in recent:
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.get('time', 0)))
+            color = self.colors['green'] if record.get('status') == 'ok' else self.colors['red']
+            profile = f" '{record['profile']}'" if record.get('profile') else ""
+            print_colored(f"{when}  {record.get('command')}{profile}  {record.get('status')}  "
+                          f"{record.get('duration_ms')} ms", color)
+            for name, result in (record.get('targets') or {}).items():
+                print_colored(f"    {name:12} {result.get('status'):7} {result.get('duration_ms'):>9} ms  "
+                              f"{result.get('spawned', 0)} process(es)", self.colors['white'])
+    
+    def sync_profiles(self, source: str, force: bool = False) -> None:
+        """Pull a central profile bundle into the local profile directory."""
+        print_header("Syncing Profiles")
+        started = time.perf_counter()
+        
+        from sync import ProfileSync  # urllib is only needed here
+        try:
+            result = ProfileSync(self.config_manager).sync(source, force=force)
+        except Exception as e:
+            print_error(f"Sync failed: {e}")
+            self._emit_result('sync', 'error', started, source=source, error=str(e))
+            return
+        
+        if not result['changed']:
+            print_success("Profiles are up to date")
+        else:
+            for key, label in (('added', 'Added'), ('updated', 'Updated'), ('removed', 'Removed')):
+                if result[key]:
+                    print_colored(f"{label} ({len(result[key])}): {', '.join(result[key])}", self.colors['white'])
+            print_success("Profiles synced")
+        self._emit_result('sync', 'ok' if result['changed'] else 'unchanged', started, source=source,
+                          added=result['added'], updated=result['updated'], removed=result['removed'])
+    
+    def watch_drift(self, reapply: bool = False, max_interval: float = MAX_INTERVAL) -> None:
+        """Report (and optionally re-apply) targets whose settings other programs change."""
+        watcher = DriftWatcher(self.available_targets, self.config_manager.config_dir)
+        
+        def on_drift(names: List[str]) -> None:
+            when = time.strftime('%Y-%m-%d %H:%M:%S')
+            profile = self.config_manager.get_active_profile()
+            for name in names:
+                print_warning(f"{when}  {name}: proxy settings changed outside ProxyManX")
+                if self.json_output:
+                    emit_json({'type': 'drift', 'target': name, 'time': round(time.time(), 3), 'profile': profile})
+            if not reapply:
+                return
+            with capture_messages(always=True):
+                config = self.config_manager.load_config(profile) if profile else None
+            if not config:
+                print_info("No active profile to re-apply")
+                return
+            # Only the drifted targets are touched; the transaction is journaled like any load
+            self._apply_proxy_settings(config, names, profile=profile, action='reapply')
+        
+        print_header("Watching for Proxy Drift")
+        watcher.start()
+        tracked = [name for name in self.available_targets if name not in watcher.untracked()]
+        print_info(f"Watching {', '.join(tracked)}" + (" (re-applying the active profile on drift)" if reapply else ""))
+        if watcher.untracked():
+            print_warning(f"Cannot watch: {', '.join(watcher.untracked())}")
+        print_info("Press Ctrl+C to stop")
+        watcher.run(on_drift, max_interval=max_interval)
+    
     def save_current_config(self, config_name: str) -> None:
         """Save current proxy configuration."""
         print_header(f"Saving Configuration: {config_name}")
@@ -323,15 +530,40 @@ class ProxyManX:
   {self.colors['green']}unset <target>{self.colors['reset']}         Unset proxy for specific target(s)
   {self.colors['green']}list{self.colors['reset']}                   List saved profiles (with active status)
   {self.colors['green']}configs{self.colors['reset']}                Show current settings for all targets
-  {self.colors['green']}load <name>{self.colors['reset']}            Load and apply a saved configuration
+  {self.colors['green']}status [--refresh]{self.colors['reset']}     One-line-per-target summary from a cached snapshot
+  {self.colors['green']}load <name> [targets]{self.colors['reset']}  Load and apply a saved configuration
+  {self.colors['green']}pick{self.colors['reset']}                   Fuzzy-find a profile and apply it (also 'load' with no name)
   {self.colors['green']}save <name>{self.colors['reset']}            Save current configuration
   {self.colors['green']}delete <name>{self.colors['reset']}          Delete a saved configuration
+  {self.colors['green']}sync <url|path>{self.colors['reset']}        Pull profiles from a central bundle
+  {self.colors['green']}undo{self.colors['reset']}                   Revert the last load/set/unset
+  {self.colors['green']}history [--stats]{self.colors['reset']}      Recent operations, or per-target latency stats
+  {self.colors['green']}completion <shell>{self.colors['reset']}     Print a powershell, clink or bash completion script
+  {self.colors['green']}watch [--reapply]{self.colors['reset']}      Report (or undo) proxy changes made by other programs
+  {self.colors['green']}env [name] [--shell sh]{self.colors['reset']} Print statements that apply a profile to this shell
+  {self.colors['green']}rules [add|remove|which]{self.colors['reset']} Map directory trees to profiles
+  {self.colors['green']}hook <shell>{self.colors['reset']}           Prompt hook applying directory rules on cd
+  {self.colors['green']}resolve <url> [--pac src]{self.colors['reset']} Proxy chain for URLs from a PAC file, URL or WPAD
+  {self.colors['green']}route --input <file>{self.colors['reset']}   Classify a URL list as direct/proxy by a profile's no_proxy
+  {self.colors['green']}bench-proxy --target <url>{self.colors['reset']} Compare TTFB, p50/p95/p99 and MB/s through profiles' proxies
   {self.colors['green']}help{self.colors['reset']}                   Show this help message
 
+{self.colors['bold']}Options:{self.colors['reset']}
+  {self.colors['green']}--json{self.colors['reset']}                 Machine-readable output (one NDJSON record per target)
+  {self.colors['green']}--deadline <time>{self.colors['reset']}      Finish within a time budget, e.g. 5s (missed targets are rolled back)
+
 {self.colors['bold']}Examples:{self.colors['reset']}
   proxymanx set                   # Interactive proxy setup
   proxymanx load office           # Load 'office' configuration
   proxymanx list                  # Show saved profiles with active status
+  proxymanx configs --json        # Current settings as NDJSON
+  proxymanx status                # Fast summary for prompts and tray tools
+  proxymanx history --stats --since 24h  # Per-target p50/p95/p99 for the last day
+  proxymanx env | Out-String | Invoke-Expression  # Apply the active profile to this PowerShell
+  proxymanx rules add C:\\src\\partner partner  # Use 'partner' below that directory
+  proxymanx resolve https://github.com --pac http://pac.corp/proxy.pac --save corp  # PAC answer as a profile
+  proxymanx route --input urls.txt --profile office > routes.tsv  # Audit a no_proxy list
+  proxymanx bench-proxy office home --target https://example.com/ --duration 30s  # Compare proxies
   proxymanx show-configs          # Show current settings for all targets
   proxymanx unset                 # Remove proxy settings (interactive)
   proxymanx unset all             # Remove proxy for all targets
@@ -400,26 +632,160 @@ class ProxyManX:
                         return config_name
             
             return None
-            
+        
         except Exception as e:
             # If any error occurs, just return None
             return None
 
 
+def take_options(options: List[str], names: List[str]) -> Dict[str, str]:
+    """Remove '--name value' pairs from options and return them by name.
+    
+    Raises IndexError when an option is missing its value.
+    """
+    values = {}
+    for name in names:
+        if name in options:
+            position = options.index(name)
+            values[name] = options[position + 1]
+            del options[position:position + 2]
+    return values
+
+
 def main():
     """Main entry point."""
     # Setup signal handlers for graceful Ctrl+C handling
     from utils import setup_signal_handlers
     setup_signal_handlers()
     
+    # --json switches every command to NDJSON records on stdout
+    args = sys.argv[1:]
+    json_output = '--json' in args
+    args = [arg for arg in args if arg != '--json']
+    if json_output:
+        set_quiet(True)
+    
+    # --deadline 5s bounds the whole command, including every process it starts
+    if '--deadline' in args:
+        position = args.index('--deadline')
+        try:
+            set_deadline(parse_window(args[position + 1]))
+        except (IndexError, ValueError):
+            print_error("Usage: --deadline <time>, e.g. --deadline 5s")
+            sys.exit(2)
+        del args[position:position + 2]
+    
+    def fail(message: str) -> None:
+        if json_output:
+            emit_json({'type': 'error', 'message': message})
+        else:
+            print_error(message)
+    
     try:
-        manager = ProxyManX()
+        # status is served from a cached snapshot, so skip target discovery
+        if args and args[0].lower() == 'status':
+            show_status(ConfigManager(), refresh='--refresh' in args[1:], json_output=json_output)
+            return
+        
+        # Completion scripts are static text and need no targets either
+        if args and args[0].lower() == 'completion':
+            if len(args) != 2 or args[1].lower() not in COMPLETION_SCRIPTS:
+                fail(f"Usage: proxymanx completion <{'|'.join(COMPLETION_SCRIPTS)}>")
+                return
+            ConfigManager().refresh_completion_cache()
+            sys.stdout.write(COMPLETION_SCRIPTS[args[1].lower()])
+            return
+        
+        # Directory rules and their prompt hooks only touch files under ~/.proxymanx
+        if args and args[0].lower() == 'rules':
+            manage_dir_rules(ConfigManager(), args[1:], json_output=json_output)
+            return
+        
+        # env is meant to be eval'd at shell startup, so it is served from the per-profile cache
+        if args and args[0].lower() == 'env':
+            options = args[1:]
+            try:
+                shell = take_options(options, ['--shell']).get('--shell')
+                if len(options) > 1:
+                    raise ValueError
+            except (IndexError, ValueError):
+                fail("Usage: proxymanx env [profile] [--shell powershell|cmd|bash]")
+                return
+            if not show_env(ConfigManager(), options[0] if options else None, shell, json_output=json_output):
+                sys.exit(1)
+            return
+        
+        if args and args[0].lower() == 'hook':
+            if len(args) != 2 or args[1].lower() not in HOOK_SCRIPTS:
+                fail(f"Usage: proxymanx hook <{'|'.join(HOOK_SCRIPTS)}>")
+                return
+            sys.stdout.write(HOOK_SCRIPTS[args[1].lower()])
+            return
+        
+        # resolve only evaluates a PAC script; --save writes a plain profile
+        if args and args[0].lower() == 'resolve':
+            options = args[1:]
+            try:
+                values = take_options(options, ['--pac', '--save'])
+                if not options:
+                    raise ValueError
+            except (IndexError, ValueError):
+                fail("Usage: proxymanx resolve <url>... [--pac <file|url|wpad[:domain]>] [--save <name>]")
+                return
+            from pac import resolve_urls  # urllib.request is only needed here
+            if not resolve_urls(ConfigManager(), options, values.get('--pac'), values.get('--save'),
+                                json_output=json_output):
+                sys.exit(1)
+            return
+        
+        # route streams a URL list through compiled no_proxy rules, no targets involved
+        if args and args[0].lower() == 'route':
+            options = args[1:]
+            usage = ("Usage: proxymanx route --input <file|-> [--profile <name> | --no-proxy <list>] "
+                     "[--output <file>] [--workers N]")
+            try:
+                values = take_options(options, ['--input', '--profile', '--no-proxy', '--output', '--workers'])
+                workers = int(values['--workers']) if '--workers' in values else None
+                if options or '--input' not in values or (workers is not None and workers < 1):
+                    raise ValueError
+            except (IndexError, ValueError):
+                fail(usage)
+                return
+            from routing import route_urls  # multiprocessing is only needed here
+            if not route_urls(ConfigManager(), values['--input'], values.get('--profile'),
+                              values.get('--no-proxy'), values.get('--output'), workers, json_output=json_output):
+                sys.exit(1)
+            return
+        
+        # bench-proxy talks to the profiles' proxies directly, no targets involved
+        if args and args[0].lower() == 'bench-proxy':
+            from proxybench import DEFAULT_CONCURRENCY, DEFAULT_DURATION, run_benchmark  # sockets and ssl
+            options = args[1:]
+            usage = ("Usage: proxymanx bench-proxy [profiles...] --target <url> [--concurrency N] "
+                     "[--duration 10s] [--insecure]")
+            insecure = '--insecure' in options
+            options = [option for option in options if option != '--insecure']
+            try:
+                values = take_options(options, ['--target', '--concurrency', '--duration'])
+                concurrency = int(values.get('--concurrency', DEFAULT_CONCURRENCY))
+                duration = parse_window(values['--duration']) if '--duration' in values else DEFAULT_DURATION
+                if '--target' not in values or concurrency < 1 or any(o.startswith('--') for o in options):
+                    raise ValueError
+            except (IndexError, ValueError):
+                fail(usage)
+                return
+            if not run_benchmark(ConfigManager(), options, values['--target'], concurrency, duration, insecure,
+                                 json_output=json_output):
+                sys.exit(1)
+            return
+        
+        manager = ProxyManX(json_output=json_output)
         
-        if len(sys.argv) < 2:
+        if len(args) < 1:
             manager.show_help()
             return
         
-        command = sys.argv[1].lower()
+        command = args[0].lower()
         
         if command == 'set':
             manager.interactive_set_proxy()
@@ -427,14 +793,14 @@ def main():
         elif command == 'unset':
             # Check for additional arguments
             targets = None
-            if len(sys.argv) > 2:
-                if sys.argv[2] == 'all':
+            if len(args) > 1:
+                if args[1] == 'all':
                     targets = list(manager.available_targets.keys())
                 else:
                     # Parse target names from command line
-                    targets = [arg.strip() for arg in sys.argv[2:] if arg.strip() in manager.available_targets]
+                    targets = [arg.strip() for arg in args[1:] if arg.strip() in manager.available_targets]
                     if not targets:
-                        print_error(f"Invalid targets specified. Available: {', '.join(manager.available_targets.keys())}")
+                        fail(f"Invalid targets specified. Available: {', '.join(manager.available_targets.keys())}")
                         return
             manager.unset_proxy(targets)
         
@@ -447,35 +813,75 @@ def main():
         elif command == 'show-configs':
             manager.show_current_configs()
         
+        elif command == 'pick' or (command == 'load' and len(args) < 2 and not json_output):
+            manager.pick_and_apply_config()
+        
         elif command == 'load':
-            if len(sys.argv) < 3:
-                print_error("Usage: proxymanx load <config_name>")
+            if len(args) < 2:
+                fail("Usage: proxymanx load <config_name> [targets...]")
                 return
-            manager.load_and_apply_config(sys.argv[2])
+            manager.load_and_apply_config(args[1], args[2:] or None)
         
         elif command == 'save':
-            if len(sys.argv) < 3:
-                print_error("Usage: proxymanx save <config_name>")
+            if len(args) < 2:
+                fail("Usage: proxymanx save <config_name>")
                 return
-            manager.save_current_config(sys.argv[2])
+            manager.save_current_config(args[1])
         
         elif command == 'delete':
-            if len(sys.argv) < 3:
-                print_error("Usage: proxymanx delete <config_name>")
+            if len(args) < 2:
+                fail("Usage: proxymanx delete <config_name>")
                 return
-            manager.config_manager.delete_config(sys.argv[2])
+            manager.config_manager.delete_config(args[1])
+        
+        elif command == 'undo':
+            manager.undo_last_transaction()
+        
+        elif command == 'sync':
+            sources = [arg for arg in args[1:] if arg != '--force']
+            if len(sources) != 1:
+                fail("Usage: proxymanx sync <url|path> [--force]")
+                return
+            manager.sync_profiles(sources[0], force='--force' in args[1:])
+        
+        elif command == 'history':
+            options = args[1:]
+            window, limit = '7d', 20
+            try:
+                if '--since' in options:
+                    window = options[options.index('--since') + 1]
+                if '--limit' in options:
+                    limit = int(options[options.index('--limit') + 1])
+            except (IndexError, ValueError):
+                fail("Usage: proxymanx history [--stats] [--since 7d] [--limit 20]")
+                return
+            manager.show_history(stats='--stats' in options, window=window, limit=limit)
+        
+        elif command == 'watch':
+            options = args[1:]
+            max_interval = MAX_INTERVAL
+            try:
+                if '--interval' in options:
+                    max_interval = float(options[options.index('--interval') + 1])
+                    if max_interval < 1:
+                        raise ValueError
+            except (IndexError, ValueError):
+                fail("Usage: proxymanx watch [--reapply] [--interval <max seconds>]")
+                return
+            manager.watch_drift(reapply='--reapply' in options, max_interval=max_interval)
         
         elif command in ['help', '-h', '--help']:
             manager.show_help()
         
         else:
-            print_error(f"Unknown command: {command}")
-            manager.show_help()
+            fail(f"Unknown command: {command}")
+            if not json_output:
+                manager.show_help()
     
     except KeyboardInterrupt:
         print_colored("\n\nOperation cancelled by user", get_colors()['yellow'])
     except Exception as e:
-        print_error(f"An error occurred: {e}")
+        fail(f"An error occurred: {e}")
         sys.exit(1)
 
 
@@ -0,0 +1,363 @@
+"""
+ProxyManX Windows - Batch URL Routing
+Classifies large URL lists as direct or proxied by a profile's no_proxy rules.
+IPv4 literals are matched by binary search over merged ranges and host names
+by a suffix trie of their labels; big inputs are spread over worker processes.
+"""
+
+import fnmatch
+import ipaddress
+import json
+import os
+import re
+import socket
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterator, Optional, TextIO, Tuple
+from utils import *
+
+# Lines handed to a worker at a time
+CHUNK_LINES = 20000
+
+# Inputs smaller than this are classified in-process: starting workers costs more
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+
+# Chunks in flight per worker; bounds memory regardless of input size
+CHUNKS_PER_WORKER = 2
+
+DIRECT = 'direct'
+PROXY = 'proxy'
+INVALID = 'invalid'
+
+URL_RE = re.compile(r'^(?:([A-Za-z][A-Za-z0-9+.-]*)://)?(?:[^@/?#\s]*@)?(\[[^\]/]*\]|[^:/?#\s]*)(?::(\d+))?')
+IPV4_RE = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ws': 80, 'wss': 443, 'ftp': 21}
+
+# Trie node keys that cannot collide with a DNS label
+EXACT = ' '  # This name and every name below it
+BELOW = '*'  # Only names below this one
+
+
+def parse_host(line: str) -> Tuple[Optional[str], Optional[int]]:
+    """(host, port) of a URL or bare host[:port]; host is None for unusable lines."""
+    match = URL_RE.match(line)
+    host = match.group(2).lower().rstrip('.') if match else ''
+    if not host:
+        return None, None
+    if host.startswith('['):
+        host = host[1:-1]
+    port = match.group(3)
+    if port:
+        return host, int(port)
+    return host, DEFAULT_PORTS.get((match.group(1) or '').lower())
+
+
+class NoProxyRules:
+    """A no_proxy list compiled for fast matching.
+    
+    Supported entries: '*', host names ('example.com' and '.example.com'
+    match the name and everything below it, '*.example.com' only names
+    below it), IPv4 addresses, CIDR ranges and wildcards ('10.*'), IPv6
+    addresses and ranges, '<local>' (names without a dot), other shell
+    patterns, and any of these with a ':port' suffix.
+    """
+    
+    def __init__(self, no_proxy: str):
+        self.entries = split_no_proxy(no_proxy)
+        self.match_all = None
+        self.local = None
+        self.trie = {}
+        self.ipv6 = []
+        self.patterns = []
+        ranges = []
+        for index, entry in enumerate(self.entries):
+            self._add(index, entry.lower(), ranges)
+        self._build_ranges(ranges)
+    
+    def _add(self, index: int, entry: str, ranges: List[Tuple[int, int, int, Optional[int]]]) -> None:
+        if entry == '*':
+            if self.match_all is None:
+                self.match_all = index
+            return
+        if entry == '<local>':
+            if self.local is None:
+                self.local = index
+            return
+        
+        host, port = entry, None
+        if entry.startswith('[') and ']' in entry:
+            host, _, rest = entry[1:].partition(']')
+            port = int(rest[1:]) if rest[1:].isdigit() else None
+        elif entry.count(':') == 1 and entry.rpartition(':')[2].isdigit():
+            host, _, port = entry.rpartition(':')
+            port = int(port)
+        
+        network = self._network(wildcard_to_cidr(host))
+        if network is not None:
+            if network.version == 4:
+                ranges.append((int(network.network_address), int(network.broadcast_address), index, port))
+            else:
+                self.ipv6.append((network, index, port))
+            return
+        
+        if host.startswith('*.') and '*' not in host[2:] and '?' not in host:
+            key, name = BELOW, host[2:]
+        elif '*' in host or '?' in host or '[' in host:
+            self.patterns.append((re.compile(fnmatch.translate(host)), index, port))
+            return
+        else:
+            key, name = EXACT, host.lstrip('.')
+        node = self.trie
+        for label in reversed(name.rstrip('.').split('.')):
+            node = node.setdefault(label, {})
+        node.setdefault(key, {}).setdefault(port, index)
+    
+    @staticmethod
+    def _network(text: str):
+        try:
+            return ipaddress.ip_network(text, strict=False)
+        except ValueError:
+            return None
+    
+    def _build_ranges(self, ranges: List[Tuple[int, int, int, Optional[int]]]) -> None:
+        """Split overlapping IPv4 ranges into disjoint segments owned by the first rule covering them."""
+        self.range_starts = array('L')
+        self.range_ends = array('L')
+        self.range_owners = []
+        self.port_ranges = [r for r in ranges if r[3] is not None]
+        ranges = [r for r in ranges if r[3] is None]
+        bounds = sorted({start for start, _, _, _ in ranges} | {end + 1 for _, end, _, _ in ranges})
+        for low, high in zip(bounds, bounds[1:]):
+            owners = [index for start, end, index, _ in ranges if start <= low and high - 1 <= end]
+            if not owners:
+                continue
+            owner = min(owners)
+            if self.range_owners and self.range_owners[-1] == owner and self.range_ends[-1] + 1 == low:
+                self.range_ends[-1] = high - 1
+            else:
+                self.range_starts.append(low)
+                self.range_ends.append(high - 1)
+                self.range_owners.append(owner)
+    
+    def _lookup_ipv4(self, address: int, port: Optional[int]) -> Optional[int]:
+        position = bisect_right(self.range_starts, address) - 1
+        if position >= 0 and address <= self.range_ends[position]:
+            return self.range_owners[position]
+        for start, end, index, rule_port in self.port_ranges:
+            if start <= address <= end and rule_port == port:
+                return index
+        return None
+    
+    def _lookup_name(self, host: str, port: Optional[int]) -> Optional[int]:
+        """The most specific trie rule covering a host name."""
+        found = None
+        node = self.trie
+        labels = host.split('.')
+        for depth in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[depth])
+            if node is None:
+                break
+            for key in (EXACT, BELOW) if depth else (EXACT,):
+                ports = node.get(key)
+                if ports is not None:
+                    index = ports.get(None, ports.get(port))
+                    if index is not None:
+                        found = index
+        return found
+    
+    def match(self, host: str, port: Optional[int] = None) -> Optional[int]:
+        """Index of the entry sending host:port direct, or None when it goes through the proxy."""
+        if self.match_all is not None:
+            return self.match_all
+        if IPV4_RE.match(host):
+            try:
+                address = int.from_bytes(socket.inet_aton(host), 'big')
+            except OSError:
+                address = None
+            if address is not None:
+                index = self._lookup_ipv4(address, port)
+                if index is not None:
+                    return index
+        elif ':' in host:
+            try:
+                address = ipaddress.IPv6Address(host.partition('%')[0])
+            except ValueError:
+                address = None
+            if address is not None:
+                for network, index, rule_port in self.ipv6:
+                    if address in network and rule_port in (None, port):
+                        return index
+        else:
+            index = self._lookup_name(host, port)
+            if index is not None:
+                return index
+            if self.local is not None and '.' not in host:
+                return self.local
+        for pattern, index, rule_port in self.patterns:
+            if rule_port in (None, port) and pattern.match(host):
+                return index
+        return None
+
+
+_rules = None
+
+
+def _init_worker(no_proxy: str) -> None:
+    global _rules
+    _rules = NoProxyRules(no_proxy)
+
+
+def classify_lines(rules: NoProxyRules, lines: List[str], json_output: bool = False
+                   ) -> Tuple[str, Dict[str, int], List[int]]:
+    """Decisions for a chunk of lines as output text, route counts and per-entry hit counts."""
+    out = []
+    counts = {DIRECT: 0, PROXY: 0, INVALID: 0}
+    hits = [0] * len(rules.entries)
+    entries = rules.entries
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith('#'):
+            continue
+        url = url.split(None, 1)[0]
+        host, port = parse_host(url)
+        if host is None:
+            route, rule = INVALID, None
+        else:
+            index = rules.match(host, port)
+            if index is None:
+                route, rule = PROXY, None
+            else:
+                route, rule = DIRECT, entries[index]
+                hits[index] += 1
+        counts[route] += 1
+        if json_output:
+            record = {'type': 'route', 'url': url, 'route': route}
+            if rule is not None:
+                record['rule'] = rule
+            out.append(json.dumps(record, separators=(',', ':')))
+        else:
+            out.append(f"{route}\t{url}\t{rule}" if rule is not None else f"{route}\t{url}")
+    return ('\n'.join(out) + '\n') if out else '', counts, hits
+
+
+def _classify_chunk(lines: List[str], json_output: bool) -> Tuple[str, Dict[str, int], List[int]]:
+    return classify_lines(_rules, lines, json_output)
+
+
+def _chunks(stream: TextIO, size: int = CHUNK_LINES) -> Iterator[List[str]]:
+    chunk = []
+    for line in stream:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def route_stream(no_proxy: str, stream: TextIO, output: TextIO, workers: int = 1,
+                 json_output: bool = False) -> Dict[str, Any]:
+    """Classify every URL in stream, writing decisions in input order; returns the summary."""
+    rules = NoProxyRules(no_proxy)
+    counts = {DIRECT: 0, PROXY: 0, INVALID: 0}
+    hits = [0] * len(rules.entries)
+    
+    def merge(result):
+        text, chunk_counts, chunk_hits = result
+        output.write(text)
+        for route, count in chunk_counts.items():
+            counts[route] += count
+        for index, count in enumerate(chunk_hits):
+            hits[index] += count
+    
+    if workers <= 1:
+        for chunk in _chunks(stream):
+            merge(classify_lines(rules, chunk, json_output))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(no_proxy,)) as executor:
+            # A bounded window of chunks keeps memory flat and output in input order
+            pending = deque()
+            for chunk in _chunks(stream):
+                pending.append(executor.submit(_classify_chunk, chunk, json_output))
+                if len(pending) >= workers * CHUNKS_PER_WORKER:
+                    merge(pending.popleft().result())
+            while pending:
+                merge(pending.popleft().result())
+    output.flush()
+    return {'counts': counts, 'rules': [{'rule': entry, 'hits': hits[index]}
+                                        for index, entry in enumerate(rules.entries)]}
+
+
+def route_urls(config_manager, input_path: str, profile: Optional[str] = None, no_proxy: Optional[str] = None,
+               output_path: Optional[str] = None, workers: Optional[int] = None, json_output: bool = False) -> bool:
+    """Route a URL list through a profile's (or an explicit) no_proxy list and summarize the decisions."""
+    started = time.perf_counter()
+    if no_proxy is None:
+        profile = profile or config_manager.get_active_profile()
+        if not profile:
+            print_error("No active profile; pass --profile <name> or --no-proxy <list>")
+            return False
+        config = config_manager.load_config(profile)
+        if not config:
+            return False
+        no_proxy = config.get('no_proxy', '')
+    
+    if workers is None:
+        try:
+            large = input_path != '-' and os.path.getsize(input_path) >= PARALLEL_THRESHOLD
+        except OSError as e:
+            print_error(f"Cannot read {input_path}: {e.strerror}")
+            return False
+        workers = (os.cpu_count() or 1) if large else 1
+    
+    try:
+        stream = sys.stdin if input_path == '-' else open(input_path, 'r', encoding='utf-8', errors='replace')
+    except OSError as e:
+        print_error(f"Cannot read {input_path}: {e.strerror}")
+        return False
+    try:
+        output = open(output_path, 'w', encoding='utf-8', newline='\n') if output_path else sys.stdout
+    except OSError as e:
+        print_error(f"Cannot write {output_path}: {e.strerror}")
+        stream.close()
+        return False
+    try:
+        summary = route_stream(no_proxy, stream, output, workers=workers, json_output=json_output)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    counts = summary['counts']
+    if json_output:
+        emit_json({'type': 'result', 'command': 'route', 'status': 'ok', 'profile': profile,
+                   'duration_ms': duration_ms, 'workers': workers, **counts, 'rules': summary['rules']})
+        return True
+    
+    # With decisions on stdout the summary goes to stderr, so redirecting stdout captures only decisions
+    lines = [f"Routed {sum(counts.values())} URLs in {duration_ms / 1000:.2f}s"
+             f" ({workers} worker{'s' if workers != 1 else ''}, "
+             f"{'profile ' + repr(profile) if profile else 'explicit no_proxy list'})",
+             f"  direct  {counts[DIRECT]}",
+             f"  proxy   {counts[PROXY]}"]
+    if counts[INVALID]:
+        lines.append(f"  invalid {counts[INVALID]}")
+    lines.append("Rule hits:")
+    lines.extend(f"  {rule['hits']:>10}  {rule['rule']}" for rule in summary['rules'])
+    unused = [rule['rule'] for rule in summary['rules'] if not rule['hits']]
+    if unused:
+        lines.append(f"Unused rules: {', '.join(unused)}")
+    if output_path:
+        print_header("URL Routing")
+        for line in lines:
+            print_colored(line, get_colors()['white'])
+        print_success(f"Decisions written to {output_path}")
+    else:
+        sys.stderr.write('\n'.join(lines) + '\n')
+    return True
@@ -0,0 +1,148 @@
+"""
+ProxyManX Windows - Shell Environment Statements
+Renders a profile's proxy variables as statements a shell can evaluate, and
+keeps them cached per profile so shell hooks never need to start ProxyManX.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, Optional
+from utils import atomic_write_text, capture_messages, emit_json, format_proxy_url
+
+PROXY_ENV_VARS = ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'NO_PROXY', 'no_proxy')
+
+# Cached script extension per shell
+SHELL_EXTENSIONS = {'powershell': 'ps1', 'cmd': 'cmd', 'bash': 'sh'}
+
+# Pseudo-profile that clears the proxy variables
+DIRECT = 'direct'
+
+ENV_CACHE_DIR = '.env'
+
+
+def proxy_env_values(config: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Proxy variable values for a profile; None config (direct) maps every variable to None."""
+    if config is None:
+        return {name: None for name in PROXY_ENV_VARS}
+    username = config.get('username') if config.get('use_auth') else None
+    password = config.get('password') if config.get('use_auth') else None
+    http_proxy = format_proxy_url(config['http_host'], config['http_port'], username, password)
+    
+    https_proxy = http_proxy  # Use HTTP proxy for HTTPS by default
+    if config.get('https_host') and config.get('https_port'):
+        https_proxy = format_proxy_url(config['https_host'], config['https_port'], username, password)
+    
+    return {
+        'HTTP_PROXY': http_proxy,
+        'HTTPS_PROXY': https_proxy,
+        'http_proxy': http_proxy,
+        'https_proxy': https_proxy,
+        'NO_PROXY': config.get('no_proxy', ''),
+        'no_proxy': config.get('no_proxy', '')
+    }
+
+
+def _statement(shell: str, name: str, value: Optional[str]) -> str:
+    if shell == 'powershell':
+        if value is None:
+            return f"Remove-Item -LiteralPath Env:{name} -ErrorAction SilentlyContinue"
+        return f"$env:{name} = '" + value.replace("'", "''") + "'"
+    if shell == 'cmd':
+        return f'set "{name}={value or ""}"'
+    if value is None:
+        return f"unset {name}"
+    return f"export {name}='" + value.replace("'", "'\\''") + "'"
+
+
+def render_env(values: Dict[str, Optional[str]], shell: str) -> str:
+    """Statements setting (or removing, for None) each variable in the given shell."""
+    if shell not in SHELL_EXTENSIONS:
+        raise ValueError(f"unsupported shell: {shell}")
+    # On Windows the upper- and lower-case names are the same variable
+    seen = set()
+    lines = []
+    for name, value in values.items():
+        if shell != 'bash' and name.upper() in seen:
+            continue
+        seen.add(name.upper())
+        lines.append(_statement(shell, name, value))
+    return '\n'.join(lines) + '\n'
+
+
+def env_script_path(config_dir: Path, profile: str, shell: str) -> Path:
+    """Cached statements for one profile and shell."""
+    return Path(config_dir) / ENV_CACHE_DIR / f"{profile}.{SHELL_EXTENSIONS[shell]}"
+
+
+def default_shell() -> str:
+    """Shell assumed when --shell is not given."""
+    return 'powershell' if os.name == 'nt' else 'bash'
+
+
+def write_env_scripts(config_manager, profile: str) -> bool:
+    """Render a profile's statements for every shell; False if the profile does not exist."""
+    if profile == DIRECT:
+        config = None
+    else:
+        config = config_manager.load_config(profile)
+        if not config:
+            return False
+    values = proxy_env_values(config)
+    for shell in SHELL_EXTENSIONS:
+        path = env_script_path(config_manager.config_dir, profile, shell)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, render_env(values, shell))
+    return True
+
+
+def drop_env_scripts(config_dir: Path, profile: str) -> None:
+    """Forget a profile's cached statements (after it was changed or deleted)."""
+    for shell in SHELL_EXTENSIONS:
+        try:
+            env_script_path(config_dir, profile, shell).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def cached_env_script(config_manager, profile: str, shell: str) -> Optional[str]:
+    """A profile's statements from the cache, re-rendered when the profile file is newer.
+    
+    Returns None when the profile does not exist.
+    """
+    path = env_script_path(config_manager.config_dir, profile, shell)
+    try:
+        cached_mtime = os.stat(path).st_mtime_ns
+        sources = [config_manager.config_dir / f"{profile}.{ext}" for ext in ('ini', 'json')]
+        if profile == DIRECT or all(not source.exists() or os.stat(source).st_mtime_ns <= cached_mtime
+                                    for source in sources):
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+    except FileNotFoundError:
+        pass
+    with capture_messages(always=True):
+        if not write_env_scripts(config_manager, profile):
+            return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def show_env(config_manager, profile: Optional[str] = None, shell: Optional[str] = None,
+             json_output: bool = False) -> bool:
+    """Print eval-able statements for a profile (default: the active one, or direct when none is)."""
+    shell = (shell or default_shell()).lower()
+    if shell not in SHELL_EXTENSIONS:
+        sys.stderr.write(f"proxymanx env: unsupported shell '{shell}' (use {', '.join(SHELL_EXTENSIONS)})\n")
+        return False
+    profile = profile or config_manager.get_active_profile() or DIRECT
+    script = cached_env_script(config_manager, profile, shell)
+    if script is None:
+        # Errors go to stderr so an eval of stdout is a no-op
+        sys.stderr.write(f"proxymanx env: configuration '{profile}' not found\n")
+        return False
+    if json_output:
+        emit_json({'type': 'result', 'command': 'env', 'status': 'ok',
+                   'profile': profile, 'shell': shell, 'script': script})
+    else:
+        sys.stdout.write(script)
+    return True
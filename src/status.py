@@ -0,0 +1,169 @@
+"""
+ProxyManX Windows - Status Snapshot
+Persisted view of every target's proxy state, revalidated with stat calls and
+registry hashes instead of re-reading (and re-spawning) each target.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Mapping, Optional
+from inspector import DEFAULT_READ_TIMEOUT, iter_target_configs, read_target_config
+from locking import reads_state
+from utils import *
+
+SNAPSHOT_VERSION = 1
+
+
+def _digest(values: Any) -> str:
+    """Short stable hash of a JSON-serializable value."""
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def stamp_sources(sources: Optional[Dict[str, List]]) -> Optional[List]:
+    """Fingerprint the files, registry values and variables described by state_sources()."""
+    if sources is None:
+        return None
+    stamps = []
+    for path in sources.get('files', []):
+        try:
+            stat = os.stat(path)
+            stamps.append([stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            stamps.append(None)
+    if sources.get('registry'):
+        from targets.base import read_registry_values
+        stamps.append(_digest([read_registry_values(sub_key, names) for sub_key, names in sources['registry']]))
+    if sources.get('environ'):
+        stamps.append(_digest([os.environ.get(name) for name in sources['environ']]))
+    return stamps
+
+
+class StatusSnapshot:
+    """Cached 'configs' records, each stored with the stamps of the sources it was read from."""
+    
+    def __init__(self, config_dir: Path):
+        self.config_dir = Path(config_dir)
+        self.snapshot_file = self.config_dir / '.status.json'
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the persisted snapshot, or None if missing or from another version."""
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return snapshot if snapshot.get('version') == SNAPSHOT_VERSION else None
+    
+    def save(self, snapshot: Dict[str, Any]) -> None:
+        """Persist a snapshot atomically."""
+        atomic_write_text(self.snapshot_file, json.dumps(snapshot, separators=(',', ':'), default=str))
+    
+    def clear(self) -> None:
+        """Drop the snapshot so the next status call re-reads every target."""
+        try:
+            self.snapshot_file.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _plugin_stamp(self) -> Optional[int]:
+        """Plugins added or removed change the target list, not just target state."""
+        try:
+            return os.stat(self.config_dir / 'plugins').st_mtime_ns
+        except OSError:
+            return None
+    
+    def collect(self, refresh: bool = False, timeout: float = DEFAULT_READ_TIMEOUT) -> List[Dict[str, Any]]:
+        """Return one record per target, re-reading only targets whose sources changed."""
+        snapshot = None if refresh else self.load()
+        plugin_stamp = self._plugin_stamp()
+        targets = None
+        
+        if snapshot is None or snapshot.get('plugins') != plugin_stamp:
+            # Cold path: discover targets and read them all
+            from targets import get_available_targets
+            targets = get_available_targets()
+            names = list(targets.keys())
+            entries = {}
+        else:
+            names = snapshot['order']
+            entries = snapshot['targets']
+        
+        stale = [name for name in names
+                 if name not in entries or entries[name]['stamps'] is None
+                 or stamp_sources(entries[name]['sources']) != entries[name]['stamps']]
+        
+        if stale:
+            if targets is None:
+                from targets import LazyTargets, get_target_specs
+                specs = get_target_specs()
+                targets = LazyTargets({name: specs[name] for name in stale if name in specs})
+            names = [name for name in names if name in targets or name not in stale]
+            
+            for record in iter_target_configs(targets, names=[name for name in stale if name in targets],
+                                              timeout=timeout, reader=self._read_tracked):
+                sources = record.pop('sources', None)
+                stamps = record.pop('stamps', None)
+                # Errors and timeouts are retried on the next call instead of cached
+                if record['status'] not in ('active', 'inactive'):
+                    stamps = None
+                entries[record['target']] = {'sources': sources, 'stamps': stamps, 'record': record}
+            
+            self.save({
+                'version': SNAPSHOT_VERSION,
+                'time': time.time(),
+                'plugins': plugin_stamp,
+                'order': names,
+                'targets': {name: entries[name] for name in names if name in entries}
+            })
+        
+        return [dict(entries[name]['record'], command='status', cached=name not in stale)
+                for name in names if name in entries]
+    
+    def _read_tracked(self, target_name: str, targets: Mapping) -> Dict[str, Any]:
+        """Stamp a target's sources, then read it, so changes made during the read invalidate it."""
+        try:
+            sources = targets[target_name].state_sources()
+            stamps = stamp_sources(sources)
+        except Exception:
+            sources, stamps = None, None
+        record = read_target_config(target_name, targets)
+        record['sources'] = sources
+        record['stamps'] = stamps
+        return record
+
+
+@reads_state
+def show_status(config_manager, refresh: bool = False, json_output: bool = False) -> None:
+    """Print a compact one-line-per-target status from the cached snapshot."""
+    started = time.perf_counter()
+    colors = get_colors()
+    records = StatusSnapshot(config_manager.config_dir).collect(refresh=refresh)
+    profile = config_manager.get_active_profile()
+    
+    if json_output:
+        for record in records:
+            emit_json(record)
+        emit_json({
+            'type': 'result',
+            'command': 'status',
+            'status': 'ok',
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'profile': profile,
+            'cached': sum(1 for record in records if record['cached'])
+        })
+        return
+    
+    print_colored(f"Profile: {profile or 'none'}", colors['cyan'])
+    labels = {'active': ('ACTIVE', colors['green']), 'inactive': ('INACTIVE', colors['yellow']),
+              'timeout': ('TIMED OUT', colors['yellow'])}
+    for record in records:
+        label, color = labels.get(record['status'], ('ERROR', colors['red']))
+        settings = record.get('settings')
+        if isinstance(settings, dict):
+            summary = ', '.join(f"{key}={value}" for key, value in settings.items())
+        else:
+            summary = record.get('error') or (str(settings) if settings else '')
+        print_colored(f"  {'[' + label + ']':11} {record['target']:12} {summary}".rstrip(), color)
@@ -0,0 +1,159 @@
+"""
+ProxyManX Windows - Profile Sync
+Pulls a centrally published profile bundle (HTTP(S) URL or local file) into
+the profile directory using conditional requests and a local cache.
+"""
+
+import hashlib
+import json
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from locking import writes_state
+from utils import *
+
+SYNC_TIMEOUT = 15
+PROFILE_NAME = re.compile(r'^[\w][\w.-]*$')
+
+
+def parse_bundle(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """Parse and validate a JSON profile bundle.
+    
+    Accepts {"profiles": {name: profile}}, a bare {name: profile} mapping or
+    a list of profiles that each carry a "name".
+    """
+    bundle = json.loads(data.decode('utf-8-sig'))
+    if isinstance(bundle, dict) and 'profiles' in bundle:
+        bundle = bundle['profiles']
+    if isinstance(bundle, list):
+        bundle = {entry.get('name'): entry for entry in bundle if isinstance(entry, dict)}
+    if not isinstance(bundle, dict):
+        raise ValueError("bundle must map profile names to profiles")
+    
+    profiles = {}
+    for name, profile in bundle.items():
+        if not isinstance(name, str) or not PROFILE_NAME.match(name):
+            raise ValueError(f"invalid profile name: {name!r}")
+        if not isinstance(profile, dict) or not profile.get('http_host') or not profile.get('http_port'):
+            raise ValueError(f"profile '{name}' needs at least http_host and http_port")
+        for port_key in ('http_port', 'https_port', 'ftp_port'):
+            if profile.get(port_key) and not 1 <= int(profile[port_key]) <= 65535:
+                raise ValueError(f"profile '{name}' has an invalid {port_key}")
+        profile = {key: value for key, value in profile.items() if key != 'name'}
+        profile.setdefault('https_host', profile['http_host'])
+        profile.setdefault('https_port', profile['http_port'])
+        profile.setdefault('ftp_host', profile['http_host'])
+        profile.setdefault('ftp_port', profile['http_port'])
+        profiles[name] = profile
+    return profiles
+
+
+class ProfileSync:
+    """Conditional fetch of a profile bundle, applied to ConfigManager's directory."""
+    
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self.cache_dir = config_manager.config_dir / '.sync'
+    
+    def _meta_path(self, source: str) -> Path:
+        """Per-source metadata file (validators, digest and the profiles it owns)."""
+        return self.cache_dir / (hashlib.sha1(source.encode('utf-8')).hexdigest()[:16] + '.json')
+    
+    def _load_meta(self, source: str) -> Dict[str, Any]:
+        try:
+            with open(self._meta_path(source), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def fetch(self, source: str, meta: Dict[str, Any]) -> Tuple[Optional[bytes], Dict[str, Any]]:
+        """Fetch the bundle as (data, validators); data is None when it has not changed."""
+        if re.match(r'^https?://', source, re.IGNORECASE):
+            return self._fetch_http(source, meta)
+        if source.lower().startswith('file:'):
+            source = urllib.request.url2pathname(urllib.parse.urlparse(source).path)
+        return self._fetch_file(Path(source).expanduser(), meta)
+    
+    def _fetch_http(self, url: str, meta: Dict[str, Any]) -> Tuple[Optional[bytes], Dict[str, Any]]:
+        request = urllib.request.Request(url, headers={'User-Agent': 'ProxyManX-Sync'})
+        if meta.get('etag'):
+            request.add_header('If-None-Match', meta['etag'])
+        if meta.get('last_modified'):
+            request.add_header('If-Modified-Since', meta['last_modified'])
+        try:
+            with urllib.request.urlopen(request, timeout=SYNC_TIMEOUT) as response:
+                data = response.read()
+                validators = {'etag': response.headers.get('ETag'),
+                              'last_modified': response.headers.get('Last-Modified')}
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, {}
+            raise
+        return data, validators
+    
+    def _fetch_file(self, path: Path, meta: Dict[str, Any]) -> Tuple[Optional[bytes], Dict[str, Any]]:
+        # A local file's mtime and size play the role of an ETag
+        stat = path.stat()
+        stamp = f"{stat.st_mtime_ns}-{stat.st_size}"
+        if meta.get('etag') == stamp:
+            return None, {}
+        return path.read_bytes(), {'etag': stamp, 'last_modified': None}
+    
+    def sync(self, source: str, force: bool = False) -> Dict[str, Any]:
+        """Sync profiles from a bundle; returns counts of what changed."""
+        meta = {} if force else self._load_meta(source)
+        data, validators = self.fetch(source, meta)
+        if data is None:
+            return {'changed': False, 'added': [], 'updated': [], 'removed': []}
+        
+        # Same bytes under a new validator (e.g. a touched file) only refresh the cache
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == meta.get('digest'):
+            self._save_meta(source, dict(meta, **validators))
+            return {'changed': False, 'added': [], 'updated': [], 'removed': []}
+        
+        profiles = parse_bundle(data)
+        result = self._apply_profiles(profiles, meta.get('profiles', []))
+        self._save_meta(source, dict(validators, digest=digest, profiles=sorted(profiles)))
+        result['changed'] = any(result.values())
+        return result
+    
+    @writes_state
+    def _apply_profiles(self, profiles: Dict[str, Dict[str, Any]], owned: List[str]) -> Dict[str, List[str]]:
+        """Write changed profiles atomically and remove ones this source no longer publishes."""
+        config_dir = self.config_manager.config_dir
+        result = {'added': [], 'updated': [], 'removed': []}
+        for name in sorted(profiles):
+            path = config_dir / f'{name}.ini'
+            content = self.config_manager.render_config(profiles[name])
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    existing = f.read()
+            except FileNotFoundError:
+                existing = None
+            if existing == content:
+                continue
+            atomic_write_text(path, content)
+            result['added' if existing is None else 'updated'].append(name)
+        
+        # Only profiles this source published before are removed; local ones are left alone
+        for name in sorted(set(owned) - set(profiles)):
+            try:
+                (config_dir / f'{name}.ini').unlink()
+                result['removed'].append(name)
+            except FileNotFoundError:
+                pass
+        
+        # Keep completion and the cached shell statements in step, as save_config/delete_config do
+        changed = result['added'] + result['updated'] + result['removed']
+        if changed:
+            self.config_manager.refresh_completion_cache()
+            for name in changed:
+                self.config_manager.refresh_env_scripts(name)
+        return result
+    
+    def _save_meta(self, source: str, meta: Dict[str, Any]) -> None:
+        atomic_write_text(self._meta_path(source), json.dumps(dict(meta, source=source), separators=(',', ':')))
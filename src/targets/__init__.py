@@ -0,0 +1,297 @@
+"""
+ProxyManX Windows - Proxy Target Registry
+Discovers proxy targets (built-in, package entry points and the user plugin
+directory) and imports each target module only when it is selected or probed.
+
+Plugins describe themselves with a module-level literal that is read with
+``ast`` instead of importing the module::
+
+    TARGET_INFO = {
+        'name': 'mytool',
+        'class': 'MyToolProxyTarget',
+        'description': 'In-house tool proxy settings',
+        'executable': 'mytool',
+        'paths': ['~/.mytool']
+    }
+
+Entry points use the ``proxymanx.targets`` group with ``module:Class`` values;
+files dropped into ``~/.proxymanx/plugins`` are picked up as well.
+"""
+
+import ast
+import importlib
+import importlib.util
+import os
+import platform
+import shutil
+import sys
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+from targets.base import ProxyTarget
+
+ENTRY_POINT_GROUP = 'proxymanx.targets'
+PLUGIN_DIR = Path.home() / '.proxymanx' / 'plugins'
+
+
+class TargetSpec:
+    """Metadata for a proxy target; available without importing its module."""
+    
+    def __init__(self, name: str, module: str, class_name: str, description: str,
+                 executable: Union[str, tuple, None] = None, platforms: Optional[tuple] = None,
+                 paths: Optional[tuple] = None, source: str = 'builtin', path: Optional[Path] = None):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.description = description
+        self.executable = executable
+        self.platforms = platforms
+        self.paths = paths
+        self.source = source
+        self.path = path
+    
+    def load_class(self) -> type:
+        """Import the target module and return the target class."""
+        if self.path is not None:
+            module = _import_plugin_file(self.module, self.path)
+        else:
+            module = importlib.import_module(self.module)
+        return getattr(module, self.class_name)
+    
+    def is_available(self) -> bool:
+        """Check availability from metadata, importing the module only as a last resort."""
+        if self.platforms and platform.system() not in self.platforms:
+            return False
+        if self.executable or self.paths:
+            executables = (self.executable,) if isinstance(self.executable, str) else self.executable or ()
+            if any(shutil.which(name) is not None for name in executables):
+                return True
+            return any(Path(os.path.expandvars(os.path.expanduser(p))).exists()
+                       for p in self.paths or ())
+        if self.source == 'builtin':
+            return True
+        
+        # No metadata to decide on: probe the plugin itself
+        try:
+            return bool(self.load_class()().is_available())
+        except Exception:
+            return False
+
+
+# Built-in targets, in display order
+BUILTIN_TARGETS = [
+    TargetSpec('system', 'targets.system', 'SystemProxyTarget',
+               'Windows system proxy settings (Registry)', platforms=('Windows',)),
+    TargetSpec('environment', 'targets.environment', 'EnvironmentProxyTarget',
+               'Environment variables (HTTP_PROXY, HTTPS_PROXY)'),
+    TargetSpec('git', 'targets.git', 'GitProxyTarget',
+               'Git global proxy configuration', executable='git'),
+    TargetSpec('npm', 'targets.npm', 'NPMProxyTarget',
+               'NPM proxy settings (.npmrc, also read by Yarn 1)', executable='npm'),
+    TargetSpec('powershell', 'targets.powershell', 'PowerShellProxyTarget',
+               'PowerShell profile proxy settings'),
+    TargetSpec('python', 'targets.python', 'PythonPackagingProxyTarget',
+               'Python packaging (pip.ini, .condarc)'),
+    TargetSpec('docker', 'targets.docker', 'DockerProxyTarget',
+               'Docker client config.json (and optionally daemon.json)',
+               executable='docker', paths=('~/.docker',)),
+    TargetSpec('jvm', 'targets.jvm', 'JVMProxyTarget',
+               'Maven settings.xml and Gradle gradle.properties',
+               executable=('mvn', 'gradle'), paths=('~/.m2', '~/.gradle', '$GRADLE_USER_HOME')),
+    TargetSpec('vscode', 'targets.vscode', 'VSCodeProxyTarget',
+               'VS Code / Insiders user settings.json',
+               executable='code', paths=('$APPDATA/Code', '$APPDATA/Code - Insiders',
+                                         '~/.config/Code', '~/.config/Code - Insiders',
+                                         '~/Library/Application Support/Code')),
+    TargetSpec('yarn-pnpm', 'targets.yarnpnpm', 'YarnPnpmProxyTarget',
+               'Yarn 2+ (.yarnrc.yml) and pnpm global config',
+               executable=('yarn', 'pnpm'), paths=('~/.yarnrc.yml',)),
+]
+
+_specs_cache: Optional[Dict[str, TargetSpec]] = None
+
+
+def _read_target_info(path: Path) -> Dict[str, Any]:
+    """Read TARGET_INFO from a module's source without executing it.
+    
+    Falls back to the first class deriving from ProxyTarget when the module
+    has no TARGET_INFO or it does not name the class.
+    """
+    try:
+        tree = ast.parse(Path(path).read_text(encoding='utf-8'), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return {}
+    
+    info = {}
+    first_class = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == 'TARGET_INFO' for t in node.targets):
+            try:
+                info = dict(ast.literal_eval(node.value))
+            except (ValueError, TypeError):
+                info = {}
+        elif isinstance(node, ast.ClassDef) and first_class is None:
+            for base in node.bases:
+                base_name = base.attr if isinstance(base, ast.Attribute) else getattr(base, 'id', None)
+                if base_name == 'ProxyTarget':
+                    first_class = node.name
+    
+    if first_class and not info.get('class'):
+        info['class'] = first_class
+    return info
+
+
+def _spec_from_info(info: Dict[str, Any], default_name: str, module: str, class_name: Optional[str],
+                    source: str, path: Optional[Path] = None) -> Optional[TargetSpec]:
+    """Build a TargetSpec from TARGET_INFO, or None if no class can be determined."""
+    class_name = class_name or info.get('class')
+    if not class_name:
+        return None
+    platforms = info.get('platforms')
+    paths = info.get('paths')
+    executable = info.get('executable')
+    return TargetSpec(
+        name=info.get('name', default_name),
+        module=module,
+        class_name=class_name,
+        description=info.get('description', default_name),
+        executable=tuple(executable) if isinstance(executable, (list, tuple)) else executable,
+        platforms=tuple(platforms) if platforms else None,
+        paths=tuple(paths) if paths else None,
+        source=source,
+        path=path
+    )
+
+
+def _entry_point_specs() -> List[TargetSpec]:
+    """Targets registered by installed packages under ENTRY_POINT_GROUP."""
+    try:
+        from importlib import metadata
+    except ImportError:  # Python 3.7
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            return []
+    
+    try:
+        all_entry_points = metadata.entry_points()
+        if hasattr(all_entry_points, 'select'):
+            entry_points = all_entry_points.select(group=ENTRY_POINT_GROUP)
+        else:
+            entry_points = all_entry_points.get(ENTRY_POINT_GROUP, [])
+    except Exception:
+        return []
+    
+    specs = []
+    for entry_point in entry_points:
+        module, _, class_name = entry_point.value.partition(':')
+        module = module.strip()
+        
+        # Locate the module source without executing it
+        info = {}
+        try:
+            module_spec = importlib.util.find_spec(module)
+            if module_spec and module_spec.origin and module_spec.origin.endswith('.py'):
+                info = _read_target_info(Path(module_spec.origin))
+        except (ImportError, ValueError):
+            pass
+        
+        spec = _spec_from_info(info, entry_point.name, module, class_name.strip() or None, 'entry_point')
+        if spec:
+            spec.name = entry_point.name
+            specs.append(spec)
+    return specs
+
+
+def _plugin_dir_specs(plugin_dir: Path = None) -> List[TargetSpec]:
+    """Targets dropped into the user plugin directory as single .py files."""
+    plugin_dir = plugin_dir or PLUGIN_DIR
+    if not plugin_dir.is_dir():
+        return []
+    
+    specs = []
+    for path in sorted(plugin_dir.glob('*.py')):
+        if path.name.startswith('_'):
+            continue
+        info = _read_target_info(path)
+        spec = _spec_from_info(info, path.stem, f"proxymanx_plugin_{path.stem}", None, 'plugin', path)
+        if spec:
+            specs.append(spec)
+    return specs
+
+
+def _import_plugin_file(module_name: str, path: Path):
+    """Import a plugin file under a private module name (once)."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_spec = importlib.util.spec_from_file_location(module_name, str(path))
+    module = importlib.util.module_from_spec(module_spec)
+    sys.modules[module_name] = module
+    try:
+        module_spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def get_target_specs(refresh: bool = False) -> Dict[str, TargetSpec]:
+    """All known targets by name; plugins override built-ins of the same name."""
+    global _specs_cache
+    if _specs_cache is None or refresh:
+        specs = {}
+        for spec in BUILTIN_TARGETS + _entry_point_specs() + _plugin_dir_specs():
+            specs[spec.name] = spec
+        _specs_cache = specs
+    return _specs_cache
+
+
+class LazyTargets(Mapping):
+    """Mapping of target name to instance that imports and creates targets on first access."""
+    
+    def __init__(self, specs: Dict[str, TargetSpec]):
+        self._specs = specs
+        self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name: str) -> ProxyTarget:
+        spec = self._specs[name]
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # One lock per target: a slow constructor (PowerShell's spawns a process)
+        # only holds up callers of that same target
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._instances:
+                self._instances[name] = spec.load_class()()
+            return self._instances[name]
+    
+    def __iter__(self):
+        return iter(self._specs)
+    
+    def __len__(self) -> int:
+        return len(self._specs)
+    
+    def __contains__(self, name) -> bool:
+        return name in self._specs
+
+
+def create_target(name: str) -> ProxyTarget:
+    """Import and instantiate a single target by name."""
+    return get_target_specs()[name].load_class()()
+
+
+def get_available_targets() -> LazyTargets:
+    """Get all available proxy targets on the system."""
+    available = {name: spec for name, spec in get_target_specs().items() if spec.is_available()}
+    return LazyTargets(available)
+
+
+def get_target_descriptions() -> Dict[str, str]:
+    """Get descriptions for all proxy targets."""
+    return {name: spec.description for name, spec in get_target_specs().items()}
@@ -0,0 +1,114 @@
+"""
+ProxyManX Windows - Proxy Target Base
+Common base class and registry helpers shared by all proxy targets.
+"""
+
+import platform
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional
+
+# Windows-specific imports
+if platform.system() == "Windows":
+    import winreg
+else:
+    # Mock winreg for non-Windows systems (for development/testing)
+    class MockWinreg:
+        HKEY_CURRENT_USER = None
+        KEY_SET_VALUE = None
+        KEY_READ = None
+        REG_DWORD = None
+        REG_SZ = None
+        REG_BINARY = None
+        
+        @staticmethod
+        def OpenKey(*args, **kwargs):
+            raise OSError("winreg not available on non-Windows systems")
+        
+        @staticmethod
+        def CreateKey(*args, **kwargs):
+            raise OSError("winreg not available on non-Windows systems")
+        
+        @staticmethod
+        def SetValueEx(*args, **kwargs):
+            raise OSError("winreg not available on non-Windows systems")
+        
+        @staticmethod
+        def QueryValueEx(*args, **kwargs):
+            raise OSError("winreg not available on non-Windows systems")
+        
+        @staticmethod
+        def DeleteValue(*args, **kwargs):
+            raise OSError("winreg not available on non-Windows systems")
+        
+        @staticmethod
+        def CloseKey(*args, **kwargs):
+            pass
+    
+    winreg = MockWinreg()
+
+
+def read_registry_values(sub_key: str, names) -> Dict[str, Any]:
+    """Read HKCU values, mapping missing values (or an unreadable key) to None."""
+    values = {name: None for name in names}
+    try:
+        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, sub_key, 0, winreg.KEY_READ)
+    except Exception:
+        return values
+    try:
+        for name in names:
+            try:
+                values[name] = winreg.QueryValueEx(key, name)[0]
+            except FileNotFoundError:
+                pass
+    finally:
+        winreg.CloseKey(key)
+    return values
+
+
+class ProxyTarget(ABC):
+    """Abstract base class for proxy targets."""
+    
+    @abstractmethod
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set proxy configuration for this target."""
+        pass
+    
+    @abstractmethod
+    def unset_proxy(self) -> bool:
+        """Unset proxy configuration for this target."""
+        pass
+    
+    @abstractmethod
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current proxy configuration for this target."""
+        pass
+    
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check if this target is available on the system."""
+        pass
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw values this target touches so they can be restored later.
+        
+        The returned dict must be JSON-serializable; it is stored in the
+        transaction journal. Targets should override this together with
+        restore_state() to record their exact keys.
+        """
+        return {'settings': self.list_proxy()}
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore values captured by snapshot_state()."""
+        if state.get('settings') is None:
+            return self.unset_proxy()
+        return False
+    
+    def state_sources(self) -> Optional[Dict[str, List]]:
+        """Describe where list_proxy() reads from, so 'status' can cache it.
+        
+        Returns a JSON-serializable dict with any of 'files' (paths, compared
+        by mtime and size), 'registry' ([sub_key, [value names]] pairs under
+        HKCU, compared by hash) and 'environ' (variable names). None means the
+        target cannot be tracked cheaply and is re-read on every status call.
+        """
+        return None
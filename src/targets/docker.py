@@ -0,0 +1,139 @@
+"""
+ProxyManX Windows - Docker Proxy Target
+Docker client (config.json) and optional daemon (daemon.json) proxy settings.
+"""
+
+import os
+import platform
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import get_json_section, patch_json_section, missing_files, remove_created_files
+from targets.base import ProxyTarget
+
+
+class DockerProxyTarget(ProxyTarget):
+    """Docker proxy settings.
+    
+    The client's proxies.default section is injected into containers and
+    builds. The daemon's proxies section (used for image pulls) is only
+    written when the profile sets 'docker_daemon'.
+    """
+    
+    CLIENT_KEYS = ['proxies', 'default']
+    DAEMON_KEYS = ['proxies']
+    
+    def __init__(self):
+        self.colors = get_colors()
+        config_dir = os.environ.get('DOCKER_CONFIG') or str(Path.home() / '.docker')
+        self.client_config_path = Path(config_dir) / 'config.json'
+        self.daemon_config_path = self._get_daemon_config_path()
+    
+    def is_available(self) -> bool:
+        """Docker is available when the CLI is on PATH or a config dir exists."""
+        return shutil.which('docker') is not None or self.client_config_path.parent.exists()
+    
+    def _get_daemon_config_path(self) -> Path:
+        """Get the daemon configuration file for this platform."""
+        if platform.system() == "Windows":
+            program_data = os.environ.get('ProgramData', r'C:\ProgramData')
+            return Path(program_data) / 'docker' / 'config' / 'daemon.json'
+        return Path('/etc/docker/daemon.json')
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set Docker proxy settings."""
+        try:
+            auth = (config.get('username'), config.get('password')) if config.get('use_auth') else (None, None)
+            http_proxy = format_proxy_url(config['http_host'], config['http_port'], *auth)
+            https_proxy = http_proxy
+            if config.get('https_host') and config.get('https_port'):
+                https_proxy = format_proxy_url(config['https_host'], config['https_port'], *auth)
+            
+            # Go's proxy matching understands CIDR but not '10.*' style wildcards
+            no_proxy = ','.join(wildcard_to_cidr(entry) for entry in split_no_proxy(config.get('no_proxy', '')))
+            
+            client = {'httpProxy': http_proxy, 'httpsProxy': https_proxy}
+            if no_proxy:
+                client['noProxy'] = no_proxy
+            patch_json_section(self.client_config_path, self.CLIENT_KEYS, client)
+            
+            if config.get('docker_daemon'):
+                daemon = {'http-proxy': http_proxy, 'https-proxy': https_proxy}
+                if no_proxy:
+                    daemon['no-proxy'] = no_proxy
+                if patch_json_section(self.daemon_config_path, self.DAEMON_KEYS, daemon, indent=2):
+                    print_info("Restart the Docker daemon to apply daemon proxy changes")
+            
+            print_success("Docker proxy settings updated")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to set Docker proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset Docker client proxy settings (and daemon settings if we can write them)."""
+        try:
+            patch_json_section(self.client_config_path, self.CLIENT_KEYS, None)
+            
+            try:
+                if patch_json_section(self.daemon_config_path, self.DAEMON_KEYS, None, indent=2):
+                    print_info("Restart the Docker daemon to apply daemon proxy changes")
+            except PermissionError:
+                pass  # Daemon settings are opt-in and may need admin rights
+            
+            print_success("Docker proxy settings cleared")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to unset Docker proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current Docker proxy settings."""
+        settings = {}
+        
+        client = get_json_section(self.client_config_path, self.CLIENT_KEYS)
+        if isinstance(client, dict):
+            settings.update({f'client_{key}': value for key, value in client.items()})
+        
+        try:
+            daemon = get_json_section(self.daemon_config_path, self.DAEMON_KEYS)
+        except (OSError, ValueError):
+            daemon = None
+        if isinstance(daemon, dict):
+            settings.update({f'daemon_{key}': value for key, value in daemon.items()})
+        
+        return settings if settings else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The client config.json and daemon.json."""
+        return {'files': [str(self.client_config_path), str(self.daemon_config_path)]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw client and daemon proxy sections."""
+        try:
+            daemon = get_json_section(self.daemon_config_path, self.DAEMON_KEYS)
+        except (OSError, ValueError):
+            daemon = None
+        return {
+            'client': get_json_section(self.client_config_path, self.CLIENT_KEYS),
+            'daemon': daemon,
+            'missing': missing_files([self.client_config_path, self.daemon_config_path])
+        }
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw client and daemon proxy sections."""
+        try:
+            patch_json_section(self.client_config_path, self.CLIENT_KEYS, state.get('client'))
+            try:
+                patch_json_section(self.daemon_config_path, self.DAEMON_KEYS, state.get('daemon'), indent=2)
+            except PermissionError:
+                if state.get('daemon') is not None:
+                    raise
+            remove_created_files(state.get('missing', []), skeletons=('{}',))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore Docker proxy: {e}")
+            return False
@@ -0,0 +1,154 @@
+"""
+ProxyManX Windows - Environment Proxy Target
+Proxy environment variables (process and persistent).
+"""
+
+import os
+import platform
+from typing import Dict, List, Any, Optional
+from utils import *
+from shellenv import PROXY_ENV_VARS, proxy_env_values
+from targets.base import ProxyTarget, winreg, read_registry_values
+
+
+class EnvironmentProxyTarget(ProxyTarget):
+    """Environment variables proxy settings."""
+    
+    PROXY_VARS = PROXY_ENV_VARS
+    
+    def __init__(self):
+        self.colors = get_colors()
+    
+    def is_available(self) -> bool:
+        """Environment variables are always available."""
+        return True
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set environment variable proxy settings."""
+        try:
+            # Same values 'proxymanx env' and the directory hooks emit
+            env_vars = proxy_env_values(config)
+            
+            # Set environment variables for current process
+            for key, value in env_vars.items():
+                os.environ[key] = value
+            
+            # Set persistent environment variables
+            success = self._set_persistent_env_vars(env_vars)
+            
+            if success:
+                print_success("Environment proxy variables set")
+                print_info("New processes pick up the variables; run 'proxymanx env' to update an open shell")
+            else:
+                print_warning("Environment variables set for current session only")
+            
+            return True
+            
+        except Exception as e:
+            print_error(f"Failed to set environment proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset environment variable proxy settings."""
+        try:
+            # Remove from current process
+            proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'NO_PROXY', 'no_proxy']
+            
+            for var in proxy_vars:
+                if var in os.environ:
+                    del os.environ[var]
+            
+            # Remove persistent environment variables (Windows only)
+            if platform.system() == "Windows":
+                success = self._remove_persistent_env_vars(proxy_vars)
+                if success:
+                    print_success("Environment proxy variables cleared")
+                else:
+                    print_warning("Environment variables cleared for current session only")
+            else:
+                print_success("Environment proxy variables cleared (current session)")
+            
+            return True
+            
+        except Exception as e:
+            print_error(f"Failed to unset environment proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current environment proxy settings."""
+        proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'NO_PROXY', 'http_proxy', 'https_proxy', 'no_proxy']
+        found_vars = {}
+        
+        for var in proxy_vars:
+            value = os.environ.get(var)
+            if value:
+                found_vars[var] = value
+        
+        return found_vars if found_vars else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The process environment variables read by list_proxy(), plus the persistent ones."""
+        sources = {'environ': list(self.PROXY_VARS)}
+        if platform.system() == "Windows":
+            sources['registry'] = [["Environment", list(self.PROXY_VARS)]]
+        return sources
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture process and persistent (HKCU\\Environment) proxy variables."""
+        state = {'process': {var: os.environ.get(var) for var in self.PROXY_VARS}}
+        if platform.system() == "Windows":
+            state['persistent'] = read_registry_values("Environment", self.PROXY_VARS)
+        return state
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore process and persistent proxy variables."""
+        try:
+            for var, value in state.get('process', {}).items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+            
+            persistent = state.get('persistent')
+            if persistent is not None:
+                present = {k: v for k, v in persistent.items() if v is not None}
+                missing = [k for k, v in persistent.items() if v is None]
+                if present and not self._set_persistent_env_vars(present):
+                    return False
+                if missing and not self._remove_persistent_env_vars(missing):
+                    return False
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore environment proxy: {e}")
+            return False
+    
+    def _set_persistent_env_vars(self, env_vars: Dict[str, str]) -> bool:
+        """Set persistent environment variables via Registry."""
+        try:
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0, winreg.KEY_SET_VALUE)
+            
+            for name, value in env_vars.items():
+                winreg.SetValueEx(key, name, 0, winreg.REG_SZ, value)
+            
+            winreg.CloseKey(key)
+            return True
+            
+        except Exception:
+            return False
+    
+    def _remove_persistent_env_vars(self, var_names: List[str]) -> bool:
+        """Remove persistent environment variables via Registry."""
+        try:
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0, winreg.KEY_SET_VALUE)
+            
+            for name in var_names:
+                try:
+                    winreg.DeleteValue(key, name)
+                except FileNotFoundError:
+                    pass  # Variable doesn't exist
+            
+            winreg.CloseKey(key)
+            return True
+            
+        except Exception:
+            return False
@@ -0,0 +1,138 @@
+"""
+ProxyManX Windows - Git Proxy Target
+Global git proxy configuration.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import read_text, get_ini_option, missing_files, remove_created_files
+from targets.base import ProxyTarget
+
+# What older git versions leave behind after unsetting the last key of a section
+GIT_EMPTY_SECTIONS = ('[http]', '[https]', '[http][https]', '[https][http]')
+
+
+def _git_config_value(raw: str) -> str:
+    """Unquote a value as git reads it: drop inline comments and quotes, resolve escapes."""
+    value = []
+    quoted = False
+    chars = iter(raw.strip())
+    for char in chars:
+        if char == '"':
+            quoted = not quoted
+        elif char == '\\':
+            escaped = next(chars, '')
+            value.append({'n': '\n', 't': '\t', 'b': '\b'}.get(escaped, escaped))
+        elif char in ';#' and not quoted:
+            break
+        else:
+            value.append(char)
+    return ''.join(value).strip()
+
+
+class GitProxyTarget(ProxyTarget):
+    """Git proxy settings."""
+    
+    def __init__(self):
+        self.colors = get_colors()
+    
+    def is_available(self) -> bool:
+        """Check if git is available."""
+        success, _, _ = run_command("git --version")
+        return success
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set git proxy settings."""
+        try:
+            # Format proxy URL
+            proxy_url = format_proxy_url(
+                config['http_host'], config['http_port'],
+                config.get('username') if config.get('use_auth') else None,
+                config.get('password') if config.get('use_auth') else None
+            )
+            
+            # Set HTTP proxy
+            success1, _, err1 = run_command(f'git config --global http.proxy "{proxy_url}"')
+            
+            # Set HTTPS proxy
+            success2, _, err2 = run_command(f'git config --global https.proxy "{proxy_url}"')
+            
+            if success1 and success2:
+                print_success("Git proxy settings updated")
+                return True
+            else:
+                print_error(f"Failed to set git proxy: {err1} {err2}")
+                return False
+                
+        except Exception as e:
+            print_error(f"Failed to set git proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset git proxy settings."""
+        try:
+            # Remove HTTP proxy (ignore exit code - config may not exist)
+            success1, _, _ = run_command("git config --global --unset http.proxy")
+            
+            # Remove HTTPS proxy (ignore exit code - config may not exist)
+            success2, _, _ = run_command("git config --global --unset https.proxy")
+            
+            # Git config --unset returns exit code 5 when key doesn't exist, which is normal
+            # So we consider it successful regardless of exit code
+            print_success("Git proxy settings cleared")
+            return True
+            
+        except Exception as e:
+            print_error(f"Failed to unset git proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current git proxy settings."""
+        settings = {}
+        
+        # Get HTTP proxy
+        success, http_proxy, _ = run_command("git config --global http.proxy")
+        if success and http_proxy.strip():
+            settings['http'] = http_proxy.strip()
+        
+        # Get HTTPS proxy
+        success, https_proxy, _ = run_command("git config --global https.proxy")
+        if success and https_proxy.strip():
+            settings['https'] = https_proxy.strip()
+        
+        return settings if settings else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The global config files 'git config --global' reads."""
+        xdg_home = os.environ.get('XDG_CONFIG_HOME') or str(Path.home() / '.config')
+        files = [os.environ.get('GIT_CONFIG_GLOBAL') or str(Path.home() / '.gitconfig'),
+                 str(Path(xdg_home) / 'git' / 'config')]
+        return {'files': files, 'environ': ['GIT_CONFIG_GLOBAL']}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw global git proxy keys from the config files."""
+        files = self.state_sources()['files']
+        values = {}
+        for key in ('http.proxy', 'https.proxy'):
+            section, option = key.split('.')
+            values[key] = None
+            # The XDG file is read first, so ~/.gitconfig wins
+            for path in reversed(files):
+                raw = get_ini_option(read_text(path), section, option)
+                if raw is not None:
+                    values[key] = _git_config_value(raw) or None
+        return {'values': values, 'missing': missing_files(files)}
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw global git proxy keys."""
+        ok = True
+        for key, value in state.get('values', {}).items():
+            if value is None:
+                run_command(f"git config --global --unset {key}")
+            else:
+                success, _, _ = run_command(f'git config --global {key} "{value}"')
+                ok = ok and success
+        remove_created_files(state.get('missing', []), skeletons=GIT_EMPTY_SECTIONS)
+        return ok
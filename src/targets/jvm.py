@@ -0,0 +1,240 @@
+"""
+ProxyManX Windows - JVM Build Tool Proxy Target
+Maven (settings.xml) and Gradle (gradle.properties) proxy settings.
+"""
+
+import os
+import re
+import shutil
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+from xml.sax.saxutils import escape
+from utils import *
+from fileedit import (read_text, write_if_changed, get_properties, set_properties,
+                      read_xml_element, replace_xml_element, missing_files, remove_created_files)
+from targets.base import ProxyTarget
+
+MAVEN_SETTINGS_SKELETON = """<?xml version="1.0" encoding="UTF-8"?>
+<settings xmlns="http://maven.apache.org/SETTINGS/1.0.0"
+          xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+          xsi:schemaLocation="http://maven.apache.org/SETTINGS/1.0.0 https://maven.apache.org/xsd/settings-1.0.0.xsd">
+</settings>
+"""
+
+# A comment, or one <proxy> entry with the whitespace around it on its lines
+_PROXY_ENTRY_RE = re.compile(r'<!--.*?-->|[ \t]*<proxy(?:\s[^>]*)?>.*?</proxy\s*>[ \t]*(?:\r?\n)?', re.DOTALL)
+_OWN_PROXY_RE = re.compile(r'<id>\s*proxymanx-')
+
+GRADLE_PROXY_KEYS = [
+    f"systemProp.{scheme}.{name}"
+    for scheme in ('http', 'https')
+    for name in ('proxyHost', 'proxyPort', 'proxyUser', 'proxyPassword', 'nonProxyHosts')
+]
+
+
+def to_non_proxy_hosts(no_proxy: str) -> str:
+    """Translate a no_proxy list into Java's pipe-separated nonProxyHosts syntax.
+    
+    Java only supports a single '*' wildcard at the start or end of a
+    pattern, so '.example.com' becomes '*.example.com' and CIDR ranges on
+    octet boundaries become '10.*' style prefixes.
+    """
+    hosts = []
+    for entry in split_no_proxy(no_proxy):
+        if entry.startswith('.'):
+            entry = '*' + entry
+        elif '/' in entry:
+            address, _, bits = entry.partition('/')
+            octets = address.split('.')
+            if bits in ('8', '16', '24') and len(octets) == 4:
+                entry = '.'.join(octets[:int(bits) // 8]) + '.*'
+        hosts.append(entry)
+    return '|'.join(hosts)
+
+
+class JVMProxyTarget(ProxyTarget):
+    """Maven and Gradle proxy settings.
+    
+    Maven's <proxies> element is replaced by streaming settings.xml through
+    a temp file, so mirrors, servers and comments are copied through
+    untouched. Gradle's systemProp.* keys are edited line by line.
+    """
+    
+    def __init__(self):
+        self.colors = get_colors()
+        self.maven_settings_path = Path.home() / '.m2' / 'settings.xml'
+        gradle_home = os.environ.get('GRADLE_USER_HOME') or str(Path.home() / '.gradle')
+        self.gradle_properties_path = Path(gradle_home) / 'gradle.properties'
+    
+    def is_available(self) -> bool:
+        """Available when Maven or Gradle is installed or has a user directory."""
+        return self._uses_maven() or self._uses_gradle()
+    
+    def _uses_maven(self) -> bool:
+        return self.maven_settings_path.parent.exists() or shutil.which('mvn') is not None
+    
+    def _uses_gradle(self) -> bool:
+        return self.gradle_properties_path.parent.exists() or shutil.which('gradle') is not None
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set Maven and Gradle proxy settings."""
+        try:
+            non_proxy_hosts = to_non_proxy_hosts(config.get('no_proxy', ''))
+            use_auth = config.get('use_auth')
+            endpoints = {'http': (config['http_host'], config['http_port'])}
+            if config.get('https_host') and config.get('https_port'):
+                endpoints['https'] = (config['https_host'], config['https_port'])
+            else:
+                endpoints['https'] = endpoints['http']
+            
+            if self._uses_maven():
+                self._write_maven_proxies(self._maven_proxies(endpoints, config, non_proxy_hosts))
+            
+            if self._uses_gradle():
+                values = {}
+                for scheme, (host, port) in endpoints.items():
+                    prefix = f"systemProp.{scheme}."
+                    values[prefix + 'proxyHost'] = host
+                    values[prefix + 'proxyPort'] = str(port)
+                    values[prefix + 'proxyUser'] = config.get('username') if use_auth else None
+                    values[prefix + 'proxyPassword'] = config.get('password') if use_auth else None
+                    values[prefix + 'nonProxyHosts'] = non_proxy_hosts or None
+                self._write_gradle_properties(values)
+            
+            print_success("Maven/Gradle proxy settings updated")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to set Maven/Gradle proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset Maven and Gradle proxy settings."""
+        try:
+            self._write_maven_proxies([])
+            self._write_gradle_properties({key: None for key in GRADLE_PROXY_KEYS})
+            print_success("Maven/Gradle proxy settings cleared")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to unset Maven/Gradle proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current Maven and Gradle proxy settings."""
+        settings = {}
+        
+        proxies = read_xml_element(self.maven_settings_path, 'proxies', 'settings')
+        if proxies:
+            try:
+                for proxy in ET.fromstring(proxies).iter('proxy'):
+                    if (proxy.findtext('active') or 'true').strip() != 'true':
+                        continue
+                    protocol = (proxy.findtext('protocol') or 'http').strip()
+                    settings[f'maven_{protocol}'] = f"{proxy.findtext('host')}:{proxy.findtext('port')}"
+                    if proxy.findtext('nonProxyHosts'):
+                        settings['maven_nonProxyHosts'] = proxy.findtext('nonProxyHosts')
+            except ET.ParseError:
+                settings['maven'] = 'unparseable <proxies> element'
+        
+        values = get_properties(read_text(self.gradle_properties_path), GRADLE_PROXY_KEYS)
+        for key, value in values.items():
+            if value is not None and 'Password' not in key:
+                settings['gradle_' + key[len('systemProp.'):]] = value
+        
+        return settings if settings else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """Maven settings.xml and gradle.properties."""
+        return {'files': [str(self.maven_settings_path), str(self.gradle_properties_path)]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw <proxies> element and gradle proxy keys."""
+        return {
+            'maven_proxies': read_xml_element(self.maven_settings_path, 'proxies', 'settings'),
+            'gradle': get_properties(read_text(self.gradle_properties_path), GRADLE_PROXY_KEYS),
+            'missing': missing_files([self.maven_settings_path, self.gradle_properties_path])
+        }
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw <proxies> element and gradle proxy keys."""
+        try:
+            replace_xml_element(self.maven_settings_path, 'proxies', 'settings',
+                                state.get('maven_proxies'), skeleton=MAVEN_SETTINGS_SKELETON)
+            self._write_gradle_properties(state.get('gradle', {}))
+            remove_created_files(state.get('missing', []), skeletons=(MAVEN_SETTINGS_SKELETON,))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore Maven/Gradle proxy: {e}")
+            return False
+    
+    def _maven_proxies(self, endpoints: Dict[str, tuple], config: Dict[str, Any],
+                       non_proxy_hosts: str) -> List[str]:
+        """Render our <proxy> entries as lines relative to their own indentation."""
+        lines = []
+        for scheme, (host, port) in endpoints.items():
+            lines += [
+                "<proxy>",
+                f"  <id>proxymanx-{scheme}</id>",
+                "  <active>true</active>",
+                f"  <protocol>{scheme}</protocol>",
+                f"  <host>{escape(str(host))}</host>",
+                f"  <port>{port}</port>",
+            ]
+            if config.get('use_auth'):
+                lines += [
+                    f"  <username>{escape(config.get('username', ''))}</username>",
+                    f"  <password>{escape(config.get('password', ''))}</password>",
+                ]
+            if non_proxy_hosts:
+                lines.append(f"  <nonProxyHosts>{escape(non_proxy_hosts)}</nonProxyHosts>")
+            lines.append("</proxy>")
+        return lines
+    
+    def _write_maven_proxies(self, own: List[str]) -> bool:
+        """Replace our proxymanx-* <proxy> entries in settings.xml, keeping the user's own."""
+        existing = read_xml_element(self.maven_settings_path, 'proxies', 'settings')
+        element = _merge_maven_proxies(existing, own)
+        if element is None and existing is None:
+            return False
+        return replace_xml_element(self.maven_settings_path, 'proxies', 'settings', element,
+                                   skeleton=MAVEN_SETTINGS_SKELETON)
+    
+    def _write_gradle_properties(self, values: Dict[str, Optional[str]]) -> bool:
+        """Apply key changes to gradle.properties with a single atomic write."""
+        original = read_text(self.gradle_properties_path)
+        if not original and all(value is None for value in values.values()):
+            return False
+        return write_if_changed(self.gradle_properties_path, original, set_properties(original, values))
+
+
+def _merge_maven_proxies(existing: Optional[str], own: List[str]) -> Union[None, str, List[str]]:
+    """The <proxies> element with the proxymanx-* entries swapped for ``own``.
+    
+    The user's entries and comments are kept verbatim and ours go last. Returns
+    None when nothing is left, so the element is removed altogether.
+    """
+    kept = _PROXY_ENTRY_RE.sub(lambda m: '' if m.group(0).lstrip().startswith('<proxy')
+                               and _OWN_PROXY_RE.search(m.group(0)) else m.group(0), existing or '')
+    start_end = kept.find('>') + 1
+    close = kept.rfind('</')
+    if not kept or kept[start_end - 2] == '/' or not kept[start_end:close].strip():
+        if not own:
+            return None
+        return ["<proxies>"] + ["  " + line for line in own] + ["</proxies>"]
+    if not own:
+        return kept
+    
+    newline = '\r\n' if '\r\n' in kept else '\n'
+    head, tail = kept[:close], kept[close:]
+    line_start = head.rfind('\n') + 1
+    if head[line_start:].strip():
+        closing_indent = ''
+        head += newline
+    else:
+        closing_indent = head[line_start:]
+        head = head[:line_start]
+    sibling = re.search(r'^([ \t]*)<proxy[\s>]', kept, re.MULTILINE)
+    child_indent = sibling.group(1) if sibling else closing_indent + '  '
+    return head + ''.join(child_indent + line + newline for line in own) + closing_indent + tail
@@ -0,0 +1,129 @@
+"""
+ProxyManX Windows - NPM Proxy Target
+npm proxy configuration.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import read_text, write_if_changed, get_properties, set_properties, missing_files, remove_created_files
+from targets.base import ProxyTarget
+
+NPM_PROXY_KEYS = ['proxy', 'https-proxy', 'strict-ssl']
+
+
+class NPMProxyTarget(ProxyTarget):
+    """NPM proxy settings (.npmrc, also read by Yarn 1)."""
+    
+    def __init__(self):
+        self.colors = get_colors()
+    
+    def is_available(self) -> bool:
+        """Check if npm is available."""
+        success, _, _ = run_command("npm --version")
+        return success
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set npm proxy settings."""
+        try:
+            # Format proxy URL
+            proxy_url = format_proxy_url(
+                config['http_host'], config['http_port'],
+                config.get('username') if config.get('use_auth') else None,
+                config.get('password') if config.get('use_auth') else None
+            )
+            
+            # Set HTTP proxy
+            success1, _, err1 = run_command(f'npm config set proxy "{proxy_url}"')
+            
+            # Set HTTPS proxy
+            success2, _, err2 = run_command(f'npm config set https-proxy "{proxy_url}"')
+            
+            # Set strict-ssl to false for proxy compatibility
+            success3, _, err3 = run_command("npm config set strict-ssl false")
+            
+            if success1 and success2 and success3:
+                print_success("NPM proxy settings updated")
+                return True
+            else:
+                print_error(f"Failed to set npm proxy: {err1} {err2} {err3}")
+                return False
+                
+        except Exception as e:
+            print_error(f"Failed to set npm proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset npm proxy settings."""
+        try:
+            # Remove proxy settings (ignore exit codes - configs may not exist)
+            success1, _, _ = run_command("npm config delete proxy")
+            success2, _, _ = run_command("npm config delete https-proxy")
+            success3, _, _ = run_command("npm config set strict-ssl true")
+            
+            # npm config delete returns non-zero when key doesn't exist, which is normal
+            # So we consider it successful regardless of individual exit codes
+            print_success("NPM proxy settings cleared")
+            return True
+            
+        except Exception as e:
+            print_error(f"Failed to unset npm proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current npm proxy settings."""
+        settings = {}
+        
+        # Get HTTP proxy
+        success, http_proxy, _ = run_command("npm config get proxy")
+        if success and http_proxy.strip() and http_proxy.strip() != "null":
+            settings['http'] = http_proxy.strip()
+        
+        # Get HTTPS proxy
+        success, https_proxy, _ = run_command("npm config get https-proxy")
+        if success and https_proxy.strip() and https_proxy.strip() != "null":
+            settings['https'] = https_proxy.strip()
+        
+        # Get strict-ssl
+        success, strict_ssl, _ = run_command("npm config get strict-ssl")
+        if success and strict_ssl.strip():
+            settings['strict_ssl'] = strict_ssl.strip()
+        
+        return settings if settings else None
+    
+    @property
+    def userconfig_path(self) -> Path:
+        """The user .npmrc 'npm config set' writes to."""
+        userconfig = os.environ.get('NPM_CONFIG_USERCONFIG') or os.environ.get('npm_config_userconfig')
+        return Path(userconfig) if userconfig else Path.home() / '.npmrc'
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The user .npmrc and the npm_config_* overrides 'npm config get' sees."""
+        names = [f"{prefix}{key}" for prefix in ('npm_config_', 'NPM_CONFIG_')
+                 for key in ('proxy', 'https_proxy', 'strict_ssl', 'userconfig')]
+        return {'files': [str(self.userconfig_path)], 'environ': names}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw npm proxy keys from the user .npmrc."""
+        values = get_properties(read_text(self.userconfig_path), NPM_PROXY_KEYS)
+        for key, value in values.items():
+            if value and value.startswith('"') and value.endswith('"'):
+                try:
+                    values[key] = json.loads(value)
+                except ValueError:
+                    pass
+        return {'values': values, 'missing': missing_files([self.userconfig_path])}
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw npm proxy keys in the user .npmrc."""
+        try:
+            original = read_text(self.userconfig_path)
+            values = {key: value for key, value in state.get('values', {}).items() if key in NPM_PROXY_KEYS}
+            write_if_changed(self.userconfig_path, original, set_properties(original, values))
+            remove_created_files(state.get('missing', []))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore npm proxy: {e}")
+            return False
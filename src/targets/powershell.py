@@ -0,0 +1,210 @@
+"""
+ProxyManX Windows - PowerShell Proxy Target
+PowerShell profile proxy block.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import missing_files, remove_created_files
+from targets.base import ProxyTarget
+
+
+class PowerShellProxyTarget(ProxyTarget):
+    """PowerShell proxy settings."""
+    
+    BLOCK_BEGIN = "# >>> ProxyManX Windows - Proxy Settings >>>"
+    BLOCK_END = "# <<< ProxyManX Windows - Proxy Settings <<<"
+    LEGACY_HEADER = "# ProxyManX Windows - Proxy Settings"
+    
+    def __init__(self):
+        self.colors = get_colors()
+        self.profile_path = self._get_profile_path()
+    
+    def is_available(self) -> bool:
+        """PowerShell is always available on Windows."""
+        return True
+    
+    def _get_profile_path(self) -> Optional[Path]:
+        """Get PowerShell profile path."""
+        try:
+            # Get PowerShell profile path
+            success, output, _ = run_command('powershell -Command "$PROFILE"')
+            if success and output.strip():
+                return Path(output.strip())
+        except Exception:
+            pass
+        
+        # Fallback to default location
+        return Path.home() / "Documents" / "WindowsPowerShell" / "Microsoft.PowerShell_profile.ps1"
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set PowerShell proxy settings."""
+        try:
+            if not self.profile_path:
+                print_error("Could not determine PowerShell profile path")
+                return False
+            
+            # Format proxy URL
+            proxy_url = format_proxy_url(
+                config['http_host'], config['http_port'],
+                config.get('username') if config.get('use_auth') else None,
+                config.get('password') if config.get('use_auth') else None
+            )
+            
+            block_lines = [
+                self.BLOCK_BEGIN,
+                f'$env:HTTP_PROXY = "{proxy_url}"',
+                f'$env:HTTPS_PROXY = "{proxy_url}"',
+                f'$env:NO_PROXY = "{config.get("no_proxy", "")}"',
+                "",
+                "# Set system proxy for PowerShell web requests",
+                f'[System.Net.WebRequest]::DefaultWebProxy = New-Object System.Net.WebProxy("{proxy_url}")',
+                "[System.Net.WebRequest]::DefaultWebProxy.Credentials = [System.Net.CredentialCache]::DefaultCredentials",
+                self.BLOCK_END,
+            ]
+            
+            if self._update_profile(block_lines):
+                print_success("PowerShell proxy settings updated")
+                print_info("Restart PowerShell to apply changes")
+            else:
+                print_success("PowerShell proxy settings already up to date")
+            return True
+            
+        except Exception as e:
+            print_error(f"Failed to set PowerShell proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset PowerShell proxy settings."""
+        try:
+            self._update_profile(None)
+            print_success("PowerShell proxy settings cleared")
+            return True
+            
+        except Exception as e:
+            print_error(f"Failed to unset PowerShell proxy: {e}")
+            return False
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The profile script holding the managed block."""
+        return {'files': [str(self.profile_path)]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the managed profile block verbatim (None if absent)."""
+        content = self._read_profile()
+        span = self._find_block(content)
+        return {'block': content[span[0]:span[1]].splitlines() if span else None,
+                'missing': missing_files([self.profile_path])}
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Put the captured profile block back (or remove ours if there was none)."""
+        try:
+            self._update_profile(state.get('block'))
+            remove_created_files(state.get('missing', []))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore PowerShell profile: {e}")
+            return False
+    
+    def _read_profile(self) -> str:
+        """Read the profile as-is (line endings preserved), or '' if it does not exist."""
+        try:
+            with open(self.profile_path, 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+    
+    def _find_block(self, content: str) -> Optional[tuple]:
+        """Locate the managed block in the profile.
+        
+        Returns (start, end) offsets covering the block including its trailing
+        newline, or None if no block is present. Profiles written by older
+        versions (unmarked header followed by $env:/WebRequest lines) are
+        recognised too so they get migrated on the next write.
+        """
+        begin = content.find(self.BLOCK_BEGIN)
+        if begin != -1:
+            end = content.find(self.BLOCK_END, begin)
+            if end != -1:
+                end += len(self.BLOCK_END)
+                if content.startswith('\r\n', end):
+                    end += 2
+                elif content.startswith('\n', end):
+                    end += 1
+                return begin, end
+        else:
+            begin = content.find(self.LEGACY_HEADER)
+            if begin == -1:
+                return None
+        
+        # Legacy or truncated block: header, then only the lines we write
+        managed_prefixes = ("$env:HTTP_PROXY", "$env:HTTPS_PROXY", "$env:NO_PROXY",
+                            "[System.Net.WebRequest]::DefaultWebProxy",
+                            "# Set system proxy for PowerShell web requests")
+        pos = content.find('\n', begin)
+        end = len(content) if pos == -1 else pos + 1
+        while end < len(content):
+            pos = content.find('\n', end)
+            line_end = len(content) if pos == -1 else pos + 1
+            line = content[end:line_end].strip()
+            if line and not line.startswith(managed_prefixes):
+                break
+            end = line_end
+        
+        # Drop the blank separator line the legacy writer put before the header
+        head = content[:begin]
+        if head.endswith('\r\n\r\n') or head == '\r\n':
+            begin -= 2
+        elif head.endswith('\n\n') or head == '\n':
+            begin -= 1
+        return begin, end
+    
+    def _update_profile(self, block_lines: Optional[List[str]]) -> bool:
+        """Replace, insert or remove the managed block with a single read and write.
+        
+        Returns True if the profile was written, False if it was already up to date.
+        """
+        content = self._read_profile()
+        newline = '\r\n' if '\r\n' in content else '\n'
+        block = newline.join(block_lines) + newline if block_lines else ""
+        
+        span = self._find_block(content)
+        if span:
+            start, end = span
+            new_content = content[:start] + block + content[end:]
+        elif block:
+            if content and not content.endswith(('\n', '\r')):
+                content += newline
+            new_content = content + block
+        else:
+            return False
+        
+        if new_content == content:
+            return False
+        
+        atomic_write_text(self.profile_path, new_content)
+        return True
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current PowerShell proxy settings."""
+        try:
+            content = self._read_profile()
+            span = self._find_block(content)
+            if not span:
+                return None
+            
+            settings = {
+                'status': 'Configured',
+                'profile_path': str(self.profile_path)
+            }
+            for line in content[span[0]:span[1]].splitlines():
+                for var, key in (('$env:HTTP_PROXY', 'http'), ('$env:HTTPS_PROXY', 'https'),
+                                 ('$env:NO_PROXY', 'no_proxy')):
+                    if line.startswith(var + ' '):
+                        settings[key] = line.split('=', 1)[1].strip().strip('"')
+            return settings
+                
+        except Exception as e:
+            print_error(f"Failed to read PowerShell profile: {e}")
+            return None
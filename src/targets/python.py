@@ -0,0 +1,139 @@
+"""
+ProxyManX Windows - Python Packaging Proxy Target
+pip and conda proxy settings, written directly into their config files.
+"""
+
+import os
+import platform
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import (read_text, write_if_changed, get_ini_option, set_ini_option, get_yaml_block, set_yaml_block,
+                      missing_files, remove_created_files)
+from targets.base import ProxyTarget
+
+
+class PythonPackagingProxyTarget(ProxyTarget):
+    """pip (pip.ini / pip.conf) and conda (.condarc) proxy settings.
+    
+    The files are edited in place instead of running 'pip config' or
+    'conda config', which each cost an interpreter start. Neither tool has a
+    config key for bypass hosts (both honour NO_PROXY from the environment
+    target), and uv only reads proxies from the environment, so uv needs no
+    file changes.
+    """
+    
+    def __init__(self):
+        self.colors = get_colors()
+        self.pip_config_path = self._get_pip_config_path()
+        self.condarc_path = Path.home() / '.condarc'
+    
+    def is_available(self) -> bool:
+        """pip config can always be written from the running interpreter."""
+        return True
+    
+    def _get_pip_config_path(self) -> Path:
+        """Get the per-user pip configuration file."""
+        if platform.system() == "Windows":
+            appdata = os.environ.get('APPDATA') or str(Path.home() / 'AppData' / 'Roaming')
+            return Path(appdata) / 'pip' / 'pip.ini'
+        config_home = os.environ.get('XDG_CONFIG_HOME') or str(Path.home() / '.config')
+        return Path(config_home) / 'pip' / 'pip.conf'
+    
+    def _uses_conda(self) -> bool:
+        """Only manage .condarc when conda is installed or already configured."""
+        return (self.condarc_path.exists() or bool(os.environ.get('CONDA_EXE'))
+                or shutil.which('conda') is not None)
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set pip and conda proxy settings."""
+        try:
+            auth = (config.get('username'), config.get('password')) if config.get('use_auth') else (None, None)
+            http_proxy = format_proxy_url(config['http_host'], config['http_port'], *auth)
+            https_proxy = http_proxy
+            if config.get('https_host') and config.get('https_port'):
+                https_proxy = format_proxy_url(config['https_host'], config['https_port'], *auth)
+            
+            self._write_pip_proxy(http_proxy)
+            if self._uses_conda():
+                self._write_conda_proxies([
+                    "proxy_servers:",
+                    f"  http: {http_proxy}",
+                    f"  https: {https_proxy}",
+                ])
+            
+            print_success("Python packaging proxy settings updated")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to set Python packaging proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset pip and conda proxy settings."""
+        try:
+            self._write_pip_proxy(None)
+            if self.condarc_path.exists():
+                self._write_conda_proxies(None)
+            print_success("Python packaging proxy settings cleared")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to unset Python packaging proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current pip and conda proxy settings."""
+        settings = {}
+        
+        pip_proxy = get_ini_option(read_text(self.pip_config_path), 'global', 'proxy')
+        if pip_proxy:
+            settings['pip'] = pip_proxy
+        
+        conda_block = get_yaml_block(read_text(self.condarc_path), 'proxy_servers')
+        if conda_block:
+            for line in conda_block[1:]:
+                scheme, _, value = line.strip().partition(':')
+                if value.strip():
+                    settings[f'conda_{scheme.strip()}'] = value.strip()
+        
+        return settings if settings else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The pip config file and .condarc."""
+        return {'files': [str(self.pip_config_path), str(self.condarc_path)]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw pip option and conda block."""
+        return {
+            'pip_proxy': get_ini_option(read_text(self.pip_config_path), 'global', 'proxy'),
+            'conda_block': get_yaml_block(read_text(self.condarc_path), 'proxy_servers'),
+            'missing': missing_files([self.pip_config_path, self.condarc_path])
+        }
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw pip option and conda block."""
+        try:
+            self._write_pip_proxy(state.get('pip_proxy'))
+            if state.get('conda_block') or self.condarc_path.exists():
+                self._write_conda_proxies(state.get('conda_block'))
+            remove_created_files(state.get('missing', []), skeletons=('[global]',))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore Python packaging proxy: {e}")
+            return False
+    
+    def _write_pip_proxy(self, proxy_url: Optional[str]) -> bool:
+        """Set or remove [global] proxy in the pip config file."""
+        original = read_text(self.pip_config_path)
+        if not original and proxy_url is None:
+            return False
+        content = set_ini_option(original, 'global', 'proxy', proxy_url)
+        return write_if_changed(self.pip_config_path, original, content)
+    
+    def _write_conda_proxies(self, block: Optional[List[str]]) -> bool:
+        """Replace or remove the proxy_servers mapping in .condarc."""
+        original = read_text(self.condarc_path)
+        content = set_yaml_block(original, 'proxy_servers', block)
+        return write_if_changed(self.condarc_path, original, content)
@@ -0,0 +1,216 @@
+"""
+ProxyManX Windows - System Proxy Target
+Windows system proxy settings via the Registry: the plain Internet Settings
+values and the WinINet DefaultConnectionSettings blob, written as one set.
+"""
+
+import platform
+from typing import Dict, List, Any, Optional
+from utils import *
+from targets.base import ProxyTarget, winreg, read_registry_values
+from targets.wininet import BLOB_VALUE, CONNECTIONS_PATH, decode_settings, restamp
+
+
+class SystemProxyTarget(ProxyTarget):
+    """Windows system proxy settings via Registry."""
+    
+    VALUE_NAMES = ("ProxyEnable", "ProxyServer", "ProxyOverride")
+    
+    def __init__(self):
+        self.colors = get_colors()
+        self.reg_path = r"Software\Microsoft\Windows\CurrentVersion\Internet Settings"
+    
+    def is_available(self) -> bool:
+        """System proxy is only available on Windows."""
+        return platform.system() == "Windows"
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set system proxy settings."""
+        try:
+            # Check if we're on Windows
+            if platform.system() != "Windows":
+                print_warning("System proxy settings are only available on Windows")
+                return False
+            
+            proxy_server = f"{config['http_host']}:{config['http_port']}"
+            values = {"ProxyEnable": 1, "ProxyServer": proxy_server}
+            
+            # Set proxy override (no_proxy); WinINet separates entries with ';'
+            bypass = ';'.join(split_no_proxy(config.get('no_proxy') or ''))
+            if bypass:
+                values["ProxyOverride"] = bypass
+            
+            # WinINet clients read the binary blob, so it changes together with the plain values
+            settings = decode_settings(self._read_connection_settings())
+            settings = settings.updated(True, proxy_server, bypass or None)
+            self._write_values(values, {BLOB_VALUE: settings.to_bytes()})
+            
+            # Refresh system settings (with timeout protection)
+            self._refresh_system_settings()
+            
+            print_success("System proxy settings updated")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to set system proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset system proxy settings."""
+        try:
+            # Check if we're on Windows
+            if platform.system() != "Windows":
+                print_warning("System proxy settings are only available on Windows")
+                return True  # Return True to not break the chain
+            
+            # Disable proxy and clear server and override, in the blob as well
+            values = {"ProxyEnable": 0, "ProxyServer": "", "ProxyOverride": ""}
+            settings = decode_settings(self._read_connection_settings()).updated(False, "", "")
+            self._write_values(values, {BLOB_VALUE: settings.to_bytes()})
+            
+            # Refresh system settings (with timeout protection)
+            self._refresh_system_settings()
+            
+            print_success("System proxy settings cleared")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to unset system proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current system proxy settings."""
+        try:
+            # Check if we're on Windows
+            if platform.system() != "Windows":
+                return None
+            
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.reg_path, 0, winreg.KEY_READ)
+            
+            try:
+                proxy_enable = winreg.QueryValueEx(key, "ProxyEnable")[0]
+                proxy_server = winreg.QueryValueEx(key, "ProxyServer")[0]
+                proxy_override = winreg.QueryValueEx(key, "ProxyOverride")[0]
+                
+                winreg.CloseKey(key)
+                
+                if proxy_enable:
+                    return {
+                        'status': 'Enabled',
+                        'server': proxy_server,
+                        'override': proxy_override
+                    }
+                else:
+                    return {
+                        'status': 'Disabled',
+                        'server': proxy_server,
+                        'override': proxy_override
+                    }
+            
+            except FileNotFoundError:
+                winreg.CloseKey(key)
+                return None
+        
+        except Exception as e:
+            print_error(f"Failed to read system proxy settings: {e}")
+            return None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """The Internet Settings values and the connection settings blob."""
+        return {'registry': [[self.reg_path, list(self.VALUE_NAMES)], [CONNECTIONS_PATH, [BLOB_VALUE]]]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw Internet Settings values and the connection settings blob (as hex)."""
+        blob = self._read_connection_settings()
+        return {
+            'values': read_registry_values(self.reg_path, self.VALUE_NAMES),
+            'connections': {BLOB_VALUE: None if blob is None else bytes(blob).hex()}
+        }
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw Internet Settings values and connection settings blob."""
+        try:
+            connections = {name: None if value is None else bytes.fromhex(value)
+                           for name, value in state['connections'].items()}
+            if connections.get(BLOB_VALUE) is not None:
+                # The old counter would look stale to WinINet; write it as a new change
+                connections[BLOB_VALUE] = restamp(connections[BLOB_VALUE], self._read_connection_settings())
+            self._write_values(state['values'], connections)
+            self._refresh_system_settings()
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore system proxy: {e}")
+            return False
+    
+    def _read_connection_settings(self) -> Optional[bytes]:
+        """The current DefaultConnectionSettings blob, or None when absent."""
+        return read_registry_values(CONNECTIONS_PATH, (BLOB_VALUE,))[BLOB_VALUE]
+    
+    def _write_values(self, values: Dict[str, Any], connections: Dict[str, Optional[bytes]]) -> None:
+        """Write Internet Settings values and Connections blobs as one set; None deletes a value.
+        
+        Both keys are opened before anything is written, so a key that cannot
+        be opened leaves every value unchanged.
+        """
+        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.reg_path, 0, winreg.KEY_SET_VALUE)
+        try:
+            connections_key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, CONNECTIONS_PATH) if connections else None
+        except Exception:
+            winreg.CloseKey(key)
+            raise
+        try:
+            for handle, items in ((key, values), (connections_key, connections)):
+                for name, value in items.items():
+                    if value is None:
+                        try:
+                            winreg.DeleteValue(handle, name)
+                        except FileNotFoundError:
+                            pass
+                    else:
+                        winreg.SetValueEx(handle, name, 0, self._value_type(name), value)
+        finally:
+            winreg.CloseKey(key)
+            if connections_key is not None:
+                winreg.CloseKey(connections_key)
+    
+    @staticmethod
+    def _value_type(name: str) -> int:
+        if name == "ProxyEnable":
+            return winreg.REG_DWORD
+        return winreg.REG_BINARY if name == BLOB_VALUE else winreg.REG_SZ
+    
+    def _refresh_system_settings(self) -> None:
+        """Refresh system proxy settings."""
+        try:
+            # Skip refresh on non-Windows systems
+            if platform.system() != "Windows":
+                return
+            
+            # Notify system of proxy changes with timeout
+            import ctypes
+            from ctypes import wintypes
+            
+            # Set a timeout for the SendMessage call to prevent hanging
+            # Use SendMessageTimeout instead of SendMessage for better control
+            user32 = ctypes.windll.user32
+            SMTO_ABORTIFHUNG = 0x0002
+            SMTO_NORMAL = 0x0000
+            timeout_ms = 5000  # 5 second timeout
+            
+            # Use SendMessageTimeoutW to prevent hanging
+            result = user32.SendMessageTimeoutW(
+                0xFFFF,  # HWND_BROADCAST
+                0x1A,    # WM_SETTINGCHANGE
+                0,       # wParam
+                "Environment",  # lParam
+                SMTO_ABORTIFHUNG,  # fuFlags
+                timeout_ms,  # uTimeout
+                None     # lpdwResult
+            )
+            
+            if result == 0:
+                # SendMessageTimeout failed or timed out, but don't raise an error
+                pass
+        
+        except Exception:
+            pass  # Ignore errors in refresh
@@ -0,0 +1,110 @@
+"""
+ProxyManX Windows - VS Code Proxy Target
+http.proxy / http.noProxy / http.proxyStrictSSL in the VS Code user settings.
+"""
+
+import os
+import platform
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import read_text, get_jsonc_values, patch_jsonc_file, missing_files, remove_created_files
+from targets.base import ProxyTarget
+
+VSCODE_EDITIONS = ('Code', 'Code - Insiders')
+VSCODE_PROXY_KEYS = ['http.proxy', 'http.noProxy', 'http.proxyStrictSSL']
+
+
+class VSCodeProxyTarget(ProxyTarget):
+    """VS Code (stable and Insiders) user-level proxy settings.
+    
+    settings.json is JSONC, so only the spans of the managed keys are
+    rewritten; comments, trailing commas and formatting are kept.
+    """
+    
+    def __init__(self):
+        self.colors = get_colors()
+        self.settings_paths = self._get_settings_paths()
+    
+    def is_available(self) -> bool:
+        """Available when at least one VS Code edition has a user directory."""
+        return bool(self.settings_paths)
+    
+    def _get_settings_paths(self) -> List[Path]:
+        """Get settings.json for every installed edition."""
+        if platform.system() == "Windows":
+            base = Path(os.environ.get('APPDATA') or Path.home() / 'AppData' / 'Roaming')
+        elif platform.system() == "Darwin":
+            base = Path.home() / 'Library' / 'Application Support'
+        else:
+            base = Path(os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config')
+        return [base / edition / 'User' / 'settings.json'
+                for edition in VSCODE_EDITIONS if (base / edition).exists()]
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set VS Code proxy settings."""
+        try:
+            proxy_url = format_proxy_url(
+                config['http_host'], config['http_port'],
+                config.get('username') if config.get('use_auth') else None,
+                config.get('password') if config.get('use_auth') else None
+            )
+            
+            # Match the npm target: strict SSL off for intercepting proxies
+            values = {
+                'http.proxy': proxy_url,
+                'http.noProxy': split_no_proxy(config.get('no_proxy', '')) or None,
+                'http.proxyStrictSSL': False
+            }
+            for path in self.settings_paths:
+                patch_jsonc_file(path, values)
+            
+            print_success("VS Code proxy settings updated")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to set VS Code proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset VS Code proxy settings."""
+        try:
+            for path in self.settings_paths:
+                patch_jsonc_file(path, {key: None for key in VSCODE_PROXY_KEYS})
+            print_success("VS Code proxy settings cleared")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to unset VS Code proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current VS Code proxy settings."""
+        settings = {}
+        for path in self.settings_paths:
+            edition = path.parent.parent.name
+            for key, value in get_jsonc_values(read_text(path), VSCODE_PROXY_KEYS).items():
+                settings[f"{edition}: {key}"] = value
+        return settings if settings else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """settings.json of every installed edition."""
+        return {'files': [str(path) for path in self.settings_paths]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the managed keys of every settings file."""
+        return {
+            'files': {str(path): get_jsonc_values(read_text(path), VSCODE_PROXY_KEYS) for path in self.settings_paths},
+            'missing': missing_files(self.settings_paths)
+        }
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the managed keys of every settings file."""
+        try:
+            for path, values in state['files'].items():
+                patch_jsonc_file(path, {key: values.get(key) for key in VSCODE_PROXY_KEYS})
+            remove_created_files(state['missing'], skeletons=('{}',))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore VS Code proxy: {e}")
+            return False
@@ -0,0 +1,109 @@
+"""
+ProxyManX Windows - WinINet Connection Settings
+Encoder and decoder for the binary Connections\\DefaultConnectionSettings value,
+which WinINet (and everything built on it) reads instead of ProxyServer.
+"""
+
+import struct
+from typing import Optional
+
+CONNECTIONS_PATH = r"Software\Microsoft\Windows\CurrentVersion\Internet Settings\Connections"
+BLOB_VALUE = "DefaultConnectionSettings"
+
+# Structure version written by Internet Explorer 7 and later; kept as found when present
+DEFAULT_VERSION = 0x46
+
+# Flags DWORD
+PROXY_TYPE_DIRECT = 0x01
+PROXY_TYPE_PROXY = 0x02
+PROXY_TYPE_AUTO_PROXY_URL = 0x04
+PROXY_TYPE_AUTO_DETECT = 0x08
+
+# Auto-detect state Windows appends after the strings; zeroed in a freshly created blob
+EMPTY_TAIL = bytes(32)
+
+_HEADER = struct.Struct('<III')
+_LENGTH = struct.Struct('<I')
+
+
+class ConnectionSettings:
+    """Decoded DefaultConnectionSettings blob.
+    
+    Layout: version, change counter and flags DWORDs, then the proxy server,
+    bypass list and auto-config URL as length-prefixed ANSI strings. Whatever
+    follows (auto-detect state) is kept verbatim in ``tail``.
+    """
+    
+    def __init__(self, version: int = DEFAULT_VERSION, counter: int = 0, flags: int = PROXY_TYPE_DIRECT,
+                 proxy_server: str = '', bypass: str = '', auto_config_url: str = '', tail: bytes = b''):
+        self.version = version
+        self.counter = counter
+        self.flags = flags
+        self.proxy_server = proxy_server
+        self.bypass = bypass
+        self.auto_config_url = auto_config_url
+        self.tail = tail
+    
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> 'ConnectionSettings':
+        """Decode a blob; raises ValueError when it is truncated."""
+        view = memoryview(blob)
+        try:
+            version, counter, flags = _HEADER.unpack_from(view, 0)
+            offset = _HEADER.size
+            strings = []
+            for _ in range(3):
+                (length,) = _LENGTH.unpack_from(view, offset)
+                offset += _LENGTH.size
+                if offset + length > len(view):
+                    raise ValueError(f"string of {length} bytes overruns the blob")
+                strings.append(bytes(view[offset:offset + length]).decode('latin-1'))
+                offset += length
+        except struct.error:
+            raise ValueError(f"connection settings blob truncated at {len(blob)} bytes")
+        return cls(version, counter, flags, strings[0], strings[1], strings[2], bytes(view[offset:]))
+    
+    def to_bytes(self) -> bytes:
+        """Encode back to the registry layout."""
+        parts = [_HEADER.pack(self.version, self.counter & 0xFFFFFFFF, self.flags)]
+        for text in (self.proxy_server, self.bypass, self.auto_config_url):
+            data = text.encode('latin-1', 'replace')
+            parts.append(_LENGTH.pack(len(data)))
+            parts.append(data)
+        parts.append(self.tail)
+        return b''.join(parts)
+    
+    def updated(self, enable: bool, proxy_server: Optional[str] = None,
+                bypass: Optional[str] = None) -> 'ConnectionSettings':
+        """Copy with the manual proxy switched on or off and the counter bumped.
+        
+        None leaves a string as it was; auto-config and auto-detect are untouched.
+        """
+        flags = self.flags | PROXY_TYPE_DIRECT
+        flags = flags | PROXY_TYPE_PROXY if enable else flags & ~PROXY_TYPE_PROXY
+        return ConnectionSettings(
+            self.version, (self.counter + 1) & 0xFFFFFFFF, flags,
+            self.proxy_server if proxy_server is None else proxy_server,
+            self.bypass if bypass is None else bypass,
+            self.auto_config_url, self.tail
+        )
+
+
+def decode_settings(blob: Optional[bytes]) -> ConnectionSettings:
+    """Decode a stored blob, starting from defaults when it is missing or unreadable."""
+    if blob:
+        try:
+            return ConnectionSettings.from_bytes(bytes(blob))
+        except ValueError:
+            pass
+    return ConnectionSettings(tail=EMPTY_TAIL)
+
+
+def restamp(blob: bytes, current: Optional[bytes]) -> bytes:
+    """An older blob with its change counter moved past the current one's, so WinINet sees a change."""
+    try:
+        settings = ConnectionSettings.from_bytes(bytes(blob))
+    except ValueError:
+        return blob
+    settings.counter = (max(settings.counter, decode_settings(current).counter) + 1) & 0xFFFFFFFF
+    return settings.to_bytes()
@@ -0,0 +1,154 @@
+"""
+ProxyManX Windows - Yarn Berry / pnpm Proxy Target
+Yarn 2+ (.yarnrc.yml) and pnpm (global rc) proxy settings.
+"""
+
+import json
+import os
+import platform
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from utils import *
+from fileedit import (read_text, write_if_changed, get_yaml_block, set_yaml_block, get_properties, set_properties,
+                      missing_files, remove_created_files)
+from targets.base import ProxyTarget
+
+YARN_PROXY_KEYS = ['httpProxy', 'httpsProxy']
+PNPM_PROXY_KEYS = ['proxy', 'https-proxy', 'noproxy']
+
+
+class YarnPnpmProxyTarget(ProxyTarget):
+    """Yarn Berry and pnpm proxy settings.
+    
+    Both files are patched directly instead of running 'yarn config set' or
+    'pnpm config set', which boot Node for every key. Each file gets at
+    most one atomic write per operation. Yarn Berry has no bypass-list
+    setting, so no_proxy is only written for pnpm.
+    """
+    
+    def __init__(self):
+        self.colors = get_colors()
+        self.yarnrc_path = Path.home() / '.yarnrc.yml'
+        self.pnpm_rc_path = self._get_pnpm_rc_path()
+    
+    def is_available(self) -> bool:
+        """Available when yarn or pnpm is installed or configured."""
+        return self._uses_yarn() or self._uses_pnpm()
+    
+    def _get_pnpm_rc_path(self) -> Path:
+        """Get pnpm's global config file for this platform."""
+        if platform.system() == "Windows":
+            base = Path(os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local') / 'pnpm' / 'config'
+        elif platform.system() == "Darwin":
+            base = Path.home() / 'Library' / 'Preferences' / 'pnpm'
+        else:
+            base = Path(os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config') / 'pnpm'
+        return base / 'rc'
+    
+    def _uses_yarn(self) -> bool:
+        return self.yarnrc_path.exists() or shutil.which('yarn') is not None
+    
+    def _uses_pnpm(self) -> bool:
+        return self.pnpm_rc_path.exists() or shutil.which('pnpm') is not None
+    
+    def set_proxy(self, config: Dict[str, Any]) -> bool:
+        """Set Yarn Berry and pnpm proxy settings."""
+        try:
+            auth = (config.get('username'), config.get('password')) if config.get('use_auth') else (None, None)
+            http_proxy = format_proxy_url(config['http_host'], config['http_port'], *auth)
+            https_proxy = http_proxy
+            if config.get('https_host') and config.get('https_port'):
+                https_proxy = format_proxy_url(config['https_host'], config['https_port'], *auth)
+            
+            if self._uses_yarn():
+                self._write_yarn({'httpProxy': http_proxy, 'httpsProxy': https_proxy})
+            if self._uses_pnpm():
+                no_proxy = ','.join(split_no_proxy(config.get('no_proxy', '')))
+                self._write_pnpm({'proxy': http_proxy, 'https-proxy': https_proxy,
+                                  'noproxy': no_proxy or None})
+            
+            print_success("Yarn/pnpm proxy settings updated")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to set Yarn/pnpm proxy: {e}")
+            return False
+    
+    def unset_proxy(self) -> bool:
+        """Unset Yarn Berry and pnpm proxy settings."""
+        try:
+            self._write_yarn({key: None for key in YARN_PROXY_KEYS})
+            self._write_pnpm({key: None for key in PNPM_PROXY_KEYS})
+            print_success("Yarn/pnpm proxy settings cleared")
+            return True
+        
+        except Exception as e:
+            print_error(f"Failed to unset Yarn/pnpm proxy: {e}")
+            return False
+    
+    def list_proxy(self) -> Optional[Dict[str, Any]]:
+        """List current Yarn Berry and pnpm proxy settings."""
+        settings = {}
+        for key, value in self._read_yarn().items():
+            if value is not None:
+                settings[f'yarn_{key}'] = value
+        for key, value in get_properties(read_text(self.pnpm_rc_path), PNPM_PROXY_KEYS).items():
+            if value is not None:
+                settings[f'pnpm_{key}'] = value
+        return settings if settings else None
+    
+    def state_sources(self) -> Dict[str, List]:
+        """.yarnrc.yml and pnpm's global rc file."""
+        return {'files': [str(self.yarnrc_path), str(self.pnpm_rc_path)]}
+    
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Capture the raw yarn and pnpm proxy keys."""
+        return {
+            'yarn': self._read_yarn(),
+            'pnpm': get_properties(read_text(self.pnpm_rc_path), PNPM_PROXY_KEYS),
+            'missing': missing_files([self.yarnrc_path, self.pnpm_rc_path])
+        }
+    
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Restore the raw yarn and pnpm proxy keys."""
+        try:
+            self._write_yarn(state.get('yarn', {}))
+            self._write_pnpm(state.get('pnpm', {}))
+            remove_created_files(state.get('missing', []))
+            return True
+        except Exception as e:
+            print_error(f"Failed to restore Yarn/pnpm proxy: {e}")
+            return False
+    
+    def _read_yarn(self) -> Dict[str, Optional[str]]:
+        """Read the proxy keys from .yarnrc.yml."""
+        content = read_text(self.yarnrc_path)
+        values = {}
+        for key in YARN_PROXY_KEYS:
+            block = get_yaml_block(content, key)
+            value = block[0].split(':', 1)[1].strip() if block else None
+            if value and value[0] == '"':
+                value = json.loads(value)
+            elif value and value[0] == "'":
+                value = value[1:-1].replace("''", "'")
+            values[key] = value or None
+        return values
+    
+    def _write_yarn(self, values: Dict[str, Optional[str]]) -> bool:
+        """Apply key changes to .yarnrc.yml with a single atomic write."""
+        original = read_text(self.yarnrc_path)
+        if not original and all(value is None for value in values.values()):
+            return False
+        content = original
+        for key, value in values.items():
+            block = [f"{key}: {json.dumps(value)}"] if value is not None else None
+            content = set_yaml_block(content, key, block)
+        return write_if_changed(self.yarnrc_path, original, content)
+    
+    def _write_pnpm(self, values: Dict[str, Optional[str]]) -> bool:
+        """Apply key changes to pnpm's rc file with a single atomic write."""
+        original = read_text(self.pnpm_rc_path)
+        if not original and all(value is None for value in values.values()):
+            return False
+        return write_if_changed(self.pnpm_rc_path, original, set_properties(original, values))
@@ -5,15 +5,47 @@ Common utilities and helper functions used across the application.
 
 import os
 import sys
+import json
+import random
+import re
 import subprocess
 import ctypes
 import signal
-from typing import Dict, Any
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Iterator, Optional, TextIO, Union
 from colorama import init, Fore, Back, Style
 
 # Initialize colorama for Windows
 init(autoreset=True)
 
+# Machine-readable output mode: human-oriented messages are suppressed (or
+# captured per thread) and structured records are written with emit_json().
+_quiet = False
+_captured = threading.local()
+
+# Processes started by run_command(), counted per thread for the history log
+_spawns = threading.local()
+
+# Command-level time budget (a time.monotonic() value) shared by every thread,
+# narrower per-call budgets set with deadline_scope() on one thread, and the
+# commands cut short by either or by their own timeout, counted per thread
+_deadline = None
+_scoped_deadline = threading.local()
+_timeouts = threading.local()
+
+COMMAND_TIMEOUT = 30
+COMMAND_RETRIES = 2
+RETRY_BASE_DELAY = 0.1
+
+# stderr of failures worth retrying: lock contention and flaky networks
+TRANSIENT_ERRORS = re.compile(r"could not lock config file|unable to create '.*\.lock'|EBUSY|ECONNRESET|"
+                              r"ETIMEDOUT|EAI_AGAIN|being used by another process", re.IGNORECASE)
+
 
 def setup_signal_handlers():
     """Setup signal handlers for graceful shutdown."""
@@ -53,8 +85,46 @@ def get_colors() -> Dict[str, str]:
     }
 
 
+def set_quiet(quiet: bool) -> None:
+    """Enable or disable machine-readable mode (suppresses colored output)."""
+    global _quiet
+    _quiet = quiet
+
+
+def is_quiet() -> bool:
+    """Return True when human-oriented output is suppressed."""
+    return _quiet
+
+
+@contextmanager
+def capture_messages(always: bool = False) -> Iterator[List[str]]:
+    """Collect messages printed on this thread while in quiet mode.
+    
+    With always=True messages are collected instead of printed in every mode,
+    so worker threads cannot interleave their output with the main thread.
+    """
+    previous = (getattr(_captured, 'messages', None), getattr(_captured, 'always', False))
+    messages = []
+    _captured.messages, _captured.always = messages, always
+    try:
+        yield messages
+    finally:
+        _captured.messages, _captured.always = previous
+
+
+def emit_json(record: Dict[str, Any]) -> None:
+    """Write one record as a line of NDJSON and flush it immediately."""
+    sys.stdout.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+    sys.stdout.flush()
+
+
 def print_colored(text: str, color: str = None) -> None:
     """Print colored text to console."""
+    if _quiet or getattr(_captured, 'always', False):
+        messages = getattr(_captured, 'messages', None)
+        if messages is not None:
+            messages.append(text.strip())
+        return
     if color:
         print(f"{color}{text}{Style.RESET_ALL}")
     else:
@@ -84,6 +154,24 @@ def get_default_no_proxy() -> str:
     return "localhost,127.0.0.1,::1,*.local,10.*,192.168.*,172.16.*,172.17.*,172.18.*,172.19.*,172.20.*,172.21.*,172.22.*,172.23.*,172.24.*,172.25.*,172.26.*,172.27.*,172.28.*,172.29.*,172.30.*,172.31.*"
 
 
+def split_no_proxy(no_proxy: str) -> List[str]:
+    """Split a no_proxy string (comma or semicolon separated) into entries."""
+    return [entry.strip() for entry in no_proxy.replace(';', ',').split(',') if entry.strip()]
+
+
+def wildcard_to_cidr(entry: str) -> str:
+    """Convert an IPv4 wildcard such as '10.*' or '192.168.*' to CIDR notation.
+    
+    Entries that are not IPv4 wildcards are returned unchanged.
+    """
+    if not entry.endswith('.*'):
+        return entry
+    octets = entry[:-2].split('.')
+    if not 1 <= len(octets) <= 3 or not all(o.isdigit() and int(o) < 256 for o in octets):
+        return entry
+    return '.'.join(octets + ['0'] * (4 - len(octets))) + f"/{8 * len(octets)}"
+
+
 def validate_proxy_config(config: Dict[str, Any]) -> bool:
     """Validate proxy configuration."""
     required_fields = ['http_host', 'http_port']
@@ -117,24 +205,174 @@ def format_proxy_url(host: str, port: int, username: str = None, password: str =
     return f"{protocol}://{host}:{port}"
 
 
-def run_command(cmd: str, shell: bool = True) -> tuple:
-    """Run a system command and return the result."""
+def spawned_processes() -> int:
+    """Number of processes started by run_command() on this thread so far."""
+    return getattr(_spawns, 'count', 0)
+
+
+def set_deadline(seconds: Optional[float]) -> None:
+    """Give the rest of this command a time budget (None removes it)."""
+    global _deadline
+    _deadline = None if seconds is None else time.monotonic() + seconds
+
+
+def current_deadline() -> Optional[float]:
+    """The deadline in force on this thread (a time.monotonic() value), or None."""
+    scoped = getattr(_scoped_deadline, 'value', None)
+    return _deadline if scoped is None else scoped
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Inside the block, this thread's deadline is at most the given time.monotonic() value.
+    
+    None keeps the current deadline. Only the calling thread is affected, so
+    concurrent calls can each have their own budget; worker threads enter
+    the scope again with current_deadline() from the thread that started them.
+    """
+    saved = getattr(_scoped_deadline, 'value', None)
+    current = current_deadline()
+    if deadline is not None:
+        _scoped_deadline.value = deadline if current is None else min(current, deadline)
     try:
-        result = subprocess.run(
-            cmd,
-            shell=shell,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "Command timed out"
-    except KeyboardInterrupt:
-        print_colored("\n\nCommand interrupted by user", get_colors()['yellow'])
-        raise KeyboardInterrupt
-    except Exception as e:
-        return False, "", str(e)
+        yield
+    finally:
+        _scoped_deadline.value = saved
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the deadline (never negative), or None without one."""
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+@contextmanager
+def reserve_time(seconds: float) -> Iterator[None]:
+    """Inside the block, treat this thread's deadline as that many seconds earlier.
+    
+    The reserved time stays available afterwards, e.g. for rolling back what
+    the block changed.
+    """
+    deadline = current_deadline()
+    with deadline_scope(None if deadline is None else deadline - seconds):
+        yield
+
+
+def timed_out_commands() -> int:
+    """Number of run_command() calls on this thread that hit a timeout or the deadline."""
+    return getattr(_timeouts, 'count', 0)
+
+
+def _kill_process_tree(process: subprocess.Popen) -> None:
+    """Kill a process started by run_command() together with everything it started."""
+    try:
+        if os.name == 'nt':
+            subprocess.run(f"taskkill /F /T /PID {process.pid}", shell=True, capture_output=True, timeout=10)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        process.kill()
+        process.communicate(timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+
+def run_command(cmd: str, shell: bool = True, timeout: float = COMMAND_TIMEOUT,
+                retries: int = COMMAND_RETRIES) -> tuple:
+    """Run a system command and return the result.
+    
+    The command gets its own timeout or whatever is left of the deadline,
+    whichever is shorter, and its whole process tree is killed when that
+    runs out. Failures that look transient (see TRANSIENT_ERRORS) are retried
+    with jittered exponential backoff while the budget allows.
+    """
+    # A new process group/session lets a hung command be killed with all its children
+    if os.name == 'nt':
+        group = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {'start_new_session': True}
+    
+    for attempt in range(retries + 1):
+        remaining = time_remaining()
+        budget = timeout if remaining is None else min(timeout, remaining)
+        if budget <= 0:
+            _timeouts.count = timed_out_commands() + 1
+            return False, "", "Deadline exceeded"
+        
+        _spawns.count = spawned_processes() + 1
+        try:
+            process = subprocess.Popen(cmd, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       text=True, **group)
+        except Exception as e:
+            return False, "", str(e)
+        try:
+            stdout, stderr = process.communicate(timeout=budget)
+        except subprocess.TimeoutExpired:
+            _kill_process_tree(process)
+            _timeouts.count = timed_out_commands() + 1
+            return False, "", "Deadline exceeded" if budget < timeout else "Command timed out"
+        except KeyboardInterrupt:
+            _kill_process_tree(process)
+            print_colored("\n\nCommand interrupted by user", get_colors()['yellow'])
+            raise KeyboardInterrupt
+        except Exception as e:
+            _kill_process_tree(process)
+            return False, "", str(e)
+        
+        if process.returncode == 0 or attempt == retries or not TRANSIENT_ERRORS.search(stderr or ''):
+            return process.returncode == 0, stdout, stderr
+        
+        delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+        remaining = time_remaining()
+        if remaining is not None and delay >= remaining:
+            return False, stdout, stderr
+        time.sleep(delay)
+
+
+def atomic_write(path: Union[str, Path], writer: Callable[[TextIO], Optional[bool]],
+                 encoding: str = 'utf-8') -> bool:
+    """Replace a file atomically with what writer puts into a temp file beside it.
+    
+    A symlink is followed so the file it points to is updated and the link
+    kept, and an existing file keeps its permission bits. The writer may
+    return False to discard the temp file and leave the file untouched.
+    Returns True if the file was replaced.
+    """
+    path = Path(os.path.realpath(path))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as f:
+            keep = writer(f) is not False
+            f.flush()
+            os.fsync(f.fileno())
+        if not keep:
+            os.unlink(tmp_path)
+            return False
+        try:
+            shutil.copymode(path, tmp_path)
+        except FileNotFoundError:
+            pass  # New file: mkstemp's private mode is fine
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Union[str, Path], content: str, encoding: str = 'utf-8') -> None:
+    """Write text to a file atomically (temp file in the same directory, then rename)."""
+    def write(f: TextIO) -> None:
+        f.write(content)
+    
+    atomic_write(path, write, encoding)
 
 
 def get_user_input(prompt: str, default: str = None, password: bool = False) -> str:
@@ -192,7 +430,8 @@ def get_yes_no_input(prompt: str, default: bool = False) -> bool:
 
 def print_separator(char: str = '-', length: int = 60) -> None:
     """Print a separator line."""
-    print(char * length)
+    if not _quiet:
+        print(char * length)
 
 
 def print_header(title: str) -> None:
@@ -0,0 +1,118 @@
+"""
+ProxyManX Windows - Drift Watcher
+Watches the files and registry values targets write, and reports targets whose
+proxy settings another program changed after ProxyManX applied them.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Mapping, Optional
+from status import stamp_sources
+
+# Poll interval bounds: the interval doubles while nothing changes
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 30.0
+
+# A transaction older than this is assumed to have crashed rather than still be running
+OPERATION_GRACE = 60.0
+
+# Files ProxyManX itself writes around every set/unset/load/undo
+ACTIVITY_FILES = ('.journal.json', 'history.jsonl', '.active_profile')
+
+
+class DriftWatcher:
+    """Polls each target's state sources by stamp and compares raw values only when one changed."""
+    
+    def __init__(self, targets: Mapping, config_dir: Path):
+        self.targets = targets
+        self.config_dir = Path(config_dir)
+        self.sources = {}
+        self.stamps = {}
+        self.states = {}
+        self.activity = None
+    
+    def _snapshot(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.targets[name].snapshot_state()
+        except Exception:
+            return None
+    
+    def _activity_stamp(self) -> List:
+        return stamp_sources({'files': [str(self.config_dir / name) for name in ACTIVITY_FILES]})
+    
+    def _operation_running(self) -> bool:
+        """A journal newer than the history log means a transaction has started but not finished."""
+        try:
+            journal = os.stat(self.config_dir / '.journal.json').st_mtime
+        except OSError:
+            return False
+        if time.time() - journal > OPERATION_GRACE:
+            return False
+        try:
+            return journal > os.stat(self.config_dir / 'history.jsonl').st_mtime
+        except OSError:
+            return True
+    
+    def baseline(self, names: Optional[List[str]] = None) -> None:
+        """Take the current values of the given targets (default: all) as the expected ones."""
+        for name in names or list(self.targets.keys()):
+            try:
+                sources = self.targets[name].state_sources()
+            except Exception:
+                sources = None
+            if sources is None:
+                continue
+            self.sources[name] = sources
+            self.stamps[name] = stamp_sources(sources)
+            self.states[name] = self._snapshot(name)
+    
+    def start(self) -> None:
+        """Record the current state of ProxyManX's own files and of every target."""
+        self.activity = self._activity_stamp()
+        self.baseline()
+    
+    def untracked(self) -> List[str]:
+        """Targets that do not describe their sources and so cannot be watched."""
+        return [name for name in self.targets.keys() if name not in self.sources]
+    
+    def poll(self) -> List[str]:
+        """Names of targets whose proxy values changed since the baseline.
+        
+        Unchanged stamps cost one stat (or registry read) per source; a
+        target's values are only re-read when its stamps moved, and a file
+        touched without its proxy keys changing is not reported.
+        """
+        activity = self._activity_stamp()
+        if activity != self.activity or self._operation_running():
+            # ProxyManX itself changed the settings: they are the new baseline
+            self.activity = activity
+            self.baseline()
+            return []
+        
+        drifted = []
+        for name, sources in self.sources.items():
+            stamps = stamp_sources(sources)
+            if stamps == self.stamps[name]:
+                continue
+            self.stamps[name] = stamps
+            state = self._snapshot(name)
+            if state != self.states[name]:
+                self.states[name] = state
+                drifted.append(name)
+        return drifted
+    
+    def run(self, on_drift: Callable[[List[str]], None], min_interval: float = MIN_INTERVAL,
+            max_interval: float = MAX_INTERVAL) -> None:
+        """Poll until interrupted, backing off exponentially while nothing drifts."""
+        if self.activity is None:
+            self.start()
+        interval = min_interval
+        while True:
+            time.sleep(interval)
+            drifted = self.poll()
+            if drifted:
+                on_drift(drifted)
+                interval = min_interval
+            else:
+                interval = min(interval * 2, max_interval)
@@ -0,0 +1,22 @@
+"""
+ProxyManX Windows - Test Configuration
+Puts src/ on sys.path the way the proxymanx.py entry point does, and gives
+every test its own home directory so ~/.proxymanx is never the real one.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """A throwaway HOME/USERPROFILE for one test."""
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.setenv('USERPROFILE', str(home))
+    return home
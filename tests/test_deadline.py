@@ -0,0 +1,54 @@
+"""
+ProxyManX Windows - Transaction Deadline Tests
+A transaction's targets only get part of a deadline; the rest is kept back
+so a target that runs out of time can still be rolled back in full.
+"""
+
+import time
+
+from api import ROLLBACK_SHARE, ProxySession
+from config import ConfigManager
+from utils import capture_messages, time_remaining
+
+DEADLINE = 1.0
+
+
+class RecordingTarget:
+    """Records the time left when it is changed and when it is restored."""
+    
+    def __init__(self, slow=False):
+        self.slow = slow
+        self.changed_with = None
+        self.restored_with = None
+    
+    def snapshot_state(self):
+        return {'settings': 'old'}
+    
+    def restore_state(self, state):
+        self.restored_with = time_remaining()
+        return True
+    
+    def set_proxy(self, config):
+        self.changed_with = time_remaining()
+        # Work until the deadline this target sees runs out
+        while self.slow and time_remaining() > 0:
+            time.sleep(0.01)
+        return True
+
+
+def test_rollback_keeps_its_share_of_the_deadline(isolated_home):
+    slow, late = RecordingTarget(slow=True), RecordingTarget()
+    session = ProxySession({'slow': slow, 'late': late}, ConfigManager())
+    started = time.monotonic()
+    with capture_messages(always=True):
+        result = session.run_transaction('apply', ['slow', 'late'], lambda target: target.set_proxy({}),
+                                         deadline=started + DEADLINE)
+    
+    assert slow.changed_with <= DEADLINE * (1 - ROLLBACK_SHARE)
+    assert late.changed_with is None
+    assert result.status == 'rolled_back' and result.failed_target == 'late'
+    assert result.timed_out == ['late']
+    assert result.rollback == {'slow': True, 'late': True}
+    # Most of the reserve is still there when the rollback starts
+    assert slow.restored_with > DEADLINE * ROLLBACK_SHARE / 2
+    assert time.monotonic() - started < DEADLINE
@@ -0,0 +1,51 @@
+"""
+ProxyManX Windows - Directory Rules Tests
+The prefix index lists the longest directory first so its first match is the
+most specific rule, and Windows paths get the '/c/...' form Git Bash reports.
+"""
+
+import ntpath
+import types
+
+import dirrules
+from dirrules import DirectoryRules
+
+
+def _rules(tmp_path, text):
+    rules = DirectoryRules(tmp_path)
+    rules.rules_file.write_text(dirrules.RULES_HEADER + text)
+    return rules
+
+
+def test_longest_prefix_wins(tmp_path):
+    rules = _rules(tmp_path, "office  /work\n"
+                             "lab     /work/lab\n"
+                             "direct  /work/lab/offline\n"
+                             "home    /work-home\n")
+    assert [prefix for prefix, _ in rules.index_entries()] == [
+        '/work/lab/offline/', '/work-home/', '/work/lab/', '/work/']
+    assert rules.match('/work/lab/offline/cache') == 'direct'
+    assert rules.match('/work/lab/src') == 'lab'
+    assert rules.match('/work/lab') == 'lab'
+    assert rules.match('/work/laboratory') == 'office'
+    assert rules.match('/work-home/x') == 'home'
+    assert rules.match('/elsewhere') is None
+
+
+def test_later_rule_for_same_directory_wins(tmp_path):
+    rules = _rules(tmp_path, "office /work\nlab /work/\n")
+    assert rules.index_entries() == [('/work/', 'lab')]
+
+
+def test_windows_paths_get_git_bash_alias(tmp_path, monkeypatch):
+    rules = _rules(tmp_path, "office  C:\\Src\n"
+                             "lab     C:\\Src\\Lab\n"
+                             "home    D:/Home/\n")
+    monkeypatch.setattr(dirrules, 'os', types.SimpleNamespace(name='nt', path=ntpath))
+    assert rules.index_entries() == [
+        ('/c/src/lab/', 'lab'), ('c:/src/lab/', 'lab'),
+        ('/d/home/', 'home'), ('d:/home/', 'home'),
+        ('/c/src/', 'office'), ('c:/src/', 'office')]
+    assert rules.match('C:\\SRC\\lab\\tools') == 'lab'
+    assert rules.match('c:/src/other') == 'office'
+    assert rules.match('D:\\home') == 'home'
@@ -0,0 +1,199 @@
+"""
+ProxyManX Windows - File Target Snapshot Tests
+Snapshots read the config files directly (no tool processes), and restoring
+one removes the files the transaction created instead of leaving an empty
+skeleton behind, unless the user has put settings of their own in them.
+"""
+
+import json
+
+import pytest
+
+import targets.git
+import targets.npm
+from targets.docker import DockerProxyTarget
+from targets.git import GitProxyTarget
+from targets.jvm import JVMProxyTarget
+from targets.npm import NPMProxyTarget
+from targets.python import PythonPackagingProxyTarget
+from utils import capture_messages
+
+CONFIG = {'http_host': 'proxy.corp', 'http_port': 3128, 'no_proxy': 'localhost', 'use_auth': False}
+
+
+@pytest.fixture
+def no_commands(monkeypatch):
+    """Fail the test if a snapshot spawns npm or git."""
+    def run_command(command, *args, **kwargs):
+        raise AssertionError(f"snapshot ran {command!r}")
+    
+    monkeypatch.setattr(targets.npm, 'run_command', run_command)
+    monkeypatch.setattr(targets.git, 'run_command', run_command)
+
+
+def _round_trip(target):
+    """Snapshot through the JSON journal, apply CONFIG, then restore."""
+    state = json.loads(json.dumps(target.snapshot_state()))
+    with capture_messages(always=True):
+        assert target.set_proxy(CONFIG)
+        return state, lambda: target.restore_state(state)
+
+
+def test_pip_restore_removes_created_file(isolated_home):
+    target = PythonPackagingProxyTarget()
+    state, restore = _round_trip(target)
+    assert state['missing'] == [str(target.pip_config_path), str(target.condarc_path)]
+    assert 'proxy.corp' in target.pip_config_path.read_text()
+    
+    assert restore()
+    assert not target.pip_config_path.exists()
+
+
+def test_pip_restore_keeps_file_with_user_settings(isolated_home):
+    target = PythonPackagingProxyTarget()
+    state, restore = _round_trip(target)
+    with open(target.pip_config_path, 'a') as f:
+        f.write("timeout = 60\n")
+    
+    assert restore()
+    assert target.pip_config_path.read_text() == "[global]\ntimeout = 60\n"
+
+
+def test_docker_restore_removes_created_files(isolated_home, tmp_path):
+    target = DockerProxyTarget()
+    target.daemon_config_path = tmp_path / 'daemon.json'
+    state, restore = _round_trip(target)
+    assert json.loads(target.client_config_path.read_text())['proxies']
+    
+    assert restore()
+    assert not target.client_config_path.exists()
+    assert not target.daemon_config_path.exists()
+
+
+def test_docker_restore_keeps_existing_file(isolated_home, tmp_path):
+    target = DockerProxyTarget()
+    target.daemon_config_path = tmp_path / 'daemon.json'
+    target.client_config_path.parent.mkdir()
+    target.client_config_path.write_text('{}\n')
+    state, restore = _round_trip(target)
+    
+    assert restore()
+    assert json.loads(target.client_config_path.read_text()) == {}
+
+
+def test_jvm_restore_removes_created_files(isolated_home):
+    (isolated_home / '.m2').mkdir()
+    (isolated_home / '.gradle').mkdir()
+    target = JVMProxyTarget()
+    state, restore = _round_trip(target)
+    assert '<proxies>' in target.maven_settings_path.read_text()
+    assert 'systemProp.http.proxyHost=proxy.corp' in target.gradle_properties_path.read_text()
+    
+    assert restore()
+    assert not target.maven_settings_path.exists()
+    assert not target.gradle_properties_path.exists()
+
+
+def test_npm_snapshot_and_restore_use_npmrc(isolated_home, no_commands):
+    npmrc = isolated_home / '.npmrc'
+    npmrc.write_text('registry=https://registry.example/\nproxy="http://old:8080"\n; https-proxy=http://x\n')
+    target = NPMProxyTarget()
+    state = target.snapshot_state()
+    assert state == {'values': {'proxy': 'http://old:8080', 'https-proxy': None, 'strict-ssl': None}, 'missing': []}
+    
+    npmrc.write_text('registry=https://registry.example/\nproxy=http://new:1\nhttps-proxy=http://new:1\n'
+                     'strict-ssl=false\n; https-proxy=http://x\n')
+    assert target.restore_state(state)
+    assert npmrc.read_text() == 'registry=https://registry.example/\nproxy=http://old:8080\n; https-proxy=http://x\n'
+
+
+def test_npm_restore_removes_created_npmrc(isolated_home, no_commands):
+    target = NPMProxyTarget()
+    state = target.snapshot_state()
+    assert state['missing'] == [str(isolated_home / '.npmrc')]
+    (isolated_home / '.npmrc').write_text('proxy=http://new:1\nstrict-ssl=false\n')
+    
+    assert target.restore_state(state)
+    assert not (isolated_home / '.npmrc').exists()
+
+
+def test_git_snapshot_reads_config_files(isolated_home, no_commands, monkeypatch):
+    monkeypatch.delenv('GIT_CONFIG_GLOBAL', raising=False)
+    monkeypatch.delenv('XDG_CONFIG_HOME', raising=False)
+    xdg = isolated_home / '.config' / 'git' / 'config'
+    xdg.parent.mkdir(parents=True)
+    xdg.write_text('[http]\n\tproxy = http://xdg:1\n[https]\n\tproxy = http://xdg:2\n')
+    (isolated_home / '.gitconfig').write_text(
+        '[user]\n\tname = Someone\n[HTTP]\n\tproxy = "http://home:3128" ; set by hand\n')
+    
+    state = GitProxyTarget().snapshot_state()
+    # ~/.gitconfig is read after the XDG file, so its value wins
+    assert state['values'] == {'http.proxy': 'http://home:3128', 'https.proxy': 'http://xdg:2'}
+    assert state['missing'] == []
+
+
+def test_git_restore_removes_created_gitconfig(isolated_home, monkeypatch):
+    monkeypatch.delenv('GIT_CONFIG_GLOBAL', raising=False)
+    monkeypatch.delenv('XDG_CONFIG_HOME', raising=False)
+    target = GitProxyTarget()
+    state, restore = _round_trip(target)
+    assert 'proxy.corp' in (isolated_home / '.gitconfig').read_text()
+    
+    assert restore()
+    assert not (isolated_home / '.gitconfig').exists()
+
+
+MAVEN_SETTINGS = """<?xml version="1.0"?>
+<settings>
+  <proxies>
+    <!-- <proxy><id>proxymanx-http</id></proxy> -->
+    <proxy>
+      <id>corp</id>
+      <host>corp.proxy</host>
+      <port>80</port>
+    </proxy>
+  </proxies>
+</settings>
+"""
+
+
+def test_maven_keeps_user_proxies(isolated_home):
+    (isolated_home / '.m2').mkdir()
+    target = JVMProxyTarget()
+    target.maven_settings_path.write_text(MAVEN_SETTINGS)
+    with capture_messages(always=True):
+        assert target.set_proxy(CONFIG)
+        assert target.set_proxy(dict(CONFIG, http_port=8080))
+        content = target.maven_settings_path.read_text()
+        assert content.startswith(MAVEN_SETTINGS.split('  </proxies>')[0])
+        assert content.count('<id>proxymanx-') == 3 and content.count('<port>8080</port>') == 2
+        
+        assert target.unset_proxy()
+    assert target.maven_settings_path.read_text() == MAVEN_SETTINGS
+
+
+def test_maven_unset_removes_element_left_empty(isolated_home):
+    (isolated_home / '.m2').mkdir()
+    target = JVMProxyTarget()
+    target.maven_settings_path.write_text('<settings>\n  <mirrors/>\n</settings>\n')
+    with capture_messages(always=True):
+        assert target.set_proxy(CONFIG)
+        assert '<proxies>' in target.maven_settings_path.read_text()
+        assert target.unset_proxy()
+    assert target.maven_settings_path.read_text() == '<settings>\n  <mirrors/>\n</settings>\n'
+
+
+def test_maven_write_follows_symlink_and_keeps_mode(isolated_home, tmp_path):
+    (isolated_home / '.m2').mkdir()
+    real = tmp_path / 'dotfiles' / 'settings.xml'
+    real.parent.mkdir()
+    real.write_text(MAVEN_SETTINGS)
+    real.chmod(0o644)
+    target = JVMProxyTarget()
+    target.maven_settings_path.symlink_to(real)
+    with capture_messages(always=True):
+        assert target.set_proxy(CONFIG)
+    assert target.maven_settings_path.is_symlink()
+    assert '<id>proxymanx-http</id>' in real.read_text()
+    assert real.stat().st_mode & 0o777 == 0o644
+    assert [path.name for path in real.parent.iterdir()] == ['settings.xml']
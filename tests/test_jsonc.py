@@ -0,0 +1,41 @@
+"""
+ProxyManX Windows - JSONC Editing Tests
+Adding and removing top-level keys in settings.json leaves every comment
+where the user put it.
+"""
+
+import pytest
+
+from fileedit import _jsonc_set, get_jsonc_values
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{\n    "a": 1 // about a\n    // "b": off\n}\n',
+     '{\n    "a": 1, // about a\n    "k": true\n    // "b": off\n}\n'),
+    ('{\n    "a": 1, // about a\n}\n',
+     '{\n    "a": 1, // about a\n    "k": true,\n}\n'),
+    ('{\n    "a": 1 /* about\n       a */\n}\n',
+     '{\n    "a": 1, /* about\n       a */\n    "k": true\n}\n'),
+    ('{\r\n  "a": {"x": 1} // c\r\n}\r\n',
+     '{\r\n  "a": {"x": 1}, // c\r\n  "k": true\r\n}\r\n'),
+    ('{"a": 1}', '{"a": 1,\n    "k": true}'),
+])
+def test_append_keeps_trailing_comment_on_its_member(text, expected):
+    assert _jsonc_set(text, 'k', True) == expected
+    assert get_jsonc_values(expected, ['a', 'k'])['k'] is True
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{\n    "a": 1, // about a\n    // keep me\n    "b": 2\n}\n',
+     '{\n    "a": 1 // about a\n    // keep me\n}\n'),
+    ('{\n    "a": 1,\n    /* keep */ "b": 2\n}\n',
+     '{\n    "a": 1\n    /* keep */ \n}\n'),
+    ('{\n    "a": 1,\n    "b": 2 // about b\n}\n',
+     '{\n    "a": 1\n    // about b\n}\n'),
+    ('{\n    "b": 2, // about b\n    "c": 3\n}\n',
+     '{\n    // about b\n    "c": 3\n}\n'),
+    ('{"a": 1, "b": 2}', '{"a": 1 }'),
+    ('{\n  "b": 2\n}\n', '{\n}\n'),
+])
+def test_remove_deletes_only_member_and_its_comma(text, expected):
+    assert _jsonc_set(text, 'b', None) == expected
@@ -0,0 +1,51 @@
+"""
+ProxyManX Windows - Lazy Target Registry Tests
+Each target is created once, and a slow constructor only holds up callers
+asking for that same target.
+"""
+
+import threading
+import time
+
+from targets import LazyTargets
+
+SLOW_INIT = 0.5
+
+
+class SlowTarget:
+    created = 0
+    
+    def __init__(self):
+        SlowTarget.created += 1
+        time.sleep(SLOW_INIT)
+
+
+class FastTarget:
+    pass
+
+
+class Spec:
+    def __init__(self, cls):
+        self.cls = cls
+    
+    def load_class(self):
+        return self.cls
+
+
+def test_slow_constructor_does_not_block_other_targets():
+    SlowTarget.created = 0
+    targets = LazyTargets({'slow': Spec(SlowTarget), 'fast': Spec(FastTarget)})
+    results = []
+    slow = [threading.Thread(target=lambda: results.append(targets['slow'])) for _ in range(4)]
+    for thread in slow:
+        thread.start()
+    time.sleep(0.05)
+    
+    started = time.perf_counter()
+    assert isinstance(targets['fast'], FastTarget)
+    assert time.perf_counter() - started < SLOW_INIT / 2
+    
+    for thread in slow:
+        thread.join()
+    assert SlowTarget.created == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
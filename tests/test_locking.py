@@ -0,0 +1,168 @@
+"""
+ProxyManX Windows - State Locking Tests
+Hundreds of concurrent invocations in separate processes saving profiles,
+applying them and reading them back; nothing may be torn and no lock wait
+may come close to the lock timeout. A --deadline bounds every lock wait.
+"""
+
+import configparser
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import locking
+from api import ProxySession
+from config import ConfigManager
+from locking import LOCK_TIMEOUT, LockDeadline, LockTimeout, state_lock
+from utils import capture_messages, deadline_scope
+
+INVOCATIONS = 300
+PROCESSES = 32
+PROFILES = ['office', 'home', 'lab', 'vpn']
+
+# Long enough that a partial write cannot look complete
+BYPASS_REPEAT = 400
+
+# Upper bound for any single lock wait: far below LOCK_TIMEOUT, far above
+# the few milliseconds one writer holds the lock for
+MAX_LOCK_WAIT = 10.0
+
+
+class StressTarget:
+    """A target with nothing to change, so a transaction only touches the state directory."""
+    
+    def snapshot_state(self):
+        return {'settings': None}
+    
+    def restore_state(self, state):
+        return True
+    
+    def set_proxy(self, config):
+        return True
+    
+    def unset_proxy(self):
+        return True
+    
+    def list_proxy(self):
+        return None
+
+
+def _profile(name, generation):
+    return {'http_host': f"proxy-{generation}.{name}.example", 'http_port': 3128, 'https_host': '',
+            'https_port': '', 'ftp_host': '', 'ftp_port': '', 'use_auth': False, 'username': '',
+            'password': '', 'no_proxy': ','.join([f".{name}.example"] * BYPASS_REPEAT), 'use_same': True}
+
+
+def _config_problem(name, config):
+    """Why a loaded profile is not one that was written whole, or None."""
+    if not config:
+        return f"{name}: unreadable"
+    if config['no_proxy'] != ','.join([f".{name}.example"] * BYPASS_REPEAT):
+        return f"{name}: no_proxy torn"
+    if not config['http_host'].startswith('proxy-') or config['http_port'] != 3128:
+        return f"{name}: server torn"
+    return None
+
+
+def _invoke(task):
+    """One ProxyManX invocation: save, apply or read. Returns (kind, lock wait, problems)."""
+    home, index = task
+    os.environ['HOME'] = os.environ['USERPROFILE'] = home
+    name = PROFILES[index % len(PROFILES)]
+    kind = ('save', 'apply', 'read', 'read')[index % 4]
+    problems = []
+    with capture_messages(always=True):
+        manager = ConfigManager()
+        started = time.perf_counter()
+        if kind == 'read':
+            with state_lock().shared():
+                waited = time.perf_counter() - started
+                for profile in manager.list_configs():
+                    problem = _config_problem(profile, manager.load_config(profile))
+                    if problem:
+                        problems.append(problem)
+        else:
+            with state_lock().exclusive():
+                waited = time.perf_counter() - started
+                if kind == 'save':
+                    manager.save_config(name, _profile(name, index))
+                else:
+                    result = ProxySession({'stress': StressTarget()}, manager).apply(name)
+                    if not result.ok:
+                        problems.append(f"apply {name}: {result.status}")
+    return kind, waited, problems
+
+
+def test_concurrent_invocations_never_tear_state(isolated_home):
+    manager = ConfigManager()
+    with capture_messages(always=True):
+        for name in PROFILES:
+            manager.save_config(name, _profile(name, 0))
+    
+    tasks = [(str(isolated_home), index) for index in range(INVOCATIONS)]
+    with multiprocessing.get_context().Pool(PROCESSES) as pool:
+        results = pool.map(_invoke, tasks, chunksize=1)
+    
+    problems = [problem for _, _, found in results for problem in found]
+    assert not problems, problems[:10]
+    
+    waits = sorted(waited for _, waited, _ in results)
+    assert len(waits) == INVOCATIONS
+    assert waits[-1] < MAX_LOCK_WAIT < LOCK_TIMEOUT, f"p99 {waits[int(len(waits) * 0.99)]:.3f}s, max {waits[-1]:.3f}s"
+    
+    # Everything left on disk parses and is whole
+    config_dir = Path(isolated_home) / '.proxymanx'
+    for path in config_dir.glob('*.ini'):
+        parser = configparser.ConfigParser()
+        parser.read(path)
+        assert parser.has_section('proxy'), path
+        assert _config_problem(path.stem, manager.load_config(path.stem)) is None
+    journal = json.loads((config_dir / '.journal.json').read_text(encoding='utf-8'))
+    assert journal['profile'] in PROFILES
+    assert (config_dir / '.active_profile').read_text(encoding='utf-8') in PROFILES
+    for line in (config_dir / 'history.jsonl').read_text(encoding='utf-8').splitlines():
+        assert json.loads(line)['status'] == 'ok'
+    assert not list(config_dir.glob('.*.tmp')), "temp files left behind"
+
+
+@pytest.fixture
+def held_elsewhere(isolated_home):
+    """The state lock held exclusively through a second open file, as another process would."""
+    path = Path(isolated_home) / '.proxymanx' / locking.LOCK_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o600)
+    assert locking._try_lock(fd, True)
+    yield
+    locking._unlock(fd)
+    os.close(fd)
+
+
+def test_lock_wait_stops_at_the_deadline(held_elsewhere):
+    started = time.monotonic()
+    with deadline_scope(started + 0.2):
+        with pytest.raises(LockDeadline):
+            with state_lock().exclusive():
+                pass
+    assert time.monotonic() - started < 1.0
+    
+    # Without a deadline the lock's own timeout applies and is reported as such
+    with pytest.raises(LockTimeout) as error:
+        with state_lock().shared(timeout=0.1):
+            pass
+    assert not isinstance(error.value, LockDeadline)
+
+
+def test_transaction_reports_deadline_miss_while_waiting_for_lock(held_elsewhere):
+    target = StressTarget()
+    target.set_proxy = lambda config: pytest.fail("target changed without the lock")
+    session = ProxySession({'a': target, 'b': StressTarget()}, ConfigManager())
+    started = time.monotonic()
+    result = session.run_transaction('apply', ['a', 'b'], lambda t: t.set_proxy({}), deadline=started + 0.2)
+    assert time.monotonic() - started < 1.0
+    assert result.status == 'failed' and result.timed_out == ['a', 'b']
+    assert result.targets[0].error == "deadline exceeded"
+    assert not (Path(ConfigManager().config_dir) / '.journal.json').exists()
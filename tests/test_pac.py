@@ -0,0 +1,224 @@
+"""
+ProxyManX Windows - PAC Evaluation Tests
+The standard helpers, the sandbox and its step budget, the parse-tree cache,
+ETag revalidation of downloaded scripts and WPAD discovery up the domain.
+"""
+
+import calendar
+import http.server
+import threading
+
+import pytest
+
+import pacscript
+from pac import PacEngine, PacError, PacHelpers, PacLoader, wpad_urls
+from pacscript import PacScriptError, Script
+
+# Monday 19 October 2026, 14:30:00 GMT
+NOW = calendar.timegm((2026, 10, 19, 14, 30, 0))
+
+SCRIPT = """
+function FindProxyForURL(url, host) {
+    if (isPlainHostName(host) || dnsDomainIs(host, ".corp.example"))
+        return "DIRECT";
+    return "PROXY proxy.corp.example:3128; DIRECT";
+}
+"""
+
+
+class FixedHelpers(PacHelpers):
+    """Helpers with a fixed clock and a fake DNS."""
+    
+    HOSTS = {'intranet': ['10.1.2.3'], 'dual.example': ['192.0.2.7', '2001:db8::7']}
+    
+    def __init__(self):
+        super().__init__(clock=lambda: NOW)
+    
+    def lookup(self, host):
+        return self.HOSTS.get(host, [host] if host[:1].isdigit() else [])
+
+
+def _evaluate(expression):
+    script = Script.from_source(f"function check() {{ return {expression}; }}")
+    return script.call(script.instantiate(FixedHelpers().builtins()), 'check')
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('isInNet("10.1.2.3", "10.0.0.0", "255.0.0.0")', True),
+    ('isInNet("intranet", "10.1.0.0", "255.255.0.0")', True),
+    ('isInNet("11.1.2.3", "10.0.0.0", "255.0.0.0")', False),
+    ('isInNet("unknown.example", "0.0.0.0", "0.0.0.0")', False),
+    ('isInNetEx("dual.example", "2001:db8::/32")', True),
+    ('shExpMatch("www.corp.example", "*.corp.example")', True),
+    ('shExpMatch("corp.example", "*.corp.example")', False),
+    ('shExpMatch("host1.lab", "host?.lab")', True),
+    ('dnsDomainIs("www.corp.example", ".corp.example")', True),
+    ('dnsDomainIs("www.example", ".corp.example")', False),
+    ('localHostOrDomainIs("www", "www.corp.example")', True),
+    ('dnsResolve("dual.example")', '192.0.2.7'),
+    ('dnsDomainLevels("a.b.c")', 2.0),
+    ('weekdayRange("MON", "FRI")', True),
+    ('weekdayRange("SAT", "SUN")', False),
+    ('weekdayRange("FRI", "MON", "GMT")', True),
+    ('dateRange("OCT")', True),
+    ('dateRange(1, "OCT", 2026, 31, "DEC", 2026)', True),
+    ('dateRange("NOV", "FEB")', False),
+    ('timeRange(14)', True),
+    ('timeRange(9, 17, "GMT")', True),
+    ('timeRange(14, 31, 0, 15, 0, 0, "GMT")', False),
+    ('timeRange(22, 6)', False),
+])
+def test_standard_helpers(expression, expected):
+    assert _evaluate(expression) == expected
+
+
+def test_step_budget_stops_infinite_loop(tmp_path):
+    pac_file = tmp_path / 'loop.pac'
+    pac_file.write_text('function FindProxyForURL(url, host) {\n'
+                        '    if (host == "spin") while (true) {}\n'
+                        '    return "DIRECT";\n'
+                        '}\n')
+    engine = PacEngine(tmp_path, str(pac_file), FixedHelpers())
+    with pytest.raises(PacError, match='step budget'):
+        engine.find_proxy('http://spin/')
+    # The next call starts with a fresh budget
+    assert engine.find_proxy('http://other/') == 'DIRECT'
+
+
+def test_step_budget_applies_to_top_level_code(tmp_path):
+    pac_file = tmp_path / 'loop.pac'
+    pac_file.write_text('for (;;) {}\n' + SCRIPT)
+    with pytest.raises(PacError, match='step budget'):
+        PacEngine(tmp_path, str(pac_file), FixedHelpers()).refresh()
+
+
+@pytest.mark.parametrize('expression', [
+    'open("/etc/passwd")', '__import__("os")', 'eval("1")', 'require("fs")', 'process.env',
+    'Function("return 1")()', 'globalThis',
+])
+def test_sandbox_has_no_undeclared_globals(expression):
+    with pytest.raises(PacScriptError, match='is not defined'):
+        _evaluate(expression)
+
+
+@pytest.mark.parametrize('expression', [
+    '"x".__class__', '"x".constructor', '[].__class__', 'Math.__class__', '/x/.__init__',
+])
+def test_sandbox_hides_host_attributes(expression):
+    assert _evaluate(expression) is pacscript.UNDEFINED
+
+
+def test_parse_tree_cache_reused_by_content_digest(tmp_path, monkeypatch):
+    loader = PacLoader(tmp_path)
+    script = loader.compile(SCRIPT)
+    assert loader.compile(SCRIPT) is script
+    assert len(list(loader.cache_dir.glob('*.ast'))) == 1
+    
+    def parse(source):
+        raise AssertionError("cached script parsed again")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(pacscript, 'parse', parse)
+        assert PacLoader(tmp_path).compile(SCRIPT).tree == script.tree
+    
+    changed = PacLoader(tmp_path).compile(SCRIPT.replace('3128', '8080'))
+    assert changed.tree != script.tree
+    assert len(list(loader.cache_dir.glob('*.ast'))) == 2
+
+
+def test_engine_reloads_only_changed_script(tmp_path):
+    pac_file = tmp_path / 'proxy.pac'
+    pac_file.write_text(SCRIPT)
+    engine = PacEngine(tmp_path, str(pac_file), FixedHelpers())
+    assert engine.refresh()
+    assert engine.find_proxy('https://www.example.org/path') == 'PROXY proxy.corp.example:3128; DIRECT'
+    assert not engine.refresh()
+    
+    pac_file.write_text(SCRIPT.replace('3128', '8080'))
+    assert engine.refresh()
+    assert engine.resolve('www.example.org')[0] == {'type': 'PROXY', 'host': 'proxy.corp.example', 'port': 8080}
+    assert engine.resolve('http://intranet/') == [{'type': 'DIRECT'}]
+
+
+class PacServer(http.server.BaseHTTPRequestHandler):
+    """Serves `body` with an ETag and answers matching If-None-Match with 304."""
+    
+    body = SCRIPT
+    requests = []
+    
+    def do_GET(self):
+        etag = f'"{len(self.body)}-{hash(self.body) & 0xffff:x}"'
+        PacServer.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        payload = self.body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pac_server():
+    PacServer.body, PacServer.requests = SCRIPT, []
+    server = http.server.HTTPServer(('127.0.0.1', 0), PacServer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/proxy.pac"
+    server.shutdown()
+    server.server_close()
+
+
+def test_etag_revalidation(tmp_path, pac_server):
+    loader = PacLoader(tmp_path)
+    assert loader._fetch_http(pac_server) == SCRIPT
+    etag = loader._load_meta(pac_server)['etag']
+    
+    # Within PAC_REFRESH the stored copy is used without asking the server
+    assert PacLoader(tmp_path)._fetch_http(pac_server) == SCRIPT
+    assert PacServer.requests == [None]
+    
+    assert PacLoader(tmp_path)._fetch_http(pac_server, refresh=0) == SCRIPT
+    assert PacServer.requests == [None, etag]
+    
+    PacServer.body = SCRIPT.replace('3128', '8080')
+    assert PacLoader(tmp_path)._fetch_http(pac_server, refresh=0) == PacServer.body
+    assert PacServer.requests == [None, etag, etag]
+    assert loader._load_meta(pac_server)['etag'] != etag
+
+
+def test_wpad_candidates_walk_up_the_domain():
+    assert wpad_urls('Eu.Branch.Corp.Example.') == [
+        'http://wpad.eu.branch.corp.example/wpad.dat', 'http://wpad.branch.corp.example/wpad.dat',
+        'http://wpad.corp.example/wpad.dat']
+    assert wpad_urls('corp') == ['http://wpad.corp/wpad.dat']
+
+
+def test_wpad_discovery_uses_first_server_found(tmp_path, monkeypatch):
+    tried = []
+    
+    def fetch(url, refresh=None):
+        tried.append(url)
+        if url != 'http://wpad.corp.example/wpad.dat':
+            raise PacError(f"cannot fetch {url}: Name or service not known")
+        return SCRIPT
+    
+    loader = PacLoader(tmp_path)
+    monkeypatch.setattr(loader, '_fetch_http', fetch)
+    assert loader.fetch('wpad:eu.branch.corp.example') == (SCRIPT, 'http://wpad.corp.example/wpad.dat')
+    assert tried == wpad_urls('eu.branch.corp.example')
+    
+    # The server found last time is tried first
+    tried.clear()
+    assert loader.fetch('wpad:eu.branch.corp.example')[1] == 'http://wpad.corp.example/wpad.dat'
+    assert tried == ['http://wpad.corp.example/wpad.dat']
+    
+    monkeypatch.setattr(loader, '_fetch_http', lambda url, refresh=None: fetch('http://nowhere/'))
+    with pytest.raises(PacError, match='WPAD found no PAC script for lab.example'):
+        loader.fetch('wpad:lab.example')
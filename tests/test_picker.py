@@ -0,0 +1,59 @@
+"""
+ProxyManX Windows - Profile Picker Tests
+Fuzzy matching finds subsequences, ranks prefix and substring matches
+first, and keeps every keystroke fast even when no line matches.
+"""
+
+import time
+
+import pytest
+
+from picker import FuzzyIndex
+
+# Per keystroke; a backtracking pattern takes seconds on the inputs below
+MAX_KEYSTROKE_MS = 100.0
+
+
+def _typed(index, query):
+    """Type query one key at a time; returns the slowest keystroke in ms."""
+    slowest = 0.0
+    for char in query:
+        started = time.perf_counter()
+        index.push(char)
+        index.top(10)
+        slowest = max(slowest, (time.perf_counter() - started) * 1000)
+    return slowest
+
+
+def test_subsequence_match_and_ranking():
+    index = FuzzyIndex([('home', 'proxy.home:8080'), ('office', 'proxy.corp:3128'),
+                        ('lab-office', 'lab.corp:3128'), ('o-f-f-i-c-e', 'x:1')])
+    _typed(index, 'office')
+    assert index.count() == '3'
+    assert index.top(10) == [1, 2, 3]
+    
+    index.pop()
+    index.pop()
+    assert index.query == 'offi'
+    _typed(index, 'z')
+    assert index.count() == '0' and index.top(10) == []
+
+
+@pytest.mark.parametrize('char', ['.', '[', ']', '^', '\\', '-'])
+def test_regex_characters_match_literally(char):
+    index = FuzzyIndex([(f'a{char}b', ''), ('ab', '')])
+    _typed(index, f'{char}b')
+    assert index.top(10) == [0]
+
+
+def test_non_matching_keystroke_stays_fast():
+    entries = [(f"corp-{'a' * 60}{number}", 'proxy.corp:3128') for number in range(200)]
+    assert _typed(FuzzyIndex(entries), 'aaaaaaz') < MAX_KEYSTROKE_MS
+
+
+def test_typo_on_realistic_profiles_stays_fast():
+    entries = [(f"branch-office-{number:04d}", f"proxy-emea-{number % 100:02d}.corp.example.com:3128")
+               for number in range(2000)]
+    index = FuzzyIndex(entries)
+    assert _typed(index, 'branchofficeq') < MAX_KEYSTROKE_MS
+    assert index.count() == '0'
@@ -0,0 +1,130 @@
+"""
+ProxyManX Windows - PowerShell Profile Benchmark
+Managed-block edits on profiles of thousands of lines: one read and one
+atomic write per change, no write at all when the block is unchanged, and
+the user's own lines left exactly as they were.
+"""
+
+import statistics
+import time
+
+import pytest
+
+import targets.powershell
+from targets.powershell import PowerShellProxyTarget
+from utils import capture_messages
+
+PROFILE_LINES = (2000, 20000)
+ROUNDS = 15
+
+# Generous ceiling for one edit of the largest profile; a full rescan per
+# line, or any quadratic step, is orders of magnitude slower than this
+MAX_MEDIAN_MS = 100.0
+
+CONFIG = {'http_host': 'proxy.corp', 'http_port': 3128, 'no_proxy': 'localhost,.corp', 'use_auth': False}
+OTHER_CONFIG = dict(CONFIG, http_port=8080)
+
+
+def _user_profile(lines, newline):
+    """A large profile of the user's own functions, aliases and comments."""
+    body = []
+    for index in range(lines // 4):
+        body += [f"# helper {index}",
+                 f"function Invoke-Helper{index} {{ param($Path) Get-ChildItem $Path | Select-Object -First {index} }}",
+                 f"Set-Alias h{index} Invoke-Helper{index}",
+                 f"$env:TOOL_{index}_HOME = \"C:\\Tools\\{index}\""]
+    return newline.join(body) + newline
+
+
+@pytest.fixture
+def target(tmp_path):
+    instance = PowerShellProxyTarget.__new__(PowerShellProxyTarget)  # Skip the $PROFILE lookup
+    instance.colors = {}
+    instance.profile_path = tmp_path / 'Microsoft.PowerShell_profile.ps1'
+    return instance
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Count the atomic writes the target makes."""
+    calls = []
+    original = targets.powershell.atomic_write_text
+    
+    def counting(path, content, *args, **kwargs):
+        calls.append(path)
+        return original(path, content, *args, **kwargs)
+    
+    monkeypatch.setattr(targets.powershell, 'atomic_write_text', counting)
+    return calls
+
+
+def _timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+@pytest.mark.parametrize('newline', ['\r\n', '\n'])
+def test_block_edits_keep_user_lines(target, writes, newline):
+    user = _user_profile(2000, newline)
+    half = len(user) // 2
+    head, tail = user[:user.index(newline, half) + len(newline)], user[user.index(newline, half) + len(newline):]
+    target.profile_path.write_bytes((head + tail).encode('utf-8'))
+    
+    with capture_messages(always=True):
+        assert target.set_proxy(CONFIG)
+        content = target.profile_path.read_bytes().decode('utf-8')
+        assert content.startswith(head + tail)
+        assert content.count(PowerShellProxyTarget.BLOCK_BEGIN) == 1
+        
+        # A block in the middle of the profile is replaced in place
+        block = content[len(head + tail):]
+        target.profile_path.write_bytes((head + block + tail).encode('utf-8'))
+        assert target.set_proxy(OTHER_CONFIG)
+        content = target.profile_path.read_bytes().decode('utf-8')
+        assert content.startswith(head) and content.endswith(tail)
+        assert 'proxy.corp:8080' in content and 'proxy.corp:3128' not in content
+        
+        assert target.unset_proxy()
+        assert target.profile_path.read_bytes().decode('utf-8') == head + tail
+    assert len(writes) == 3  # Insert, replace, remove: one write each
+
+
+def test_unchanged_block_is_not_written(target, writes):
+    target.profile_path.write_text(_user_profile(2000, '\n'), encoding='utf-8')
+    with capture_messages(always=True):
+        target.set_proxy(CONFIG)
+        for _ in range(3):
+            target.set_proxy(CONFIG)
+            target.unset_proxy()
+            target.unset_proxy()
+            target.set_proxy(CONFIG)
+    assert len(writes) == 1 + 3 * 2
+    
+    writes.clear()
+    with capture_messages(always=True):
+        target.set_proxy(CONFIG)
+    assert not writes
+
+
+@pytest.mark.parametrize('lines', PROFILE_LINES)
+def test_large_profile_benchmark(target, lines, capsys):
+    user = _user_profile(lines, '\r\n')
+    target.profile_path.write_bytes(user.encode('utf-8'))
+    timings = {'insert': [], 'replace': [], 'unchanged': [], 'remove': []}
+    with capture_messages(always=True):
+        for _ in range(ROUNDS):
+            timings['insert'].append(_timed(lambda: target.set_proxy(CONFIG)))
+            timings['replace'].append(_timed(lambda: target.set_proxy(OTHER_CONFIG)))
+            timings['unchanged'].append(_timed(lambda: target.set_proxy(OTHER_CONFIG)))
+            timings['remove'].append(_timed(lambda: target.unset_proxy()))
+    assert target.profile_path.read_bytes().decode('utf-8') == user
+    
+    medians = {name: statistics.median(values) for name, values in timings.items()}
+    with capsys.disabled():
+        size_kb = len(user.encode('utf-8')) / 1024
+        print(f"\n  {lines} lines ({size_kb:.0f} KB): " +
+              ", ".join(f"{name} {ms:.2f} ms" for name, ms in medians.items()))
+    assert max(medians.values()) < MAX_MEDIAN_MS, medians
+    # Skipping the write is what makes an unchanged block cheap
+    assert medians['unchanged'] < medians['replace']
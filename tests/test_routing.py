@@ -0,0 +1,77 @@
+"""
+ProxyManX Windows - URL Routing Tests
+The compiled no_proxy rules agree with the rule order a user wrote, and a
+parallel route run writes its decisions in input order.
+"""
+
+import io
+
+import pytest
+
+import routing
+from routing import NoProxyRules, route_stream
+
+RULES = ('corp.example, .lab.example, *.dev.example, *.build.corp.example, svc.example:8443, '
+         '10.1.0.0/16, 10.*, 192.168.*:8080, [::1], 2001:db8::/32, <local>, host-??.example')
+
+
+@pytest.mark.parametrize('host, port, rule', [
+    ('corp.example', None, 'corp.example'),
+    ('www.corp.example', 443, 'corp.example'),
+    ('lab.example', None, '.lab.example'),
+    ('a.b.lab.example', None, '.lab.example'),
+    ('dev.example', None, None),
+    ('x.dev.example', None, '*.dev.example'),
+    # The most specific name wins over a shorter suffix
+    ('ci.build.corp.example', None, '*.build.corp.example'),
+    ('build.corp.example', None, 'corp.example'),
+    ('notcorp.example', None, None),
+    ('svc.example', 8443, 'svc.example:8443'),
+    ('svc.example', 443, None),
+    ('intranet', 80, '<local>'),
+    ('intranet.example', 80, None),
+    ('host-01.example', None, 'host-??.example'),
+    ('host-1.example', None, None),
+    ('::1', None, '[::1]'),
+    ('2001:db8::42', 443, '2001:db8::/32'),
+    ('2001:db9::1', None, None),
+    ('192.168.1.1', 8080, '192.168.*:8080'),
+    ('192.168.1.1', 80, None),
+])
+def test_match(host, port, rule):
+    rules = NoProxyRules(RULES)
+    index = rules.match(host, port)
+    assert (rules.entries[index] if index is not None else None) == rule
+
+
+@pytest.mark.parametrize('no_proxy, host, rule', [
+    # Overlapping ranges belong to whichever rule was written first
+    ('10.1.0.0/16, 10.*', '10.1.2.3', '10.1.0.0/16'),
+    ('10.1.0.0/16, 10.*', '10.2.0.1', '10.*'),
+    ('10.*, 10.1.0.0/16', '10.1.2.3', '10.*'),
+    ('10.0.0.0/8, 10.1.2.0/24, 10.1.0.0/16', '10.1.2.3', '10.0.0.0/8'),
+    ('10.1.2.0/24, 10.0.0.0/8, 10.1.0.0/16', '10.1.2.3', '10.1.2.0/24'),
+    ('10.1.2.0/24, 10.0.0.0/8, 10.1.0.0/16', '10.1.3.3', '10.0.0.0/8'),
+    ('10.1.2.0/24, 10.1.3.0/24', '10.1.4.0', None),
+    ('*, corp.example', 'example.org', '*'),
+])
+def test_overlapping_rules_belong_to_the_first(no_proxy, host, rule):
+    rules = NoProxyRules(no_proxy)
+    index = rules.match(host)
+    assert (rules.entries[index] if index is not None else None) == rule
+
+
+def test_parallel_route_keeps_input_order(monkeypatch):
+    chunks = routing._chunks
+    monkeypatch.setattr(routing, '_chunks', lambda stream: chunks(stream, 7))
+    urls = [f"https://host{number}.{'corp' if number % 3 else 'public'}.example/{number}"
+            for number in range(500)]
+    text = '\n'.join(urls) + '\n'
+    
+    serial, parallel = io.StringIO(), io.StringIO()
+    expected = route_stream('corp.example', io.StringIO(text), serial)
+    summary = route_stream('corp.example', io.StringIO(text), parallel, workers=3)
+    assert parallel.getvalue() == serial.getvalue()
+    assert [line.split('\t')[1] for line in parallel.getvalue().splitlines()] == urls
+    assert summary == expected
+    assert summary['rules'] == [{'rule': 'corp.example', 'hits': 333}]
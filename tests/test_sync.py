@@ -0,0 +1,38 @@
+"""
+ProxyManX Windows - Profile Sync Tests
+Profiles a sync adds, updates or removes refresh the completion cache and
+the cached shell statements, the same as a local save or delete.
+"""
+
+import json
+
+from completion import read_cached_words
+from config import ConfigManager
+from shellenv import env_script_path, write_env_scripts
+from sync import ProfileSync
+from utils import capture_messages
+
+
+def _bundle(path, **ports):
+    path.write_text(json.dumps({'profiles': {name: {'http_host': f'{name}.proxy', 'http_port': port}
+                                             for name, port in ports.items()}}))
+
+
+def test_sync_refreshes_completion_and_env_scripts(isolated_home, tmp_path):
+    manager = ConfigManager()
+    bundle = tmp_path / 'bundle.json'
+    _bundle(bundle, office=3128, lab=8080)
+    with capture_messages(always=True):
+        result = ProfileSync(manager).sync(str(bundle))
+        assert sorted(result['added']) == ['lab', 'office']
+        assert sorted(read_cached_words(manager.config_dir, 'profile')) == ['lab', 'office']
+        
+        write_env_scripts(manager, 'office')
+        script = env_script_path(manager.config_dir, 'office', 'bash')
+        assert 'office.proxy:3128' in script.read_text()
+        
+        _bundle(bundle, office=9090)
+        result = ProfileSync(manager).sync(str(bundle))
+    assert result['updated'] == ['office'] and result['removed'] == ['lab']
+    assert read_cached_words(manager.config_dir, 'profile') == ['office']
+    assert 'office.proxy:9090' in script.read_text()
@@ -0,0 +1,241 @@
+"""
+ProxyManX Windows - WinINet Connection Settings Tests
+Round trips of DefaultConnectionSettings blobs, and the system target's
+set/unset/restore against an in-memory registry.
+"""
+
+import json
+import platform
+
+import pytest
+
+import targets.base
+import targets.system
+from status import stamp_sources
+from targets.system import SystemProxyTarget
+from targets.wininet import (BLOB_VALUE, CONNECTIONS_PATH, PROXY_TYPE_AUTO_DETECT, PROXY_TYPE_AUTO_PROXY_URL,
+                             PROXY_TYPE_DIRECT, PROXY_TYPE_PROXY, ConnectionSettings, decode_settings, restamp)
+
+INTERNET_SETTINGS = r"Software\Microsoft\Windows\CurrentVersion\Internet Settings"
+
+# Blobs in the layouts Windows writes: IE7+ (version 0x46, with the trailing
+# auto-detect area) and IE6 (version 0x3C, nothing after the strings)
+BLOBS = {
+    'auto_detect_only': bytes.fromhex(
+        '4600000003000000090000000000000000000000000000000000000000000000'
+        '000000000000000000000000000000000000000000000000'),
+    'manual_proxy': bytes.fromhex(
+        '460000002a000000030000000f00000070726f78792e636f72703a383038300e'
+        '0000002a2e636f72703b3c6c6f63616c3e000000000100000000000000000000'
+        '000000000000000000000000000000000000000000'),
+    'pac_and_detect': bytes.fromhex(
+        '46000000110000000d00000000000000000000001a000000687474703a2f2f77'
+        '7061642e636f72702f70726f78792e70616302000000c0a80a02000000000000'
+        '000000000000000000000000000000000000'),
+    'legacy_ie6': bytes.fromhex(
+        '3c000000010000000300000026000000687474703d31302e302e302e313a3331'
+        '32383b68747470733d31302e302e302e313a33313238070000003c6c6f63616c'
+        '3e00000000'),
+}
+
+
+class FakeWinreg:
+    """Just enough of winreg for SystemProxyTarget, keeping values in dicts."""
+    
+    HKEY_CURRENT_USER = 'HKCU'
+    KEY_READ = 1
+    KEY_SET_VALUE = 2
+    REG_SZ = 1
+    REG_BINARY = 3
+    REG_DWORD = 4
+    
+    def __init__(self):
+        self.keys = {INTERNET_SETTINGS: {}}
+    
+    def OpenKey(self, root, sub_key, reserved=0, access=0):
+        if sub_key not in self.keys:
+            raise FileNotFoundError(sub_key)
+        return sub_key
+    
+    def CreateKey(self, root, sub_key):
+        self.keys.setdefault(sub_key, {})
+        return sub_key
+    
+    def SetValueEx(self, key, name, reserved, value_type, value):
+        self.keys[key][name] = (value_type, value)
+    
+    def QueryValueEx(self, key, name):
+        if name not in self.keys[key]:
+            raise FileNotFoundError(name)
+        value_type, value = self.keys[key][name]
+        return value, value_type
+    
+    def DeleteValue(self, key, name):
+        if name not in self.keys[key]:
+            raise FileNotFoundError(name)
+        del self.keys[key][name]
+    
+    def CloseKey(self, key):
+        pass
+    
+    def value(self, key, name):
+        return self.keys.get(key, {}).get(name, (None, None))[1]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fake = FakeWinreg()
+    monkeypatch.setattr(targets.base, 'winreg', fake)
+    monkeypatch.setattr(targets.system, 'winreg', fake)
+    monkeypatch.setattr(platform, 'system', lambda: 'Windows')
+    monkeypatch.setattr(SystemProxyTarget, '_refresh_system_settings', lambda self: None)
+    return fake
+
+
+def _blob(registry):
+    return ConnectionSettings.from_bytes(registry.value(CONNECTIONS_PATH, BLOB_VALUE))
+
+
+@pytest.mark.parametrize('name', sorted(BLOBS))
+def test_round_trip(name):
+    blob = BLOBS[name]
+    assert ConnectionSettings.from_bytes(blob).to_bytes() == blob
+
+
+def test_decoded_fields():
+    settings = ConnectionSettings.from_bytes(BLOBS['manual_proxy'])
+    assert (settings.version, settings.counter) == (0x46, 0x2a)
+    assert settings.flags == PROXY_TYPE_DIRECT | PROXY_TYPE_PROXY
+    assert settings.proxy_server == 'proxy.corp:8080'
+    assert settings.bypass == '*.corp;<local>'
+    assert settings.auto_config_url == ''
+    assert len(settings.tail) == 32
+    
+    settings = ConnectionSettings.from_bytes(BLOBS['pac_and_detect'])
+    assert settings.flags == PROXY_TYPE_DIRECT | PROXY_TYPE_AUTO_PROXY_URL | PROXY_TYPE_AUTO_DETECT
+    assert settings.auto_config_url == 'http://wpad.corp/proxy.pac'
+
+
+@pytest.mark.parametrize('name', sorted(BLOBS))
+def test_truncated_blob_raises(name):
+    blob = BLOBS[name]
+    # Every cut inside the header or the strings; cuts in the tail are still valid blobs
+    strings_end = len(blob) - len(ConnectionSettings.from_bytes(blob).tail)
+    for size in range(strings_end):
+        with pytest.raises(ValueError):
+            ConnectionSettings.from_bytes(blob[:size])
+
+
+def test_decode_settings_falls_back_to_defaults():
+    for blob in (None, b'', b'\x46\x00'):
+        settings = decode_settings(blob)
+        assert settings.flags == PROXY_TYPE_DIRECT
+        assert settings.proxy_server == settings.bypass == settings.auto_config_url == ''
+
+
+def test_updated_keeps_auto_config_and_bumps_counter():
+    settings = ConnectionSettings.from_bytes(BLOBS['pac_and_detect']).updated(True, 'p:3128', '<local>')
+    assert settings.counter == 0x12
+    assert settings.flags & PROXY_TYPE_PROXY and settings.flags & PROXY_TYPE_AUTO_DETECT
+    assert settings.auto_config_url == 'http://wpad.corp/proxy.pac'
+    assert settings.tail == ConnectionSettings.from_bytes(BLOBS['pac_and_detect']).tail
+    
+    cleared = settings.updated(False, '', '')
+    assert not cleared.flags & PROXY_TYPE_PROXY
+    assert cleared.counter == 0x13
+
+
+def test_counter_wraps():
+    settings = ConnectionSettings(counter=0xFFFFFFFF).updated(True)
+    assert settings.counter == 0
+    assert ConnectionSettings.from_bytes(settings.to_bytes()).counter == 0
+
+
+def test_restamp_moves_counter_past_current():
+    old = BLOBS['manual_proxy']
+    current = ConnectionSettings.from_bytes(old).updated(False, '', '').updated(True, 'x:1').to_bytes()
+    restored = ConnectionSettings.from_bytes(restamp(old, current))
+    assert restored.counter == 0x2a + 3
+    assert restored.proxy_server == 'proxy.corp:8080'
+    assert restamp(b'\x01', current) == b'\x01'
+
+
+def test_set_writes_plain_values_and_blob(registry):
+    registry.CreateKey(None, CONNECTIONS_PATH)
+    registry.SetValueEx(CONNECTIONS_PATH, BLOB_VALUE, 0, registry.REG_BINARY, BLOBS['pac_and_detect'])
+    
+    assert SystemProxyTarget().set_proxy({'http_host': 'proxy.corp', 'http_port': 3128, 'no_proxy': '<local>'})
+    assert registry.value(INTERNET_SETTINGS, 'ProxyEnable') == 1
+    assert registry.value(INTERNET_SETTINGS, 'ProxyServer') == 'proxy.corp:3128'
+    assert registry.value(INTERNET_SETTINGS, 'ProxyOverride') == '<local>'
+    settings = _blob(registry)
+    assert settings.counter == 0x12
+    assert settings.proxy_server == 'proxy.corp:3128' and settings.bypass == '<local>'
+    assert settings.flags & PROXY_TYPE_PROXY
+    assert settings.auto_config_url == 'http://wpad.corp/proxy.pac'
+
+
+def test_set_creates_missing_blob(registry):
+    assert SystemProxyTarget().set_proxy({'http_host': 'h', 'http_port': 8080})
+    settings = _blob(registry)
+    assert settings.version == 0x46 and settings.counter == 1
+    assert settings.proxy_server == 'h:8080'
+    assert settings.tail == bytes(32)
+
+
+def test_unset_clears_blob(registry):
+    target = SystemProxyTarget()
+    target.set_proxy({'http_host': 'h', 'http_port': 8080, 'no_proxy': 'localhost'})
+    assert target.unset_proxy()
+    assert registry.value(INTERNET_SETTINGS, 'ProxyEnable') == 0
+    settings = _blob(registry)
+    assert not settings.flags & PROXY_TYPE_PROXY
+    assert settings.proxy_server == settings.bypass == ''
+    assert settings.counter == 2
+
+
+def test_restore_brings_back_old_blob_with_newer_counter(registry):
+    registry.CreateKey(None, CONNECTIONS_PATH)
+    registry.SetValueEx(CONNECTIONS_PATH, BLOB_VALUE, 0, registry.REG_BINARY, BLOBS['manual_proxy'])
+    registry.SetValueEx(INTERNET_SETTINGS, 'ProxyEnable', 0, registry.REG_DWORD, 1)
+    registry.SetValueEx(INTERNET_SETTINGS, 'ProxyServer', 0, registry.REG_SZ, 'proxy.corp:8080')
+    target = SystemProxyTarget()
+    # Snapshots go through the JSON journal
+    state = json.loads(json.dumps(target.snapshot_state()))
+    
+    target.set_proxy({'http_host': 'other', 'http_port': 1})
+    assert target.restore_state(state)
+    assert registry.value(INTERNET_SETTINGS, 'ProxyServer') == 'proxy.corp:8080'
+    assert registry.value(INTERNET_SETTINGS, 'ProxyOverride') is None
+    restored = _blob(registry)
+    assert restored.counter == 0x2a + 2
+    restored.counter = 0x2a
+    assert restored.to_bytes() == BLOBS['manual_proxy']
+
+
+def test_restore_removes_blob_that_did_not_exist(registry):
+    target = SystemProxyTarget()
+    state = json.loads(json.dumps(target.snapshot_state()))
+    target.set_proxy({'http_host': 'h', 'http_port': 1})
+    assert target.restore_state(state)
+    assert registry.value(CONNECTIONS_PATH, BLOB_VALUE) is None
+    assert registry.value(INTERNET_SETTINGS, 'ProxyEnable') is None
+
+
+def test_bypass_list_is_semicolon_separated(registry):
+    no_proxy = 'localhost,127.0.0.1, *.corp ;10.*,<local>'
+    assert SystemProxyTarget().set_proxy({'http_host': 'h', 'http_port': 1, 'no_proxy': no_proxy})
+    expected = 'localhost;127.0.0.1;*.corp;10.*;<local>'
+    assert registry.value(INTERNET_SETTINGS, 'ProxyOverride') == expected
+    settings = ConnectionSettings.from_bytes(registry.value(CONNECTIONS_PATH, BLOB_VALUE))
+    assert settings.bypass.split(';') == ['localhost', '127.0.0.1', '*.corp', '10.*', '<local>']
+
+
+def test_blob_is_a_state_source(registry):
+    target = SystemProxyTarget()
+    target.set_proxy({'http_host': 'h', 'http_port': 1})
+    before = stamp_sources(target.state_sources())
+    # Another program rewrites only the blob
+    settings = _blob(registry).updated(True, 'other:8080')
+    registry.SetValueEx(CONNECTIONS_PATH, BLOB_VALUE, 0, registry.REG_BINARY, settings.to_bytes())
+    assert stamp_sources(target.state_sources()) != before